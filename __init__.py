@@ -14,32 +14,32 @@ import bpy
 
 from bpy.props import PointerProperty
 
-from bpy.app.handlers import (
-    depsgraph_update_post,
-    undo_post,
-    redo_post
-)
-
 from .gd2db_operators_and_properties import (
     GODOT_2D_BRIDGE_OT_scene_selection,
     GODOT_2D_BRIDGE_OT_export,
     GODOT_2D_BRIDGE_OT_clear,
     GODOT_2D_BRIDGE_OT_2d_object_toggle,
     GODOT_2D_BRIDGE_OT_apply_material,
+    GODOT_2D_BRIDGE_OT_profile_export,
+    GODOT_2D_BRIDGE_OT_clear_history,
+    GODOT_2D_BRIDGE_OT_lint,
     Godot2dBridgeProperties
 )
 
 from .gd2db_ui import (
     GODOT_2D_BRIDGE_PT_export_panel,
-    GODOT_2D_BRIDGE_PT_setup_panel
+    GODOT_2D_BRIDGE_PT_setup_panel,
+    GODOT_2D_BRIDGE_PT_statistics_panel
 )
 
-from .gd2db_2d_constraints import (
-    gd2db_constraint_changer,
-    remove_all_constraints,
-    gd2db_undo_redo_activator
+# the handlers, and the modules they need, are only installed once the open blend file contains a "2d" object
+from .gd2db_handlers import (
+    register_handler_installer,
+    unregister_handler_installer
 )
 
+from .gd2db_enum_items import texture_image_items
+
 from bpy.utils import (
     register_class,
     unregister_class
@@ -60,11 +60,9 @@ def get_object_2d(self):
 
 
 # returns a list of enumerator property items containing the names of available images within the blender file
+# the items are cached until images change
 def gd2db_texture_items(_self, _context):
-    item_list = [("None", "None", "")]
-    for img in bpy.data.images:
-        item_list.append((img.name, img.name, ""))
-    return item_list
+    return texture_image_items()
 
 
 # =========================================================================
@@ -76,10 +74,14 @@ classes = (
     GODOT_2D_BRIDGE_OT_apply_material,
     GODOT_2D_BRIDGE_OT_scene_selection,
     GODOT_2D_BRIDGE_OT_export,
+    GODOT_2D_BRIDGE_OT_profile_export,
     GODOT_2D_BRIDGE_OT_clear,
     GODOT_2D_BRIDGE_OT_2d_object_toggle,
     GODOT_2D_BRIDGE_PT_setup_panel,
     GODOT_2D_BRIDGE_PT_export_panel,
+    GODOT_2D_BRIDGE_PT_statistics_panel,
+    GODOT_2D_BRIDGE_OT_clear_history,
+    GODOT_2D_BRIDGE_OT_lint,
     Godot2dBridgeProperties
 )
 
@@ -115,9 +117,7 @@ def register():
         options={'HIDDEN'}
     )
 
-    depsgraph_update_post.append(gd2db_constraint_changer)
-    redo_post.append(gd2db_undo_redo_activator)
-    undo_post.append(gd2db_undo_redo_activator)
+    register_handler_installer()
 
     for cls in classes:
         register_class(cls)
@@ -130,10 +130,11 @@ def unregister():
     del bpy.types.Object.gd2db_image_width
     del bpy.types.Object.gd2db_image_height
 
-    remove_all_constraints()
-    depsgraph_update_post.remove(gd2db_constraint_changer)
-    redo_post.remove(gd2db_undo_redo_activator)
-    undo_post.remove(gd2db_undo_redo_activator)
+    unregister_handler_installer()
+
+    # the meshes evaluated for the export have no users, but would stay in bpy.data until the file is reloaded
+    from .gd2db_evaluated_mesh import clear_evaluated_meshes
+    clear_evaluated_meshes()
 
     for cls in classes:
         unregister_class(cls)
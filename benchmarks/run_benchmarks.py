@@ -0,0 +1,581 @@
+# benchmarks the export phases and the constraint handlers of the addon with synthetic 2d meshes, armatures, and scenes
+#
+# run with headless Blender:
+#   blender --background --factory-startup --python benchmarks/run_benchmarks.py -- --output results.json
+# or with the bpy module from pip:
+#   python benchmarks/run_benchmarks.py --output results.json
+#
+# every case is compared against the time and peak memory budgets in benchmarks/budgets.json, use --check to exit with
+# a non-zero status if any case goes over its budget
+
+import os
+import sys
+import json
+import platform
+import tempfile
+import tracemalloc
+import importlib
+import importlib.util
+from math import (
+    cos,
+    sin,
+    pi,
+    ceil,
+    sqrt
+)
+from time import (
+    perf_counter,
+    strftime
+)
+from pathlib import Path
+from argparse import ArgumentParser
+
+import bpy
+import bmesh
+import numpy as np
+
+BENCHMARK_DIRECTORY = Path(__file__).resolve().parent
+ADDON_DIRECTORY = BENCHMARK_DIRECTORY.parent
+ADDON_MODULE = "gd2db_benchmark_addon"
+
+GRID_VERTEX_COUNTS = [1000, 10000, 100000, 1000000]
+ARMATURE_BONE_COUNTS = [10, 100, 1000, 5000]
+SCENE_NODE_COUNTS = [1000, 10000, 100000]
+SKINNED_MESH_VERTEX_COUNT = 10000
+CONVERSION_OBJECT_COUNTS = [100, 1000]
+KERNEL_POINT_COUNT = 100000
+CHUNKED_MEMORY_BUDGET = 64
+
+
+# =========================================================================
+# Setup:
+# =========================================================================
+
+
+# imports and registers the addon from this repository, the folder name of the repository doesn't have to be a valid
+# module name, and returns the addon module and the time it took to import and register it
+def load_addon():
+    start_time = perf_counter()
+    spec = importlib.util.spec_from_file_location(
+        ADDON_MODULE, ADDON_DIRECTORY / "__init__.py", submodule_search_locations=[str(ADDON_DIRECTORY)]
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_MODULE] = addon
+    spec.loader.exec_module(addon)
+    import_time = perf_counter() - start_time
+    addon.register()
+    return addon, import_time, perf_counter() - start_time - import_time
+
+
+def addon_module(name):
+    return importlib.import_module(f"{ADDON_MODULE}.{name}")
+
+
+# returns the names of the addon modules that have been imported so far
+def loaded_addon_modules():
+    return sorted(x[len(ADDON_MODULE) + 1:] for x in sys.modules if x.startswith(f"{ADDON_MODULE}."))
+
+
+# returns the time it takes to import the export machinery and install the handlers, which the addon defers until they
+# are first needed
+def first_use_time():
+    start_time = perf_counter()
+    addon_module("gd2db_scene_parsing")
+    addon_module("gd2db_handlers").install_handlers()
+    return perf_counter() - start_time
+
+
+# removes every object and orphaned datablock, so every case starts from an empty scene
+def clear_scene():
+    if bpy.context.object is not None and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for collection in (bpy.data.meshes, bpy.data.armatures, bpy.data.images):
+        for datablock in list(collection):
+            collection.remove(datablock)
+    properties = bpy.context.scene.godot_2d_bridge_tools
+    properties.godot_scene = ""
+    properties.selected = False
+    addon_module("gd2db_registry").invalidate_registry()
+
+
+# marks an object as a "2d" object the same way the conversion operator does
+def make_2d(obj):
+    obj["gd2db_object_2d"] = True
+    addon_module("gd2db_registry").register_object_2d(obj)
+    if obj.type == 'MESH':
+        obj.gd2db_texture_image = "None"
+        obj.gd2db_image_width = 500
+        obj.gd2db_image_height = 500
+
+
+# reverts make_2d, so the object can be converted by the conversion operator
+def make_3d(obj):
+    del obj["gd2db_object_2d"]
+    addon_module("gd2db_registry").unregister_object_2d(obj)
+
+
+# =========================================================================
+# Synthetic Data:
+# =========================================================================
+
+
+# creates a flat grid mesh object in the x/y plane with about vertex_count vertices and an uv layer
+def create_grid(name, vertex_count):
+    segments = max(1, int(sqrt(vertex_count)) - 1)
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=segments, y_segments=segments, size=1.0, calc_uvs=True)
+    if not bm.loops.layers.uv:
+        bm.loops.layers.uv.new("UVMap")
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    make_2d(obj)
+    return obj
+
+
+# creates an armature with bone_count bones in the x/y plane, arranged as chains fanning out from the origin
+def create_armature(name, bone_count):
+    armature = bpy.data.armatures.new(name)
+    obj = bpy.data.objects.new(name, armature)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    chain_count = max(1, ceil(sqrt(bone_count)))
+    bone_length = 1.0 / chain_count
+    for chain in range(chain_count):
+        angle = 2 * pi * chain / chain_count
+        direction = (cos(angle) * bone_length, sin(angle) * bone_length, 0.0)
+        parent = None
+        for link in range(chain_count):
+            index = chain * chain_count + link
+            if index >= bone_count:
+                break
+            bone = armature.edit_bones.new(f"bone_{index}")
+            bone.head = (direction[0] * link, direction[1] * link, 0.0)
+            bone.tail = (direction[0] * (link + 1), direction[1] * (link + 1), 0.0)
+            bone.parent = parent
+            bone.use_connect = parent is not None
+            parent = bone
+
+    bpy.ops.object.mode_set(mode='OBJECT')
+    make_2d(obj)
+    return obj
+
+
+# links mesh_obj to armature_obj with an armature modifier and weights every vertex to two bones
+def skin(mesh_obj, armature_obj):
+    modifier = mesh_obj.modifiers.new("Armature", 'ARMATURE')
+    modifier.object = armature_obj
+
+    vertex_indices = np.arange(len(mesh_obj.data.vertices))
+    bone_names = [x.name for x in armature_obj.data.bones]
+    first_bone = vertex_indices % len(bone_names)
+    second_bone = (vertex_indices * 7 + 3) % len(bone_names)
+    for bone_index, bone_name in enumerate(bone_names):
+        group = mesh_obj.vertex_groups.new(name=bone_name)
+        group.add(vertex_indices[first_bone == bone_index].tolist(), 0.6, 'REPLACE')
+        group.add(vertex_indices[(second_bone == bone_index) & (first_bone != bone_index)].tolist(), 0.4, 'REPLACE')
+
+
+# writes a Godot 3 scene with node_count Node2D nodes and a few external resources
+def write_existing_scene(path, node_count):
+    resource_count = 10
+    with open(path, "w") as scene_file:
+        scene_file.write(f"[gd_scene load_steps={resource_count + 1} format=2]\n\n")
+        for resource_id in range(1, resource_count + 1):
+            scene_file.write(
+                f"[ext_resource path=\"res://texture_{resource_id}.png\" type=\"Texture\" id={resource_id}]\n\n"
+            )
+        scene_file.write("[node name=\"Root\" type=\"Node2D\"]\n\n")
+        for index in range(node_count):
+            parent = "." if index % 10 == 0 else f"Node_{index - index % 10}"
+            scene_file.write(
+                f"[node name=\"Node_{index}\" type=\"Node2D\" parent=\"{parent}\"]\n"
+                f"position = Vector2( {index}, {index} )\n\n"
+            )
+
+
+# =========================================================================
+# Measurement:
+# =========================================================================
+
+
+# runs an export and returns the total time and the time spent in each traced phase
+def timed_export(scene_path):
+    gd2db_trace = addon_module("gd2db_trace")
+    write_godot_scene = addon_module("gd2db_scene_parsing").write_godot_scene
+
+    trace = gd2db_trace.start_trace("benchmark")
+    start_time = perf_counter()
+    try:
+        write_godot_scene(scene_path)
+    finally:
+        total_time = perf_counter() - start_time
+        gd2db_trace.active_trace = None
+
+    phases = {}
+    for event in trace.events:
+        if event["ph"] == "X" and event["name"] != "Object":
+            phases[event["name"]] = phases.get(event["name"], 0.0) + event["dur"] / 1000000
+    return total_time, phases
+
+
+# runs an export under tracemalloc and returns the peak memory allocated by python in megabytes
+def export_peak_memory(scene_path):
+    write_godot_scene = addon_module("gd2db_scene_parsing").write_godot_scene
+    tracemalloc.start()
+    try:
+        write_godot_scene(scene_path)
+        _current_size, peak_size = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_size / 1048576
+
+
+# returns the average time of calling function repeat times
+def timed_calls(function, repeat, *args):
+    start_time = perf_counter()
+    for _ in range(repeat):
+        function(*args)
+    return (perf_counter() - start_time) / repeat
+
+
+# calls a timer function as Blender would for duration seconds of simulated time, without sleeping between calls
+# returns the time spent in the timer and the number of times it was called
+def timer_cost(timer, duration=1.0):
+    elapsed_time, busy_time, polls = 0.0, 0.0, 0
+    while elapsed_time < duration:
+        start_time = perf_counter()
+        interval = timer()
+        busy_time += perf_counter() - start_time
+        elapsed_time += interval
+        polls += 1
+    return busy_time, polls
+
+
+# =========================================================================
+# Cases:
+# =========================================================================
+
+
+def export_case(name, parameters, scene_path, measure_memory):
+    total_time, phases = timed_export(scene_path)
+    result = {
+        "name": name,
+        "parameters": parameters,
+        "time": total_time,
+        "phases": phases,
+        "bytes_written": os.path.getsize(scene_path)
+    }
+    if measure_memory:
+        result["peak_memory_mb"] = export_peak_memory(scene_path)
+    return result
+
+
+def grid_cases(output_directory, vertex_counts, measure_memory):
+    for vertex_count in vertex_counts:
+        clear_scene()
+        obj = create_grid("Grid", vertex_count)
+        parameters = {"vertices": len(obj.data.vertices), "polygons": len(obj.data.polygons)}
+        yield export_case(
+            f"export_grid_{vertex_count}",
+            parameters,
+            str(output_directory / f"grid_{vertex_count}.tscn"),
+            measure_memory
+        )
+
+
+# the largest grids again, streamed in chunks within a memory budget
+def chunked_grid_cases(output_directory, vertex_counts, measure_memory, memory_budget=CHUNKED_MEMORY_BUDGET):
+    properties = bpy.context.scene.godot_2d_bridge_tools
+    properties.chunked_export = True
+    properties.memory_budget = memory_budget
+    try:
+        for vertex_count in vertex_counts:
+            clear_scene()
+            obj = create_grid("Grid", vertex_count)
+            parameters = {"vertices": len(obj.data.vertices), "memory_budget_mb": memory_budget}
+            yield export_case(
+                f"export_grid_chunked_{vertex_count}", parameters,
+                str(output_directory / f"grid_chunked_{vertex_count}.tscn"), measure_memory
+            )
+    finally:
+        properties.chunked_export = False
+
+
+def armature_cases(output_directory, bone_counts, measure_memory):
+    for bone_count in bone_counts:
+        clear_scene()
+        armature_obj = create_armature("Armature", bone_count)
+        mesh_obj = create_grid("Skin", SKINNED_MESH_VERTEX_COUNT)
+        skin(mesh_obj, armature_obj)
+        parameters = {"bones": bone_count, "vertices": len(mesh_obj.data.vertices)}
+        yield export_case(
+            f"export_armature_{bone_count}", parameters, str(output_directory / f"armature_{bone_count}.tscn"),
+            measure_memory
+        )
+
+
+def existing_scene_cases(output_directory, node_counts, measure_memory):
+    for node_count in node_counts:
+        clear_scene()
+        existing_scene = output_directory / f"existing_{node_count}.tscn"
+        write_existing_scene(existing_scene, node_count)
+        bpy.context.scene.godot_2d_bridge_tools.godot_scene = str(existing_scene)
+        create_grid("Grid", 1000)
+        parameters = {"existing_nodes": node_count}
+        yield export_case(
+            f"export_into_scene_{node_count}", parameters, str(output_directory / f"merged_{node_count}.tscn"),
+            measure_memory
+        )
+
+
+# times converting object_count rotated meshes, each with its own mesh, and a tenth as many armatures to "2d" objects
+def conversion_cases(object_counts):
+    for object_count in object_counts:
+        clear_scene()
+        grid = create_grid("Grid", 100)
+        make_3d(grid)
+        objects = [grid]
+        for index in range(1, object_count):
+            obj = bpy.data.objects.new(f"Grid_{index}", grid.data.copy())
+            bpy.context.scene.collection.objects.link(obj)
+            objects.append(obj)
+        for index in range(max(1, object_count // 10)):
+            armature_obj = create_armature(f"Armature_{index}", 10)
+            make_3d(armature_obj)
+            objects.append(armature_obj)
+        for index, obj in enumerate(objects):
+            obj.rotation_euler = (0.1, 0.2, 0.01 * index)
+            obj.select_set(True)
+        bpy.context.view_layer.objects.active = objects[0]
+
+        parameters = {"objects": len(objects)}
+        start_time = perf_counter()
+        bpy.ops.gd2db.convert()
+        yield {"name": f"convert_objects_{object_count}", "parameters": parameters, "time": perf_counter() - start_time}
+
+
+# times applying a reference image to a grid and a linked duplicate sharing its mesh
+def apply_material_cases(vertex_counts):
+    for vertex_count in vertex_counts:
+        clear_scene()
+        image = bpy.data.images.new("Reference", 512, 256)
+        empty = bpy.data.objects.new("Reference", None)
+        empty.empty_display_type = 'IMAGE'
+        empty.data = image
+        bpy.context.scene.collection.objects.link(empty)
+        make_2d(empty)
+
+        mesh_obj = create_grid("Grid", vertex_count)
+        duplicate = bpy.data.objects.new("Duplicate", mesh_obj.data)
+        bpy.context.scene.collection.objects.link(duplicate)
+        make_2d(duplicate)
+        for obj in (mesh_obj, duplicate):
+            obj.select_set(True)
+        bpy.context.view_layer.objects.active = mesh_obj
+
+        addon_module("gd2db_enum_items").invalidate_enum_items()
+        bpy.context.scene.godot_2d_bridge_tools.reference_empty = empty.name
+        parameters = {"vertices": len(mesh_obj.data.vertices), "objects": 2}
+        start_time = perf_counter()
+        bpy.ops.gd2db.material()
+        yield {"name": f"apply_material_{vertex_count}", "parameters": parameters, "time": perf_counter() - start_time}
+
+
+# times the 2d transform kernels against their scalar versions, called once per point
+# the times are per point, the speedup of the kernel is recorded with the kernel's result
+def kernel_cases(point_count):
+    utilities = addon_module("gd2db_utilities")
+    operators = addon_module("gd2db_operators_and_properties")
+    points = np.random.default_rng(0).uniform(-10, 10, (point_count, 2))
+    point_list = [tuple(x) for x in points.tolist()]
+
+    for name, scalar, batch in (
+            (
+                "rotate_points",
+                lambda: [utilities.rotate_around_point(x, 0.3, (1.0, 2.0)) for x in point_list],
+                lambda: utilities.rotate_points(points, 0.3, (1.0, 2.0))
+            ),
+            (
+                "normalize_points",
+                lambda: [operators.normalize_2d_coordinates(x, (-10, -10), (10, 10)) for x in point_list],
+                lambda: utilities.normalize_points(points, (-10, -10), (10, 10))
+            )
+    ):
+        scalar_time = timed_calls(scalar, 1) / point_count
+        batch_time = timed_calls(batch, 10) / point_count
+        yield {"name": f"kernel_{name}_scalar", "parameters": {"points": point_count}, "time": scalar_time}
+        yield {
+            "name": f"kernel_{name}", "parameters": {"points": point_count, "speedup": scalar_time / batch_time},
+            "time": batch_time
+        }
+
+
+# times every constraint handler on a dense mesh and a large armature in the mode the handler is used in
+def constraint_cases(vertex_count, bone_count, repeat):
+    constraints = addon_module("gd2db_2d_constraints")
+    scene = bpy.context.scene
+
+    clear_scene()
+    mesh_obj = create_grid("Grid", vertex_count)
+    bpy.context.view_layer.objects.active = mesh_obj
+    mesh_obj.select_set(True)
+    parameters = {"vertices": len(mesh_obj.data.vertices), "repeat": repeat}
+
+    yield {
+        "name": "constraint_object", "parameters": parameters,
+        "time": timed_calls(constraints.gd2db_constraint_object, repeat, scene)
+    }
+    yield {
+        "name": f"constraint_sculpt_{vertex_count}", "parameters": parameters,
+        "time": timed_calls(constraints.gd2db_constraint_sculpt, repeat, scene)
+    }
+    scene.godot_2d_bridge_tools.sculpt_constraint = 'STROKE'
+    yield {
+        "name": f"constraint_sculpt_stroke_{vertex_count}", "parameters": parameters,
+        "time": timed_calls(constraints.gd2db_constraint_sculpt, repeat, scene)
+    }
+    scene.godot_2d_bridge_tools.sculpt_constraint = 'SAMPLE'
+    constraints.remove_all_constraints()
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    yield {
+        "name": f"constraint_edit_mesh_{vertex_count}", "parameters": parameters,
+        "time": timed_calls(constraints.gd2db_constraint_edit_mesh, repeat, scene)
+    }
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    clear_scene()
+    armature_obj = create_armature("Armature", bone_count)
+    bpy.context.view_layer.objects.active = armature_obj
+    parameters = {"bones": bone_count, "repeat": repeat}
+
+    bpy.ops.object.mode_set(mode='POSE')
+    armature_obj.data.bones.active = armature_obj.data.bones[0]
+    yield {
+        "name": "constraint_pose", "parameters": parameters,
+        "time": timed_calls(constraints.gd2db_constraint_pose, repeat, scene)
+    }
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    constraints.reset_edit_armature_state()
+    yield {
+        "name": f"constraint_edit_armature_{bone_count}", "parameters": parameters,
+        "time": timed_calls(constraints.gd2db_constraint_edit_armature, repeat)
+    }
+
+    # the time spent by the timer during one second of an untouched armature in edit mode
+    constraints.reset_edit_armature_state()
+    busy_time, polls = timer_cost(constraints.gd2db_constraint_edit_armature)
+    yield {
+        "name": f"constraint_edit_armature_idle_{bone_count}", "parameters": {"bones": bone_count, "polls": polls},
+        "time": busy_time
+    }
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+# =========================================================================
+# Main:
+# =========================================================================
+
+
+# adds the budget of every case to its result and returns the names of the cases that went over their budget
+def apply_budgets(results, budgets):
+    over_budget = []
+    for result in results:
+        budget = budgets.get(result["name"])
+        if budget is None:
+            continue
+        result["budget"] = budget
+        within_budget = result["time"] <= budget.get("time", float("inf"))
+        if "peak_memory_mb" in result:
+            within_budget &= result["peak_memory_mb"] <= budget.get("peak_memory_mb", float("inf"))
+        result["within_budget"] = within_budget
+        if not within_budget:
+            over_budget.append(result["name"])
+    return over_budget
+
+
+def parse_arguments():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    argument_parser = ArgumentParser(description="Benchmark the Godot 2d Bridge addon")
+    argument_parser.add_argument("--output", default=f"gd2db_benchmark_{strftime('%Y%m%d-%H%M%S')}.json")
+    argument_parser.add_argument("--budgets", default=str(BENCHMARK_DIRECTORY / "budgets.json"))
+    argument_parser.add_argument("--quick", action="store_true", help="skip the largest meshes, armatures and scenes")
+    argument_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc export runs")
+    argument_parser.add_argument("--check", action="store_true", help="exit with status 1 if a budget is exceeded")
+    return argument_parser.parse_args(argv)
+
+
+def main():
+    arguments = parse_arguments()
+    measure_memory = not arguments.no_memory
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    addon, import_time, register_time = load_addon()
+
+    # progress bars would only slow down the benchmark and clutter its output
+    addon_module("gd2db_utilities").sink_override = []
+
+    vertex_counts = GRID_VERTEX_COUNTS[:-1] if arguments.quick else GRID_VERTEX_COUNTS
+    bone_counts = ARMATURE_BONE_COUNTS[:-1] if arguments.quick else ARMATURE_BONE_COUNTS
+    node_counts = SCENE_NODE_COUNTS[:-1] if arguments.quick else SCENE_NODE_COUNTS
+
+    results = [
+        {"name": "addon_import", "parameters": {}, "time": import_time},
+        {"name": "addon_register", "parameters": {"modules": loaded_addon_modules()}, "time": register_time},
+        {"name": "addon_first_use", "parameters": {}, "time": first_use_time()}
+    ]
+    for result in results:
+        print(f"{result['name']:<40} {result['time']:9.4g}s")
+    with tempfile.TemporaryDirectory() as output_directory:
+        output_directory = Path(output_directory)
+        for cases in (
+                grid_cases(output_directory, vertex_counts, measure_memory),
+                chunked_grid_cases(output_directory, vertex_counts[-2:], measure_memory),
+                armature_cases(output_directory, bone_counts, measure_memory),
+                existing_scene_cases(output_directory, node_counts, measure_memory),
+                apply_material_cases(vertex_counts[-2:]),
+                conversion_cases(CONVERSION_OBJECT_COUNTS),
+                kernel_cases(KERNEL_POINT_COUNT),
+                constraint_cases(vertex_counts[-1], bone_counts[-1], repeat=10)
+        ):
+            for result in cases:
+                print(f"{result['name']:<40} {result['time']:9.4g}s")
+                results.append(result)
+        clear_scene()
+
+    budgets = {}
+    if Path(arguments.budgets).exists():
+        with open(arguments.budgets, "r") as budgets_file:
+            budgets = json.load(budgets_file)
+    over_budget = apply_budgets(results, budgets)
+
+    report = {
+        "date": strftime("%Y-%m-%d %H:%M:%S"),
+        "blender_version": bpy.app.version_string,
+        "addon_version": list(addon.bl_info["version"]),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "over_budget": over_budget
+    }
+    with open(arguments.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"\nResults written to \"{arguments.output}\"")
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        if arguments.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,43 @@ from bpy.app.timers import (
 )
 
 import bpy
+import numpy as np
+from time import perf_counter
 
 from bmesh import (
     from_edit_mesh,
     update_edit_mesh
 )
 
+from .gd2db_registry import any_objects_2d
+
+
+# state of the edit mesh constraint, kept between depsgraph updates
+# the bmesh of the mesh being edited, the vertices that can be moved by the current selection, and the number of
+# vertices the selection was gathered for, the selection is gathered again whenever it may have changed
+edit_bmesh = None
+edit_mesh_pointer = 0
+edit_selection = None
+edit_vertex_count = 0
+
+
+# the sculpt constraint can wait for the stroke to end, a stroke is considered finished once no sculpt updates have been
+# sent for this many seconds
+# its state is the time of the last sculpt update, and the name of the object being sculpted
+STROKE_END_DELAY = 0.15
+last_sculpt_update = 0.0
+sculpt_object_name = ""
+
+
+# the edit armature constraint polls quickly while bones are being transformed and backs off while the armature is idle
+# its state is the current interval, the number of bones, and the head, tail, and roll of the checked bones at the last
+# poll
+ARMATURE_ACTIVE_INTERVAL = 0.0001
+ARMATURE_IDLE_INTERVAL = 0.25
+armature_interval = ARMATURE_ACTIVE_INTERVAL
+armature_bone_count = 0
+armature_bone_state = None
+
 
 # returns a list of constraint handlers, the order is important
 def handlers():
@@ -32,10 +63,27 @@ def remove_all_constraints():
     # noinspection PyTypeChecker
     if timer_registered(gd2db_constraint_edit_armature):
         unregister_timer(gd2db_constraint_edit_armature)
+    # a stroke that hasn't been flattened yet is flattened before its timer is removed, e.g. when leaving sculpt mode
+    # right after the stroke
+    # noinspection PyTypeChecker
+    if timer_registered(gd2db_sculpt_stroke_timer):
+        unregister_timer(gd2db_sculpt_stroke_timer)
+        flatten_sculpted_mesh()
 
-    handlers_to_remove = [h for h in depsgraph_update_post if h.__name__ in [x.__name__ for x in handlers()]]
+    handler_names = [x.__name__ for x in handlers()] + [gd2db_constraint_edit_armature_wake.__name__]
+    handlers_to_remove = [h for h in depsgraph_update_post if h.__name__ in handler_names]
     for h in handlers_to_remove:
         depsgraph_update_post.remove(h)
+    reset_edit_mesh_state()
+
+
+# forgets the bmesh and selection of the edit mesh constraint, so they're gathered again for the next mesh being edited
+def reset_edit_mesh_state():
+    global edit_bmesh, edit_mesh_pointer, edit_selection, edit_vertex_count
+    edit_bmesh = None
+    edit_mesh_pointer = 0
+    edit_selection = None
+    edit_vertex_count = 0
 
 
 # Blender does not seem to recognize the change in modes during undo and redo operations, so this handler is used to
@@ -58,7 +106,7 @@ def gd2db_constraint_changer(scene):
     # compair mode to the mode_updater property to check if the object mode has changed and check if there are any "2d"
     # objects present in the scene before running the rest of the handler
     if scene.godot_2d_bridge_tools.mode_updater != mode:
-        if any((x.gd2db_object_2d for x in bpy.data.objects)):
+        if any_objects_2d():
 
             # get the type of active object for the context_key
             if mode == 'POSE' or mode == 'EDIT' or mode == 'SCULPT':
@@ -72,11 +120,14 @@ def gd2db_constraint_changer(scene):
             remove_all_constraints()
 
             # use the context_key to check if in the edit mode of an armature
-            # if so, register the gd2db_constraint_edit_armature timer
+            # if so, register the gd2db_constraint_edit_armature timer, and the handler that wakes it up
             if context_key == 'EDIT:ARMATURE':
+                reset_edit_armature_state()
                 # noinspection PyTypeChecker
                 if not timer_registered(gd2db_constraint_edit_armature):
                     register_timer(gd2db_constraint_edit_armature)
+                if gd2db_constraint_edit_armature_wake not in depsgraph_update_post:
+                    depsgraph_update_post.append(gd2db_constraint_edit_armature_wake)
 
             # if not in the edit mode of an armature, check if in a mode that a constraint handler would be applicable,
             # build a dictionary to get the correct handler, and append that handler to depsgraph_update_post
@@ -89,65 +140,230 @@ def gd2db_constraint_changer(scene):
             scene.godot_2d_bridge_tools.mode_updater = mode
 
 
+# returns the "2d" objects whose transforms or geometry were changed by the depsgraph update
+# without a depsgraph, e.g. when a handler is called directly, the active object is returned if it's a "2d" object
+def updated_objects_2d(depsgraph):
+    if depsgraph is None:
+        obj = bpy.context.object
+        return [obj] if obj and obj.gd2db_object_2d else []
+    return [
+        x.id.original for x in depsgraph.updates
+        if isinstance(x.id, bpy.types.Object)
+        and (x.is_updated_transform or x.is_updated_geometry)
+        and x.id.original.gd2db_object_2d
+    ]
+
+
+# constrains an object or pose bone to the xy plane
+# every property is only written if its value differs, writing a property sends another depsgraph update even if its
+# value doesn't change
+def lock_to_xy_plane(item):
+    if item.rotation_mode != 'XYZ':
+        item.rotation_mode = 'XYZ'
+    for locks, index in ((item.lock_location, 2), (item.lock_rotation, 0), (item.lock_rotation, 1),
+                         (item.lock_scale, 2)):
+        if not locks[index]:
+            locks[index] = True
+
+
 # handler to ensure "2d" objects remain constrained to the xy plane in object mode
-def gd2db_constraint_object(_scene):
-    obj = bpy.context.object
-    if obj and obj.gd2db_object_2d:
-        obj.rotation_mode = 'XYZ'
-        obj.lock_location[2] = True
-        obj.lock_rotation[0] = True
-        obj.lock_rotation[1] = True
-        obj.lock_scale[2] = True
+# only the objects changed by the update are constrained
+def gd2db_constraint_object(_scene, depsgraph=None):
+    for obj in updated_objects_2d(depsgraph):
+        lock_to_xy_plane(obj)
 
 
 # handler to ensure pose bones in a "2d" armature remain constrained to the xy plane in pose mode
-def gd2db_constraint_pose(_scene):
-    bone = bpy.context.active_pose_bone
-    if bone and bone.id_data.gd2db_object_2d:
-        bone.rotation_mode = 'XYZ'
-        bone.lock_location[2] = True
-        bone.lock_rotation[0] = True
-        bone.lock_rotation[1] = True
-        bone.lock_scale[2] = True
+# the depsgraph doesn't tell which bones were changed, the bones being transformed are the selected bones of the updated
+# armatures
+def gd2db_constraint_pose(_scene, depsgraph=None):
+    if depsgraph is None:
+        bone = bpy.context.active_pose_bone
+        if bone and bone.id_data.gd2db_object_2d:
+            lock_to_xy_plane(bone)
+        return
+
+    for obj in updated_objects_2d(depsgraph):
+        if obj.type == 'ARMATURE' and obj.pose:
+            for bone in obj.pose.bones:
+                if bone.bone.select:
+                    lock_to_xy_plane(bone)
+
+
+# returns the bmesh of the mesh in edit mode, the bmesh is kept between updates and only replaced when it's no longer
+# valid, e.g. after an undo step or switching to another mesh
+def _edit_bmesh(mesh):
+    global edit_bmesh, edit_mesh_pointer, edit_selection
+    if edit_bmesh is None or not edit_bmesh.is_valid or edit_mesh_pointer != mesh.as_pointer():
+        edit_bmesh = from_edit_mesh(mesh)
+        edit_mesh_pointer = mesh.as_pointer()
+        edit_selection = None
+    return edit_bmesh
+
+
+# returns true if vertices other than the selected ones can be moved by a transform, proportional editing and mesh
+# symmetry move unselected vertices
+def _moves_unselected_vertices(mesh):
+    return (
+        bpy.context.scene.tool_settings.use_proportional_edit
+        or any(getattr(mesh, f"use_mirror_{x}", False) for x in "xyz")
+    )
 
 
 # handler to ensure vertices in a "2d" mesh remain constrained to the xy plane in edit mode
-# this handler iterates through every vertex for every depsgraph update, so it can get expensive for dense meshes
-def gd2db_constraint_edit_mesh(_scene):
+# only the vertices touched by the current operation, the selected vertices, are checked, and only after updates that
+# changed the geometry of the mesh
+# the selection is gathered once for every change of the selection or the number of vertices, instead of on every step
+# of a transform
+def gd2db_constraint_edit_mesh(_scene, depsgraph=None):
+    global edit_selection, edit_vertex_count
+
     obj = bpy.context.object
-    if obj and obj.gd2db_object_2d:
-        bm = from_edit_mesh(obj.data)
-        bm.verts.ensure_lookup_table()
-        for vertex in bm.verts:
+    if not obj or not obj.gd2db_object_2d:
+        return
+    mesh = obj.data
+
+    # selection changes don't move vertices, but the selection has to be gathered again before the next transform
+    if depsgraph is not None and not any(
+            x.is_updated_geometry for x in depsgraph.updates if x.id.original in (obj, mesh)
+    ):
+        edit_selection = None
+        return
+
+    bm = _edit_bmesh(mesh)
+    if _moves_unselected_vertices(mesh):
+        vertices = bm.verts
+    else:
+        # new vertices, e.g. from extruding, are selected, so a change in the number of vertices also refreshes the
+        # selection
+        if edit_selection is None or edit_vertex_count != len(bm.verts):
+            edit_selection = [x for x in bm.verts if x.select]
+            edit_vertex_count = len(bm.verts)
+        vertices = edit_selection
+
+    modified = False
+    try:
+        for vertex in vertices:
             if vertex.co.z:
                 vertex.co.z = 0
-        update_edit_mesh(obj.data, loop_triangles=True)
+                modified = True
+    except ReferenceError:
+        # a vertex of the gathered selection was removed, the selection is gathered again on the next update
+        edit_selection = None
+
+    # writing the mesh back sends another depsgraph update, which is only needed if a vertex was moved
+    if modified:
+        update_edit_mesh(mesh, loop_triangles=True)
+
+
+# sets the z coordinate of every vertex of the mesh to 0, using a single bulk read, and a single bulk write only if any
+# vertex left the xy plane
+def flatten_mesh(mesh):
+    coordinates = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coordinates)
+    z_coordinates = coordinates[2::3]
+    if not z_coordinates.any():
+        return False
+    z_coordinates[:] = 0
+    mesh.vertices.foreach_set("co", coordinates)
+    mesh.update()
+    return True
 
 
 # handler to ensure vertices in a "2d" mesh remain constrained to the xy plane in sculpt mode
-# this handler iterates through every vertex for every depsgraph update, so it can get expensive for dense meshes
-def gd2db_constraint_sculpt(_scene):
+# by default the mesh is flattened on every sample of a stroke, the user can choose to flatten it once the stroke ends
+def gd2db_constraint_sculpt(scene):
+    global last_sculpt_update, sculpt_object_name
+
     obj = bpy.context.object
-    if obj and obj.gd2db_object_2d:
-        mesh = obj.data
-        for vertex in mesh.vertices:
-            if vertex.co.z:
-                vertex.co.z = 0
+    if not obj or not obj.gd2db_object_2d:
+        return
+
+    if scene.godot_2d_bridge_tools.sculpt_constraint == 'STROKE':
+        last_sculpt_update = perf_counter()
+        sculpt_object_name = obj.name
+        # noinspection PyTypeChecker
+        if not timer_registered(gd2db_sculpt_stroke_timer):
+            register_timer(gd2db_sculpt_stroke_timer, first_interval=STROKE_END_DELAY)
+    else:
+        flatten_mesh(obj.data)
+
+
+# flattens the mesh of the object the last stroke was sculpted on, whatever mode it is in now
+def flatten_sculpted_mesh():
+    obj = bpy.data.objects.get(sculpt_object_name)
+    if obj and obj.gd2db_object_2d and obj.type == 'MESH':
+        flatten_mesh(obj.data)
+
+
+# timer that flattens the mesh being sculpted once the sculpt updates stop coming in
+def gd2db_sculpt_stroke_timer():
+    remaining_time = STROKE_END_DELAY - (perf_counter() - last_sculpt_update)
+    if remaining_time > 0:
+        return remaining_time
+
+    flatten_sculpted_mesh()
+    return None
+
+
+# puts the edit armature constraint back to polling quickly and checking every bone on its next poll
+def reset_edit_armature_state():
+    global armature_interval, armature_bone_count, armature_bone_state
+    armature_interval = ARMATURE_ACTIVE_INTERVAL
+    armature_bone_count = 0
+    armature_bone_state = None
 
 
 # timer to ensure bones in a "2d" armature remain constrained to the xy plane in edit mode
 # if the resolution of this timer is too low it will produce a flickering effect for any bone being manipulated
-# this effect is purely visual but undesirable, which is why the timer is set to run so often -0.0001s-
-# this timer iterates through every bone for every depsgraph update, however, this doesn't seem to have much, if any,
-# effect on performance, no matter how many bones in the armature, further testing may be necessary
+# this effect is purely visual but undesirable, which is why the timer runs every 0.0001s while bones are being
+# transformed, once the checked bones stop changing the interval doubles on every poll, up to ARMATURE_IDLE_INTERVAL
+# only selected bones can be transformed, so only they are checked, unless bones were added or removed, or x-axis mirror
+# is enabled, which also moves the unselected mirrored bones
 def gd2db_constraint_edit_armature():
+    global armature_interval, armature_bone_count, armature_bone_state
+
     obj = bpy.context.object
-    if obj and obj.gd2db_object_2d:
-        for bone in obj.data.edit_bones:
-            if bone.tail.z:
-                bone.tail.z = 0
-            if bone.head.z:
-                bone.head.z = 0
-            if bone.roll:
-                bone.roll = 0
-    return 0.0001
+    if not obj or not obj.gd2db_object_2d or obj.type != 'ARMATURE':
+        return ARMATURE_IDLE_INTERVAL
+
+    edit_bones = obj.data.edit_bones
+    if len(edit_bones) != armature_bone_count or obj.data.use_mirror_x:
+        armature_bone_count = len(edit_bones)
+        bones = list(edit_bones)
+    else:
+        bones = [x for x in edit_bones if x.select or x.select_head or x.select_tail]
+
+    modified = False
+    for bone in bones:
+        if bone.tail.z:
+            bone.tail.z = 0
+            modified = True
+        if bone.head.z:
+            bone.head.z = 0
+            modified = True
+        if bone.roll:
+            bone.roll = 0
+            modified = True
+
+    # poll quickly while the checked bones are changing, back off while they aren't
+    bone_state = [(x.name, tuple(x.head), tuple(x.tail)) for x in bones]
+    if modified or bone_state != armature_bone_state:
+        armature_interval = ARMATURE_ACTIVE_INTERVAL
+    else:
+        armature_interval = min(max(armature_interval * 2, 0.001), ARMATURE_IDLE_INTERVAL)
+    armature_bone_state = bone_state
+    return armature_interval
+
+
+# handler that wakes the edit armature timer up as soon as the armature changes, so the first movement of a bone after
+# the armature has been idle is corrected without waiting for the backed off interval
+def gd2db_constraint_edit_armature_wake(_scene):
+    global armature_interval
+    if armature_interval == ARMATURE_ACTIVE_INTERVAL:
+        return
+    armature_interval = ARMATURE_ACTIVE_INTERVAL
+    # noinspection PyTypeChecker
+    if timer_registered(gd2db_constraint_edit_armature):
+        unregister_timer(gd2db_constraint_edit_armature)
+    register_timer(gd2db_constraint_edit_armature, first_interval=0)
@@ -0,0 +1,115 @@
+import numpy as np
+from array import array
+
+# the chunked export streams the text of large meshes, the arrays of the mesh are still read whole, a few bytes per
+# value, but the strings formatted from them, which take far more memory, are only built one chunk at a time
+# the memory budget decides which meshes are streamed and how large the chunks are, from the estimates below, it's not a
+# hard limit on the memory used by the export
+
+# rough number of bytes held per vertex by the regular mesh parsing, the bmesh, index maps, and string lists combined
+PARSED_VERTEX_BYTES = 1024
+
+# rough number of bytes held while formatting one value, the python float, its string, and its share of the joined text
+FORMATTED_VALUE_BYTES = 160
+
+# chunks are never made smaller than this, so tiny budgets don't turn the export into millions of writes
+MINIMUM_CHUNK = 1024
+
+
+# returns true if parsing the mesh the regular way is estimated to hold more memory than the budget allows
+def exceeds_memory_budget(mesh, memory_budget):
+    return memory_budget and len(mesh.vertices) * PARSED_VERTEX_BYTES > memory_budget
+
+
+# returns the number of items, with values_per_item values each, whose text is estimated to fit within the budget
+def chunk_size(memory_budget, values_per_item):
+    return max(MINIMUM_CHUNK, memory_budget // (FORMATTED_VALUE_BYTES * values_per_item))
+
+
+# reads a property of every item in a bpy_prop_collection with a single bulk read
+# foreach_get can't read a sub-range of a bpy_prop_collection, so the whole array is read
+def read_array(collection, attribute, size=1, dtype=np.float32):
+    values = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attribute, values)
+    return values.reshape(-1, size) if size > 1 else values
+
+
+# returns the blender index of every vertex in Godot's vertex order and the number of internal vertices
+# the vertices along the boundary of the mesh, walked from the boundary vertex with the lowest index, followed by the
+# rest in index order, the boundary is found from the edge users instead of a bmesh of the whole mesh
+# used by both the regular and the chunked export, so a mesh is exported the same way whether or not it's streamed
+def godot_vertex_order(mesh):
+    edges = read_array(mesh.edges, "vertices", size=2, dtype=np.int32)
+    edge_users = np.bincount(read_array(mesh.loops, "edge_index", dtype=np.int32), minlength=len(mesh.edges))
+    boundary_edges = edges[edge_users == 1]
+
+    # walk along the boundary, starting at the boundary vertex with the lowest index
+    boundary = []
+    if len(boundary_edges):
+        neighbours = {}
+        for first, second in boundary_edges.tolist():
+            neighbours.setdefault(first, []).append(second)
+            neighbours.setdefault(second, []).append(first)
+        walked = set()
+        vertex = min(neighbours)
+        while vertex is not None:
+            boundary.append(vertex)
+            walked.add(vertex)
+            vertex = next((x for x in neighbours[vertex] if x not in walked), None)
+
+    boundary = np.array(boundary, dtype=np.int32)
+    internal = np.setdiff1d(np.arange(len(mesh.vertices), dtype=np.int32), boundary)
+    return np.concatenate((boundary, internal)), len(internal)
+
+
+# returns the weights of the vertices for every bone as three arrays, the bone indices, the Godot vertex indices, and
+# the weights, sorted by bone and vertex
+# vertex groups can't be read in bulk, the groups of every vertex are walked in python, but the weights are gathered
+# into compact arrays instead of per bone string lists
+def bone_weight_arrays(obj, mesh, bone_names, godot_index):
+    bone_indices = {x: y for y, x in enumerate(bone_names)}
+    group_bones = {x.index: bone_indices[x.name] for x in obj.vertex_groups if x.name in bone_indices}
+
+    bones, vertices, weights = array("i"), array("i"), array("f")
+    for vertex in mesh.vertices:
+        for group_element in vertex.groups:
+            bone = group_bones.get(group_element.group)
+            if bone is not None:
+                bones.append(bone)
+                vertices.append(vertex.index)
+                weights.append(group_element.weight)
+
+    bones = np.frombuffer(bones, dtype=np.int32)
+    vertices = godot_index[np.frombuffer(vertices, dtype=np.int32)]
+    weights = np.frombuffer(weights, dtype=np.float32)
+    sort_order = np.lexsort((vertices, bones))
+    return bones[sort_order], vertices[sort_order], weights[sort_order]
+
+
+# yields the text of the items from 0 to count in chunks, separated by ", "
+# format_chunk returns the text of the items from start to end
+def chunked_text(count, size, format_chunk):
+    for start in range(0, count, size):
+        if start:
+            yield ", "
+        yield format_chunk(start, min(start + size, count))
+
+
+# a node string whose arrays are formatted in chunks while the scene is being written, so the text of a huge mesh never
+# has to be held in memory all at once
+# the string value is the first line of the node, which is all GodotSceneParser needs to place the node in the scene
+class StreamedNode(str):
+    def __new__(cls, header, sections):
+        node = super().__new__(cls, header)
+        node.sections = sections
+        return node
+
+    # writes the node to a file, sections are either strings or functions returning an iterable of strings
+    def write(self, file):
+        file.write(self)
+        for section in self.sections:
+            if isinstance(section, str):
+                file.write(section)
+            else:
+                for text in section():
+                    file.write(text)
@@ -0,0 +1,63 @@
+import bpy
+
+from bpy.app.handlers import persistent
+
+from .gd2db_image_metadata import image_dimensions
+from .gd2db_panel_state import keeps_panel_state
+
+
+# the items of the reference_empty and gd2db_texture_image enumerator properties, built once and kept until images or
+# objects change
+# Blender doesn't keep the strings of enumerator items returned by a callback, keeping the lists here also keeps them
+# alive while they're displayed
+reference_items = {}
+texture_items = None
+texture_image_count = 0
+
+
+# returns the enumerator items of the image empties of a scene that are "2d" objects and display an image with a size
+def reference_empty_items(scene):
+    key = scene.as_pointer()
+    if key not in reference_items:
+        reference_objects = [
+            x for x in scene.objects
+            if x.empty_display_type == 'IMAGE'
+            and x.gd2db_object_2d
+            and x.data is not None
+            and any(image_dimensions(x.data))
+        ]
+        if not reference_objects:
+            reference_items[key] = [("None", "Add Reference Image", "")]
+        else:
+            reference_items[key] = [(x.name, x.name, f"{x}") for x in reference_objects]
+    return reference_items[key]
+
+
+# returns the enumerator items of the images within the blender file
+def texture_image_items():
+    global texture_items, texture_image_count
+    if texture_items is None or texture_image_count != len(bpy.data.images):
+        texture_items = [("None", "None", "")] + [(x.name, x.name, "") for x in bpy.data.images]
+        texture_image_count = len(bpy.data.images)
+    return texture_items
+
+
+def invalidate_enum_items(*_args):
+    global texture_items
+    reference_items.clear()
+    texture_items = None
+
+
+# images changing, and the changes to the scene that change the panel state, e.g. adding, removing, or converting
+# objects, change the items
+@persistent
+def gd2db_enum_items_update(_scene, depsgraph):
+    if (reference_items or texture_items is not None) and not all(
+            not isinstance(x.id, bpy.types.Image) and keeps_panel_state(x) for x in depsgraph.updates
+    ):
+        invalidate_enum_items()
+
+
+@persistent
+def gd2db_enum_items_reset(_scene, *_args):
+    invalidate_enum_items()
@@ -0,0 +1,152 @@
+import bpy
+import numpy as np
+
+from .gd2db_handlers import suspended_depsgraph_handlers
+from .gd2db_export_cache import (
+    new_hasher,
+    hash_collection
+)
+
+
+# the names of the evaluated meshes of the exported objects, keyed by the object's name, with the key of the inputs
+# they were evaluated from, so repeated exports reuse them while the mesh, its weights, and its modifiers are unchanged
+# names are kept instead of the meshes, the meshes are freed when a file is loaded and replaced by undo and redo
+# the meshes have no users and are never saved with the blend file
+evaluated_meshes = {}
+
+
+# returns true if the object has modifiers, other than armatures, that change the exported mesh
+def has_evaluated_modifiers(obj):
+    return any(x.show_viewport and x.type != 'ARMATURE' for x in obj.modifiers)
+
+
+# returns the values of the settings of a modifier, objects referenced by the modifier, e.g. a mirror object, are
+# represented by their name and transforms
+def _modifier_values(modifier):
+    values = []
+    for prop in modifier.bl_rna.properties:
+        if prop.identifier in {"rna_type", "name"} or prop.type == 'COLLECTION':
+            continue
+        value = getattr(modifier, prop.identifier)
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.Object):
+                value = (value.name, [tuple(x) for x in value.matrix_world])
+            elif isinstance(value, bpy.types.ID):
+                value = value.name
+            else:
+                continue
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        values.append((prop.identifier, value))
+    return values
+
+
+# returns a digest of the vertex group weights of the object's mesh
+# vertex group weights can't be read in bulk, the digest is shared by the evaluation key and the cache key of the export
+def weight_digest(obj):
+    if not obj.vertex_groups:
+        return ""
+    hasher = new_hasher([(x.index, y.group, y.weight) for x in obj.data.vertices for y in x.groups])
+    return hasher.hexdigest()
+
+
+# returns a key that changes whenever anything the evaluated mesh of the object depends on changes
+def evaluation_key(obj, weights):
+    mesh = obj.data
+    hasher = new_hasher(
+        mesh.name,
+        [tuple(x) for x in obj.matrix_world],
+        [x.name for x in obj.vertex_groups],
+        [(x.type, _modifier_values(x)) for x in obj.modifiers],
+        weights
+    )
+    hash_collection(hasher, mesh.vertices, "co", size=3)
+    hash_collection(hasher, mesh.loops, "vertex_index", dtype=np.int32)
+    hash_collection(hasher, mesh.polygons, "loop_start", dtype=np.int32)
+    hash_collection(hasher, mesh.edges, "vertices", size=2, dtype=np.int32)
+    for uv_layer in mesh.uv_layers:
+        hash_collection(hasher, uv_layer.data, "uv", size=2)
+    return hasher.hexdigest()
+
+
+# evaluates the modifiers of the object into a new mesh, keeping the vertex groups and uv layers
+# the deformation of the armature is done by Godot, so armature modifiers are disabled while the mesh is evaluated, the
+# handlers of the addon are suspended meanwhile, so watch mode and the live link don't see it as an edit, and the
+# modifiers are enabled again whatever happens
+def _evaluate(obj):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    disabled_modifiers = []
+    with suspended_depsgraph_handlers():
+        try:
+            for modifier in obj.modifiers:
+                if modifier.type == 'ARMATURE' and modifier.show_viewport:
+                    modifier.show_viewport = False
+                    disabled_modifiers.append(modifier)
+            if disabled_modifiers:
+                depsgraph.update()
+            mesh = bpy.data.meshes.new_from_object(
+                obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph
+            )
+            mesh.name = f"GD2DB Evaluated {obj.name}"
+            return mesh
+        finally:
+            for modifier in disabled_modifiers:
+                modifier.show_viewport = True
+            if disabled_modifiers:
+                depsgraph.update()
+
+
+# returns the evaluated mesh with the name, if it still exists and nothing started using it
+def _evaluated_mesh(name):
+    mesh = bpy.data.meshes.get(name)
+    if mesh is None or mesh.users:
+        return None
+    return mesh
+
+
+# removes the evaluated meshes of objects that were renamed or deleted
+def _remove_stale_meshes():
+    object_names = {x.name for x in bpy.data.objects}
+    for name in [x for x in evaluated_meshes if x not in object_names]:
+        mesh = _evaluated_mesh(evaluated_meshes.pop(name)[1])
+        if mesh is not None:
+            bpy.data.meshes.remove(mesh)
+
+
+# returns the mesh that is exported for a mesh object
+# the original mesh, unless the user chose to export evaluated meshes and the object has modifiers
+# get_weights returns the weight_digest of the object, exports pass a memoized one they also use for their cache keys
+def export_mesh(obj, get_weights=None):
+    if not bpy.context.scene.godot_2d_bridge_tools.use_modifiers or not has_evaluated_modifiers(obj):
+        return obj.data
+
+    key = evaluation_key(obj, get_weights() if get_weights is not None else weight_digest(obj))
+    entry = evaluated_meshes.get(obj.name)
+    if entry is not None:
+        cached_key, mesh_name = entry
+        mesh = _evaluated_mesh(mesh_name)
+        if mesh is not None:
+            if cached_key == key:
+                return mesh
+            bpy.data.meshes.remove(mesh)
+
+    _remove_stale_meshes()
+    mesh = _evaluate(obj)
+    evaluated_meshes[obj.name] = (key, mesh.name)
+    return mesh
+
+
+# returns the evaluation key of the evaluated mesh of the object, or an empty string if it isn't evaluated
+# the weights of an evaluated mesh depend on the modifiers as well as the weights of the original mesh
+def cached_evaluation_key(obj):
+    entry = evaluated_meshes.get(obj.name)
+    return entry[0] if entry is not None else ""
+
+
+# removes every evaluated mesh
+def clear_evaluated_meshes():
+    for _key, mesh_name in evaluated_meshes.values():
+        mesh = _evaluated_mesh(mesh_name)
+        if mesh is not None:
+            bpy.data.meshes.remove(mesh)
+    evaluated_meshes.clear()
@@ -0,0 +1,87 @@
+import os
+import json
+import hashlib
+import numpy as np
+from .gd2db_utilities import addon_data_directory
+from .gd2db_chunked_mesh import read_array
+
+
+# bump this value whenever the layout of the cache file or the way node strings are parsed changes, so stale caches
+# written by older versions of the addon are discarded instead of being spliced into new scenes
+CACHE_FORMAT = 1
+CACHE_DIRECTORY = "GD2DB_cache"
+
+
+# returns the path of the cache file belonging to the supplied scene path
+# the cache is kept in its own folder, next to the GD2DB_textures folder, and the folder is marked with a .gdignore file
+# so Godot doesn't try to import it
+def cache_path(scene_path):
+    directory, scene_file = os.path.split(scene_path)
+    return os.path.join(directory, CACHE_DIRECTORY, f"{os.path.splitext(scene_file)[0]}.json")
+
+
+# returns a new hasher primed with the supplied values
+def new_hasher(*values):
+    hasher = hashlib.blake2b(digest_size=20)
+    hash_values(hasher, *values)
+    return hasher
+
+
+# feeds plain python values to the hasher
+def hash_values(hasher, *values):
+    hasher.update(repr(values).encode())
+
+
+# feeds the values of a property of every item in a bpy_prop_collection to the hasher using a single bulk read
+# size is the number of values per item, e.g. 3 for a vertex coordinate
+def hash_collection(hasher, collection, attribute, size=1, dtype=np.float32):
+    hasher.update(attribute.encode())
+    hasher.update(read_array(collection, attribute, size=size, dtype=dtype).tobytes())
+
+
+# stores the node strings parsed for each exported object, so objects that haven't changed since the last export to the
+# same scene can be spliced in from the cache instead of being parsed again
+class ExportCache:
+    def __init__(self, scene_path):
+        self.scene_path = scene_path
+        self.path = cache_path(scene_path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    # reads the cache file, any unreadable or outdated cache is treated as empty
+    def _load(self):
+        try:
+            with open(self.path, "r") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("format") == CACHE_FORMAT:
+            self.entries = data.get("entries", {})
+
+    # returns the cached node strings of an object if the stored key matches the supplied key, otherwise returns None
+    def get(self, name, key):
+        entry = self.entries.get(name)
+        if entry is not None and entry["key"] == key:
+            self.hits += 1
+            return entry["nodes"]
+        self.misses += 1
+        return None
+
+    # stores the node strings of an object under the supplied key
+    def store(self, name, key, nodes):
+        self.entries[name] = {"key": key, "nodes": list(nodes)}
+
+    # writes the cache file, entries of objects that no longer exist in the blend file are dropped
+    def save(self, existing_names=None):
+        if existing_names is not None:
+            self.entries = {x: y for x, y in self.entries.items() if x in existing_names}
+
+        try:
+            addon_data_directory(self.scene_path, CACHE_DIRECTORY)
+            with open(self.path, "w") as cache_file:
+                json.dump({"format": CACHE_FORMAT, "entries": self.entries}, cache_file)
+        except OSError:
+            # failing to write the cache should never fail the export itself
+            pass
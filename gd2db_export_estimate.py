@@ -0,0 +1,195 @@
+import bpy
+import os
+
+from .gd2db_utilities import (
+    export_history,
+    byte_size
+)
+
+from .gd2db_evaluated_mesh import has_evaluated_modifiers
+
+from .gd2db_scene_parsing import (
+    GodotSceneParser,
+    ObjectToExport
+)
+
+# average number of characters written for a value in a *.tscn file, separators included
+# floats are written with python's repr, which uses up to 17 significant digits
+FLOAT_BYTES = 20
+UNWEIGHTED_BYTES = 3
+
+# approximate size of the header and transform lines of a node, not counting its name and parents
+NODE_BYTES = 120
+BONE_NODE_BYTES = 280
+
+# used to estimate the export time when there is no export history to calibrate against
+DEFAULT_VERTEX_TIME = 0.00003
+DEFAULT_BONE_TIME = 0.002
+TEXTURE_SAVE_RATE = 50 * 1048576
+
+# estimates above these values are reported as warnings
+LARGE_SCENE_BYTES = 100 * 1048576
+LARGE_TEXTURE_SIZE = 8192
+
+
+# returns the average time spent per vertex of a mesh and per bone of an armature during the last exports of the scene
+# objects restored from the export cache are skipped, since their time doesn't depend on their size
+def _calibrated_rates(scene):
+    mesh_time, vertices, armature_time, bones = 0.0, 0, 0.0, 0
+    for statistics in export_history(scene):
+        totals = statistics["totals"]
+        mesh_time += totals["mesh_time"]
+        vertices += totals["vertices"]
+        armature_time += totals["armature_time"]
+        bones += totals["bones"]
+
+    vertex_time = mesh_time / vertices if vertices else DEFAULT_VERTEX_TIME
+    bone_time = armature_time / bones if bones else DEFAULT_BONE_TIME
+    return vertex_time, bone_time
+
+
+# returns the size of the file an image will be saved as, without loading the image's pixels
+def _texture_bytes(image, width, height):
+    if image.packed_file is not None:
+        return image.packed_file.size
+    path = bpy.path.abspath(image.filepath)
+    if path and os.path.isfile(path):
+        return os.path.getsize(path)
+    return width * height * 4
+
+
+# returns the estimated size of every array of a mesh's Polygon2D node and the number of elements in them
+def _mesh_arrays(mesh, godot_version, linked_bones):
+    vertex_count = len(mesh.vertices)
+    index_bytes = len(str(vertex_count)) + 2
+
+    # polygon and uv arrays hold two floats per vertex
+    elements = vertex_count * 2
+    size = vertex_count * 2 * FLOAT_BYTES
+    if mesh.uv_layers:
+        elements += vertex_count * 2
+        size += vertex_count * 2 * FLOAT_BYTES
+
+    # every polygon is written as an array of its vertex indices
+    if godot_version >= 3:
+        elements += len(mesh.loops)
+        size += len(mesh.loops) * index_bytes + len(mesh.polygons) * 24
+
+    # one weight per vertex for every bone of the linked armature, most vertices are weighted to a single bone
+    if linked_bones:
+        elements += vertex_count * linked_bones
+        size += vertex_count * ((linked_bones - 1) * UNWEIGHTED_BYTES + FLOAT_BYTES) + linked_bones * 64
+    return elements, size
+
+
+# returns the estimated arrays of the mesh that will be exported for a mesh object
+# the evaluated mesh is only read through a temporary mesh that is freed right away, so the estimate never adds meshes
+# to the blend file
+def _object_mesh_arrays(obj, godot_version, linked_bones):
+    if not bpy.context.scene.godot_2d_bridge_tools.use_modifiers or not has_evaluated_modifiers(obj):
+        return _mesh_arrays(obj.data, godot_version, linked_bones), len(obj.data.vertices)
+
+    evaluated_object = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    try:
+        mesh = evaluated_object.to_mesh()
+        return _mesh_arrays(mesh, godot_version, linked_bones), len(mesh.vertices)
+    finally:
+        evaluated_object.to_mesh_clear()
+
+
+# returns the armature linked to a mesh in the same way MeshObjectParser does
+def _linked_armature(obj, exportable_objects):
+    for modifier in obj.modifiers:
+        if modifier.type == 'ARMATURE' and modifier.object and modifier.object in exportable_objects:
+            return modifier.object
+    return None
+
+
+# estimates the cost of exporting the objects from cheap metadata, vertex, loop, and bone counts, and image sizes
+# nothing is parsed or written to disk, and no datablocks are created, meshes with modifiers are only evaluated if the
+# user exports evaluated meshes
+# returns a dictionary of the estimated values and a list of warnings
+def estimate_export(objects=None, scene_path=""):
+    parsing_instance = GodotSceneParser()
+    ObjectToExport.setup(parsing_instance)
+    if objects is None:
+        objects = ObjectToExport.exportable_objects
+    godot_version = parsing_instance.godot_version
+    vertex_time, bone_time = _calibrated_rates(bpy.context.scene)
+
+    estimate = {
+        "nodes": 0,
+        "elements": 0,
+        "scene_bytes": 0,
+        "texture_bytes": 0,
+        "time": 0.0
+    }
+    warnings = []
+    collections = set()
+    images = set()
+
+    for obj in objects:
+        object_parser = ObjectToExport(obj)
+        name_bytes = len(obj.name) + len(object_parser.parent_string)
+        for collection in object_parser.collections:
+            if collection.as_pointer() not in collections:
+                collections.add(collection.as_pointer())
+                estimate["nodes"] += 1
+                estimate["scene_bytes"] += NODE_BYTES + len(collection.name) * 2
+
+        if obj.type == 'MESH':
+            linked_armature = _linked_armature(obj, ObjectToExport.exportable_objects)
+            linked_bones = len(linked_armature.data.bones) if linked_armature is not None else 0
+            (elements, size), vertex_count = _object_mesh_arrays(obj, godot_version, linked_bones)
+            estimate["nodes"] += 1
+            estimate["elements"] += elements
+            estimate["scene_bytes"] += NODE_BYTES + name_bytes + size
+            estimate["time"] += vertex_count * vertex_time
+
+            # images shared by several meshes are only saved once
+            image = bpy.data.images.get(obj.gd2db_texture_image)
+            if image is not None and image.as_pointer() not in images:
+                images.add(image.as_pointer())
+                width, height = obj.gd2db_image_width, obj.gd2db_image_height
+                texture_bytes = _texture_bytes(image, width, height)
+                estimate["texture_bytes"] += texture_bytes
+                estimate["time"] += texture_bytes / TEXTURE_SAVE_RATE
+                if max(width, height) > LARGE_TEXTURE_SIZE:
+                    warnings.append(f"\"{image.name}\" is {width}x{height}")
+
+        elif obj.type == 'ARMATURE':
+            bones = len(obj.data.bones)
+            estimate["nodes"] += 1 + bones
+            estimate["scene_bytes"] += NODE_BYTES + name_bytes + sum(
+                BONE_NODE_BYTES + len(x.name) * 2 + name_bytes for x in obj.data.bones
+            )
+            estimate["time"] += bones * bone_time
+
+    # nodes of an existing scene are kept in the exported scene
+    if scene_path and os.path.isfile(scene_path):
+        estimate["scene_bytes"] += os.path.getsize(scene_path)
+
+    if estimate["scene_bytes"] > LARGE_SCENE_BYTES:
+        warnings.insert(0, f"The scene will be about {byte_size(estimate['scene_bytes'])}")
+    return estimate, warnings
+
+
+# returns the lines of the message shown to the user for an export estimate
+def estimate_message(estimate, warnings):
+    lines = [
+        f"Nodes: {estimate['nodes']}",
+        f"Array elements: {estimate['elements']}",
+        f"Scene size: ~{byte_size(estimate['scene_bytes'])}",
+        f"Texture size: ~{byte_size(estimate['texture_bytes'])}",
+        f"Export time: ~{estimate['time']:.1f}s"
+    ]
+    if warnings:
+        lines += ["", "Warnings:"] + warnings
+    return "\n".join(lines)
+
+
+# estimates the export of the objects that would be exported with the current settings
+def estimate_current_export():
+    properties = bpy.context.scene.godot_2d_bridge_tools
+    scene_path = "" if properties.collection_scenes else bpy.path.abspath(properties.godot_scene)
+    return estimate_export(scene_path=scene_path)
@@ -0,0 +1,124 @@
+import numpy as np
+
+from .gd2db_utilities import export_objects
+from .gd2db_evaluated_mesh import export_mesh
+from .gd2db_chunked_mesh import read_array
+
+# vertices closer than this, in blender units, are reported as duplicates
+DUPLICATE_DISTANCE = 0.00001
+
+# polygons with a smaller area, in square blender units, are reported as zero area polygons
+ZERO_AREA = 0.0000000001
+
+
+# returns the number of vertices that share their position with another vertex
+def _duplicate_vertices(coordinates):
+    if not len(coordinates):
+        return 0
+    quantized = np.round(coordinates / DUPLICATE_DISTANCE).astype(np.int64)
+    return len(quantized) - len(np.unique(quantized, axis=0))
+
+
+# returns the number of separate boundary loops and the number of vertices where more than two boundary edges meet
+# the boundary walk used by the export only follows one loop, and picks an arbitrary edge at vertices shared by several
+# boundary edges, so both leave part of the outline of the Polygon2D out of order
+def _boundary_loops(boundary_edges, vertex_count):
+    boundary_degree = np.bincount(boundary_edges.ravel(), minlength=vertex_count)
+    branching_vertices = int(np.count_nonzero(boundary_degree > 2))
+
+    # only the boundary is walked here, which is a small part of any dense mesh
+    neighbours = {}
+    for first, second in boundary_edges.tolist():
+        neighbours.setdefault(first, []).append(second)
+        neighbours.setdefault(second, []).append(first)
+    loops = 0
+    unvisited = set(neighbours)
+    while unvisited:
+        loops += 1
+        stack = [unvisited.pop()]
+        while stack:
+            for vertex in neighbours[stack.pop()]:
+                if vertex in unvisited:
+                    unvisited.remove(vertex)
+                    stack.append(vertex)
+    return loops, branching_vertices
+
+
+# returns the number of vertices that have no weight for any bone of the linked armature
+# vertex group weights can't be read in bulk, so this is the only check iterating over the vertices in python
+def _unweighted_vertices(obj, mesh, armature):
+    bone_groups = {x.index for x in obj.vertex_groups if x.name in armature.data.bones}
+    return sum(
+        1 for vertex in mesh.vertices
+        if not any(x.group in bone_groups and x.weight > 0 for x in vertex.groups)
+    )
+
+
+# returns a list of descriptions of the problems found in the geometry of a mesh object
+# the mesh that will be exported is checked, the evaluated mesh if the user exports modifiers
+def lint_mesh(obj, exportable_objects):
+    mesh = export_mesh(obj)
+    if not len(mesh.polygons):
+        return ["has no polygons"]
+    issues = []
+
+    coordinates = read_array(mesh.vertices, "co", size=3)
+    loop_vertices = read_array(mesh.loops, "vertex_index", dtype=np.int32)
+    loop_edges = read_array(mesh.loops, "edge_index", dtype=np.int32)
+    edges = read_array(mesh.edges, "vertices", size=2, dtype=np.int32)
+    areas = read_array(mesh.polygons, "area")
+
+    duplicate_vertices = _duplicate_vertices(coordinates)
+    if duplicate_vertices:
+        issues.append(f"{duplicate_vertices} duplicate vertices")
+
+    zero_area_polygons = int(np.count_nonzero(areas < ZERO_AREA))
+    if zero_area_polygons:
+        issues.append(f"{zero_area_polygons} zero area polygons")
+
+    loose_vertices = int(np.count_nonzero(np.bincount(loop_vertices, minlength=len(mesh.vertices)) == 0))
+    if loose_vertices:
+        issues.append(f"{loose_vertices} loose vertices")
+
+    # edges used by a single polygon are boundary edges, edges used by more than two polygons are non-manifold
+    edge_users = np.bincount(loop_edges, minlength=len(mesh.edges))
+    non_manifold_edges = int(np.count_nonzero(edge_users > 2))
+    if non_manifold_edges:
+        issues.append(f"{non_manifold_edges} non-manifold edges")
+    loops, branching_vertices = _boundary_loops(edges[edge_users == 1], len(mesh.vertices))
+    if loops > 1:
+        issues.append(f"{loops} boundary loops, only one is exported as the outline")
+    if branching_vertices:
+        issues.append(f"{branching_vertices} vertices joining more than two boundary edges")
+
+    # the armature linked to the mesh, in the same way MeshObjectParser finds it
+    for modifier in obj.modifiers:
+        if modifier.type == 'ARMATURE' and modifier.object and modifier.object in exportable_objects:
+            unweighted_vertices = _unweighted_vertices(obj, mesh, modifier.object)
+            if unweighted_vertices:
+                issues.append(f"{unweighted_vertices} vertices without bone weights")
+            break
+
+    return issues
+
+
+# checks the geometry of every mesh that will be exported
+# returns a dictionary of the names of objects with problems and the descriptions of those problems
+def lint_export_objects():
+    exportable_objects = list(export_objects())
+    report = {}
+    for obj in exportable_objects:
+        if obj.type == 'MESH':
+            issues = lint_mesh(obj, exportable_objects)
+            if issues:
+                report[obj.name] = issues
+    return report
+
+
+# returns the lint report as lines of text
+def lint_message(report):
+    lines = []
+    for name, issues in report.items():
+        lines.append(f"\"{name}\":")
+        lines += [f"    {x}" for x in issues]
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+from bpy.app.handlers import (
+    persistent,
+    depsgraph_update_post,
+    load_post,
+    save_post,
+    undo_post,
+    redo_post
+)
+
+from bpy.app.timers import register as register_timer
+from contextlib import contextmanager
+
+from .gd2db_registry import (
+    any_objects_2d,
+    gd2db_registry_reset,
+    gd2db_registry_update
+)
+from .gd2db_panel_state import (
+    gd2db_panel_state_update,
+    gd2db_panel_state_reset
+)
+from .gd2db_enum_items import (
+    gd2db_enum_items_update,
+    gd2db_enum_items_reset
+)
+
+
+# the handlers of the addon are only installed once a "2d" object exists, so Blender sessions that never use the addon
+# don't import the constraint, watch mode, and live link modules or run their handlers on every depsgraph update
+installed = False
+
+
+# returns the handler lists and the handlers installed in them
+# the modules are imported here, the first time the handlers are needed, instead of when the addon is registered
+def addon_handlers():
+    from .gd2db_2d_constraints import (
+        gd2db_constraint_changer,
+        gd2db_undo_redo_activator
+    )
+    from .gd2db_watch_mode import (
+        gd2db_watch_collector,
+        gd2db_watch_save
+    )
+    from .gd2db_live_link import (
+        gd2db_live_link_collector,
+        gd2db_live_link_rebuild,
+        gd2db_live_link_reset
+    )
+    return (
+        (depsgraph_update_post, gd2db_constraint_changer),
+        (depsgraph_update_post, gd2db_watch_collector),
+        (depsgraph_update_post, gd2db_live_link_collector),
+        (load_post, gd2db_live_link_reset),
+        (save_post, gd2db_watch_save),
+        (redo_post, gd2db_undo_redo_activator),
+        (undo_post, gd2db_undo_redo_activator),
+        (redo_post, gd2db_live_link_rebuild),
+        (undo_post, gd2db_live_link_rebuild)
+    )
+
+
+def install_handlers():
+    global installed
+    if installed:
+        return
+    for handler_list, handler in addon_handlers():
+        if handler not in handler_list:
+            handler_list.append(handler)
+    installed = True
+
+
+# removes the handlers and stops everything they started
+def uninstall_handlers():
+    global installed
+    if not installed:
+        return
+
+    from .gd2db_2d_constraints import remove_all_constraints
+    from .gd2db_watch_mode import stop_watch_mode
+    from .gd2db_live_link import stop_live_link
+
+    remove_all_constraints()
+    stop_watch_mode()
+    stop_live_link()
+    for handler_list, handler in addon_handlers():
+        if handler in handler_list:
+            handler_list.remove(handler)
+    installed = False
+
+
+# removes the depsgraph handlers of the addon for the duration of the with statement, and puts them back in the same
+# order, used while the export changes Blender data temporarily, so the changes aren't mistaken for edits by the user
+@contextmanager
+def suspended_depsgraph_handlers():
+    suspended = [(x, y) for x, y in enumerate(depsgraph_update_post) if y.__module__.startswith(__package__)]
+    for _index, handler in suspended:
+        depsgraph_update_post.remove(handler)
+    try:
+        yield
+    finally:
+        for index, handler in suspended:
+            if handler not in depsgraph_update_post:
+                depsgraph_update_post.insert(index, handler)
+
+
+# installs the handlers if the open blend file contains "2d" objects
+def install_handlers_if_needed():
+    if not installed and any_objects_2d():
+        install_handlers()
+
+
+# the only handlers installed when the addon is registered, the registry of "2d" objects, the panel state, and the
+# enumerator items are reset after loading a file, undo, and redo, and every loaded blend file is checked for "2d"
+# objects
+@persistent
+def gd2db_handler_installer(_scene, *_args):
+    install_handlers_if_needed()
+
+
+# bpy.data can't be accessed while the addon is being registered, so the blend file that is already open is checked as
+# soon as Blender is idle
+def gd2db_handler_installer_timer():
+    install_handlers_if_needed()
+    return None
+
+
+# returns the handler lists and the handlers installed when the addon is registered
+def installer_handlers():
+    return (
+        (load_post, gd2db_registry_reset),
+        (undo_post, gd2db_registry_reset),
+        (redo_post, gd2db_registry_reset),
+        (depsgraph_update_post, gd2db_registry_update),
+        (load_post, gd2db_panel_state_reset),
+        (undo_post, gd2db_panel_state_reset),
+        (redo_post, gd2db_panel_state_reset),
+        (depsgraph_update_post, gd2db_panel_state_update),
+        (load_post, gd2db_enum_items_reset),
+        (undo_post, gd2db_enum_items_reset),
+        (redo_post, gd2db_enum_items_reset),
+        (depsgraph_update_post, gd2db_enum_items_update),
+        (load_post, gd2db_handler_installer)
+    )
+
+
+def register_handler_installer():
+    for handler_list, handler in installer_handlers():
+        handler_list.append(handler)
+    register_timer(gd2db_handler_installer_timer, first_interval=0)
+
+
+def unregister_handler_installer():
+    for handler_list, handler in installer_handlers():
+        if handler in handler_list:
+            handler_list.remove(handler)
+    uninstall_handlers()
@@ -0,0 +1,90 @@
+import bpy
+import os
+from io import BytesIO
+from struct import (
+    unpack,
+    error as StructError
+)
+
+# JPEG markers of the frame headers holding the dimensions of the image, every SOF marker except DHT, JPG, and DAC
+_JPEG_FRAME_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# the dimensions read from image files, keyed by the path, modification time, and size of the file, or the name and size
+# of a packed file
+dimension_cache = {}
+
+
+# returns the width and height of a PNG, JPEG, GIF, or BMP file read from its header, or None for other formats
+def _header_dimensions(file):
+    header = file.read(26)
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return unpack(">II", header[16:24])
+    if header[:4] == b"GIF8":
+        return unpack("<HH", header[6:10])
+    if header[:2] == b"BM":
+        width, height = unpack("<ii", header[18:26])
+        return width, abs(height)
+    if header[:2] == b"\xff\xd8":
+        return _jpeg_dimensions(file)
+    return None
+
+
+# walks the segments of a JPEG file until the frame header, only the segment headers are read
+def _jpeg_dimensions(file):
+    file.seek(2)
+    while True:
+        marker = file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        # markers can be padded with any number of 0xFF bytes
+        while marker[1] == 0xFF:
+            marker = marker[1:] + file.read(1)
+            if len(marker) < 2:
+                return None
+        # markers without a segment
+        if 0xD0 <= marker[1] <= 0xD9 or marker[1] == 0x01:
+            continue
+        length = file.read(2)
+        if len(length) < 2:
+            return None
+        if marker[1] in _JPEG_FRAME_MARKERS:
+            height, width = unpack(">xHH", file.read(5))
+            return width, height
+        file.seek(unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+
+# returns the key and a function opening the file of an image, or None if the image isn't backed by a single file
+def _image_file(image):
+    if image.packed_file:
+        return (image.name, image.packed_file.size), lambda: BytesIO(image.packed_file.data)
+    if image.source != 'FILE':
+        return None
+    path = bpy.path.abspath(image.filepath, library=image.library)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (path, stat.st_mtime, stat.st_size), lambda: open(path, "rb")
+
+
+# returns the width and height of an image without loading its pixels if possible
+# images that are already loaded, or are generated, know their size, the dimensions of other images are read from the
+# header of their file, only images in formats without a supported header are loaded
+def image_dimensions(image):
+    if image.has_data:
+        return tuple(image.size)
+    if image.source == 'GENERATED':
+        return image.generated_width, image.generated_height
+
+    image_file = _image_file(image)
+    if image_file is not None:
+        key, open_file = image_file
+        if key not in dimension_cache:
+            try:
+                with open_file() as file:
+                    dimension_cache[key] = _header_dimensions(file)
+            except (OSError, StructError):
+                dimension_cache[key] = None
+        if dimension_cache[key] is not None:
+            return dimension_cache[key]
+    return tuple(image.size)
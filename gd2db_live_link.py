@@ -0,0 +1,322 @@
+import bpy
+import socket
+import numpy as np
+
+from bpy.app.handlers import persistent
+
+from bpy.app.timers import (
+    register as register_timer,
+    unregister as unregister_timer,
+    is_registered as timer_registered
+)
+
+from .gd2db_live_link_protocol import (
+    encode_transforms,
+    encode_vertices,
+    encode_weights
+)
+
+from .gd2db_watch_mode import objects_using_datablock
+from .gd2db_registry import objects_2d
+from .gd2db_utilities import godot_points
+from .gd2db_panel_state import keeps_panel_state
+from .gd2db_export_cache import (
+    new_hasher,
+    hash_collection
+)
+
+# how often the server accepts new connections and sends pending changes
+UPDATE_INTERVAL = 1 / 60
+
+
+# streams the vertices, weights, and transforms of changed "2d" objects to the companion Godot editor plugin
+# everything touching Blender data runs on the main thread in a timer, the sockets are non-blocking so the timer never
+# waits on a slow client
+class LiveLinkServer:
+    def __init__(self, port):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", port))
+        self.listener.listen()
+        self.listener.setblocking(False)
+
+        # outgoing bytes of every connected client
+        self.clients = {}
+
+        # the last values sent for every node, only values that differ from these are sent again
+        self.last_sent = {}
+
+        # Godot's vertex order of the mesh of every object, with a digest of the topology it was walked from, the
+        # boundary walk is only repeated when the topology changes
+        self.vertex_orders = {}
+
+        # the exportable objects the export state was set up with, None when objects were added, removed, or hidden,
+        # or the scene changed, since then
+        self.exported_objects = None
+
+        # names of the objects changed since the last update, and the subset of those whose geometry changed
+        self.dirty_object_names = set()
+        self.geometry_object_names = set()
+
+    def close(self):
+        for connection in self.clients:
+            connection.close()
+        self.clients = {}
+        self.listener.close()
+
+    # accepts every pending connection, new clients get a snapshot of every object
+    def _accept(self):
+        while True:
+            try:
+                connection, _address = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            connection.setblocking(False)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.clients[connection] = bytearray()
+            self.last_sent = {}
+            names = {x.name for x in objects_2d()}
+            self.dirty_object_names |= names
+            self.geometry_object_names |= names
+
+    # sends as much of the pending bytes as every client accepts and drops clients that disconnected
+    def _flush(self):
+        for connection, outgoing in list(self.clients.items()):
+            try:
+                # clients don't send anything, an empty read means the client closed the connection
+                if connection.recv(4096) == b"":
+                    raise ConnectionError
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                self._drop(connection)
+                continue
+
+            if not outgoing:
+                continue
+            try:
+                sent = connection.send(outgoing)
+                del outgoing[:sent]
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                self._drop(connection)
+
+    def _drop(self, connection):
+        connection.close()
+        del self.clients[connection]
+
+    def _broadcast(self, message):
+        for outgoing in self.clients.values():
+            outgoing += message
+
+    # returns the vertex indices of a mesh in Godot's vertex order
+    # evaluated meshes are new meshes after every change, so the order is kept per object and compared by the edges and
+    # loops of the mesh
+    def _vertex_order(self, object_parser):
+        mesh = object_parser.mesh
+        hasher = new_hasher(len(mesh.vertices))
+        hash_collection(hasher, mesh.edges, "vertices", size=2, dtype=np.int32)
+        hash_collection(hasher, mesh.loops, "vertex_index", dtype=np.int32)
+        topology = hasher.hexdigest()
+
+        name = object_parser.obj.name
+        if self.vertex_orders.get(name, (None,))[0] != topology:
+            vertex_index_map, _internal_vertex_count = object_parser._vertex_map_and_internal_vertex_count()
+            order = np.empty(len(vertex_index_map), dtype=np.int64)
+            order[np.fromiter(vertex_index_map.values(), dtype=np.int64)] = np.fromiter(
+                vertex_index_map.keys(), dtype=np.int64
+            )
+            self.vertex_orders[name] = (topology, order)
+        return self.vertex_orders[name][1]
+
+    # sets up the export state when the exportable objects changed, or an export replaced it, otherwise only the
+    # results memoized during the last update are discarded
+    def _setup_export(self, godot_scene_parser, object_to_export):
+        if self.exported_objects is None or object_to_export.exportable_objects is not self.exported_objects:
+            object_to_export.setup(godot_scene_parser())
+            self.exported_objects = object_to_export.exportable_objects
+
+            # the vertex orders of objects that are no longer exported
+            names = {x.name for x in self.exported_objects}
+            for name in [x for x in self.vertex_orders if x not in names]:
+                del self.vertex_orders[name]
+        else:
+            object_to_export.memo = {}
+
+    # returns the vertex coordinates of a mesh in Godot's 2d space and vertex order
+    def _vertex_coordinates(self, object_parser, order):
+        mesh = object_parser.mesh
+        coordinates = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coordinates)
+        coordinates = godot_points(coordinates.reshape(-1, 3)[order, :2], object_parser.pixels)
+        return coordinates.astype(np.float32).tobytes()
+
+    # returns the weights of every bone of the linked armature in Godot's vertex order
+    def _bone_weights(self, object_parser, order):
+        mesh = object_parser.mesh
+        godot_index = np.empty(len(order), dtype=np.int64)
+        godot_index[order] = np.arange(len(order))
+
+        bone_weights = {
+            bone.name: np.zeros(len(mesh.vertices), dtype=np.float32)
+            for bone in object_parser.linked_armature.pose.bones
+        }
+        group_names = [x.name for x in object_parser.obj.vertex_groups]
+        for vertex in mesh.vertices:
+            for group_element in vertex.groups:
+                weights = bone_weights.get(group_names[group_element.group])
+                if weights is not None:
+                    weights[godot_index[vertex.index]] = group_element.weight
+
+        pose_bones = object_parser.linked_armature.pose.bones
+        return [
+            (
+                "/".join([x.name for x in reversed(pose_bones[name].parent_recursive)] + [name]),
+                weights.tobytes()
+            )
+            for name, weights in bone_weights.items()
+        ]
+
+    # queues the message if its contents changed since they were last sent
+    def _send_if_changed(self, key, contents, encode):
+        if self.last_sent.get(key) != contents:
+            self.last_sent[key] = contents
+            self._broadcast(encode())
+
+    # gathers the changes of every dirty object and queues the messages for them
+    def push_changes(self):
+        if not self.dirty_object_names or not self.clients:
+            return
+
+        # mesh data is only written back to the object when leaving edit mode
+        if bpy.context.mode not in {'OBJECT', 'POSE'}:
+            return
+
+        # the export machinery is only imported when it's first used
+        from .gd2db_scene_parsing import (
+            GodotSceneParser,
+            ObjectToExport,
+            MeshObjectParser,
+            ArmatureObjectParser
+        )
+
+        self._setup_export(GodotSceneParser, ObjectToExport)
+
+        transforms = []
+        for obj in ObjectToExport.exportable_objects:
+            if obj.name not in self.dirty_object_names:
+                continue
+
+            if obj.type == 'MESH':
+                object_parser = MeshObjectParser(obj)
+                path = object_parser.node_path()
+                transforms.append((path, object_parser.relative_transform_values()))
+
+                if obj.name in self.geometry_object_names:
+                    order = self._vertex_order(object_parser)
+                    coordinates = self._vertex_coordinates(object_parser, order)
+                    self._send_if_changed(
+                        ("vertices", path), coordinates, lambda: encode_vertices(path, coordinates)
+                    )
+                    if object_parser.linked_armature is not None:
+                        bone_weights = self._bone_weights(object_parser, order)
+                        self._send_if_changed(
+                            ("weights", path), bone_weights, lambda: encode_weights(path, bone_weights)
+                        )
+
+            elif obj.type == 'ARMATURE':
+                object_parser = ArmatureObjectParser(obj)
+                transforms.append((object_parser.node_path(), object_parser.relative_transform_values()))
+                for bone in obj.pose.bones:
+                    parents, _rest_location, _rest_angle, position, angle = object_parser.bone2d_transform(bone)
+                    transforms.append((f"{parents}/{bone.name}", (position, angle, (bone.scale.x, bone.scale.y))))
+
+        self.dirty_object_names = set()
+        self.geometry_object_names = set()
+
+        # only the transforms that changed are sent, all of them in a single message
+        changed_transforms = []
+        for path, (position, rotation, scale) in transforms:
+            values = (position[0], position[1], rotation, scale[0], scale[1])
+            if self.last_sent.get(("transform", path)) != values:
+                self.last_sent[("transform", path)] = values
+                changed_transforms.append((path, values))
+        if changed_transforms:
+            self._broadcast(encode_transforms(changed_transforms))
+
+    def update(self):
+        self._accept()
+        self.push_changes()
+        self._flush()
+
+
+# the running server, if any
+server = None
+
+
+# collects the objects changed by every depsgraph update while the live link is running
+@persistent
+def gd2db_live_link_collector(_scene, depsgraph=None):
+    if server is None:
+        return
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    for update in depsgraph.updates:
+        if not keeps_panel_state(update):
+            server.exported_objects = None
+        datablock = update.id.original
+        names = objects_using_datablock(datablock)
+        server.dirty_object_names |= names
+        if update.is_updated_geometry or not isinstance(datablock, bpy.types.Object):
+            server.geometry_object_names |= names
+
+
+# undo and redo replace the objects, the export state is set up again with the new ones
+@persistent
+def gd2db_live_link_rebuild(_scene, *_args):
+    if server is not None:
+        server.exported_objects = None
+
+
+# the server is stopped when a new file is loaded, the live_link property of the loaded scenes is reset to match
+@persistent
+def gd2db_live_link_reset(_scene, *_args):
+    stop_live_link()
+    for scene in bpy.data.scenes:
+        if scene.godot_2d_bridge_tools.live_link:
+            scene.godot_2d_bridge_tools.live_link = False
+
+
+def gd2db_live_link_timer():
+    if server is None:
+        return None
+    server.update()
+    return UPDATE_INTERVAL
+
+
+# starts the server on the supplied port, returns an error message if the port can't be used
+def start_live_link(port):
+    global server
+
+    stop_live_link()
+    try:
+        server = LiveLinkServer(port)
+    except OSError as error:
+        return str(error)
+    # noinspection PyTypeChecker
+    if not timer_registered(gd2db_live_link_timer):
+        register_timer(gd2db_live_link_timer, persistent=True)
+    return ""
+
+
+def stop_live_link():
+    global server
+
+    # noinspection PyTypeChecker
+    if timer_registered(gd2db_live_link_timer):
+        unregister_timer(gd2db_live_link_timer)
+    if server is not None:
+        server.close()
+        server = None
@@ -0,0 +1,173 @@
+# message schema of the live link between Blender and the companion Godot editor plugin
+# this module doesn't import bpy, so it can be used, or run as a script, outside of Blender to test the live link
+#
+# every message starts with a 10 byte little-endian header:
+#   magic       4 bytes     b"GD2D"
+#   version     uint8       PROTOCOL_VERSION
+#   type        uint8       one of the MSG_* values below
+#   length      uint32      number of payload bytes following the header
+#
+# strings are utf-8 encoded and prefixed with their length as an uint16
+# node paths are relative to the root node of the scene, like the parent attribute of the nodes in a *.tscn file
+#
+# MSG_TRANSFORMS  uint16 count, then per node: path, float32 x, y, rotation, scale x, scale y
+#                 used for Polygon2D, Skeleton2D and Bone2D nodes, only nodes whose transform changed are included
+# MSG_VERTICES    path of a Polygon2D node, uint32 count, then count float32 x/y pairs in Godot's vertex order
+# MSG_WEIGHTS     path of a Polygon2D node, uint16 bone count, then per bone: bone path as used in the bones property
+#                 of the node, uint32 count, and count float32 weights in Godot's vertex order
+
+import struct
+import socket
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 6011
+
+MSG_TRANSFORMS = 1
+MSG_VERTICES = 2
+MSG_WEIGHTS = 3
+
+HEADER = struct.Struct("<4sBBI")
+MAGIC = b"GD2D"
+
+_TRANSFORM = struct.Struct("<5f")
+_UINT16 = struct.Struct("<H")
+_UINT32 = struct.Struct("<I")
+
+
+def _encode_string(string):
+    encoded = string.encode("utf-8")
+    return _UINT16.pack(len(encoded)) + encoded
+
+
+def _decode_string(payload, offset):
+    (length,) = _UINT16.unpack_from(payload, offset)
+    offset += _UINT16.size
+    return payload[offset:offset + length].decode("utf-8"), offset + length
+
+
+def _encode_message(message_type, payload):
+    return HEADER.pack(MAGIC, PROTOCOL_VERSION, message_type, len(payload)) + payload
+
+
+# transforms is a list of (path, (x, y, rotation, scale_x, scale_y)) tuples
+def encode_transforms(transforms):
+    payload = [_UINT16.pack(len(transforms))]
+    for path, values in transforms:
+        payload.append(_encode_string(path))
+        payload.append(_TRANSFORM.pack(*values))
+    return _encode_message(MSG_TRANSFORMS, b"".join(payload))
+
+
+# coordinates is any buffer of float32 x/y pairs, e.g. a numpy array with the float32 dtype
+def encode_vertices(path, coordinates):
+    coordinates = bytes(coordinates)
+    payload = _encode_string(path) + _UINT32.pack(len(coordinates) // 8) + coordinates
+    return _encode_message(MSG_VERTICES, payload)
+
+
+# bone_weights is a list of (bone_path, weights) tuples, weights being any buffer of float32 values
+def encode_weights(path, bone_weights):
+    payload = [_encode_string(path), _UINT16.pack(len(bone_weights))]
+    for bone_path, weights in bone_weights:
+        weights = bytes(weights)
+        payload.append(_encode_string(bone_path))
+        payload.append(_UINT32.pack(len(weights) // 4))
+        payload.append(weights)
+    return _encode_message(MSG_WEIGHTS, b"".join(payload))
+
+
+# returns the message type and a decoded payload
+#   MSG_TRANSFORMS  [(path, (x, y, rotation, scale_x, scale_y)), ...]
+#   MSG_VERTICES    (path, [(x, y), ...])
+#   MSG_WEIGHTS     (path, [(bone_path, [weight, ...]), ...])
+def decode_payload(message_type, payload):
+    if message_type == MSG_TRANSFORMS:
+        (count,) = _UINT16.unpack_from(payload, 0)
+        offset = _UINT16.size
+        transforms = []
+        for _ in range(count):
+            path, offset = _decode_string(payload, offset)
+            transforms.append((path, _TRANSFORM.unpack_from(payload, offset)))
+            offset += _TRANSFORM.size
+        return message_type, transforms
+
+    elif message_type == MSG_VERTICES:
+        path, offset = _decode_string(payload, 0)
+        (count,) = _UINT32.unpack_from(payload, offset)
+        offset += _UINT32.size
+        values = struct.unpack_from(f"<{count * 2}f", payload, offset)
+        return message_type, (path, list(zip(values[0::2], values[1::2])))
+
+    elif message_type == MSG_WEIGHTS:
+        path, offset = _decode_string(payload, 0)
+        (bone_count,) = _UINT16.unpack_from(payload, offset)
+        offset += _UINT16.size
+        bone_weights = []
+        for _ in range(bone_count):
+            bone_path, offset = _decode_string(payload, offset)
+            (count,) = _UINT32.unpack_from(payload, offset)
+            offset += _UINT32.size
+            bone_weights.append((bone_path, list(struct.unpack_from(f"<{count}f", payload, offset))))
+            offset += count * 4
+        return message_type, (path, bone_weights)
+
+    raise ValueError(f"Unknown live link message type {message_type}")
+
+
+# splits a byte stream into messages, leaving incomplete messages in the buffer
+# yields (message_type, payload) tuples
+def read_messages(buffer):
+    while len(buffer) >= HEADER.size:
+        magic, version, message_type, length = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != PROTOCOL_VERSION:
+            raise ValueError("Not a Godot 2d Bridge live link stream, or an unsupported protocol version")
+        if len(buffer) < HEADER.size + length:
+            return
+        payload = bytes(buffer[HEADER.size:HEADER.size + length])
+        del buffer[:HEADER.size + length]
+        yield message_type, payload
+
+
+# reference client, stands in for the Godot editor plugin when testing the live link
+class LiveLinkClient:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=None):
+        self.connection = socket.create_connection((host, port), timeout=timeout)
+        self.buffer = bytearray()
+
+    # yields decoded messages as they arrive, until the server closes the connection
+    def messages(self):
+        while True:
+            for message_type, payload in read_messages(self.buffer):
+                yield decode_payload(message_type, payload)
+            data = self.connection.recv(65536)
+            if not data:
+                return
+            self.buffer += data
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    argument_parser = ArgumentParser(description="Print the messages sent by the Godot 2d Bridge live link")
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arguments = argument_parser.parse_args()
+
+    names = {MSG_TRANSFORMS: "TRANSFORMS", MSG_VERTICES: "VERTICES", MSG_WEIGHTS: "WEIGHTS"}
+    client = LiveLinkClient(arguments.host, arguments.port)
+    try:
+        for received_type, received in client.messages():
+            if received_type == MSG_TRANSFORMS:
+                for node_path, transform in received:
+                    print(f"{names[received_type]:<10} {node_path} {transform}")
+            elif received_type == MSG_VERTICES:
+                print(f"{names[received_type]:<10} {received[0]} {len(received[1])} vertices")
+            else:
+                print(f"{names[received_type]:<10} {received[0]} {len(received[1])} bones")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
@@ -0,0 +1,141 @@
+import bpy
+from math import radians
+from mathutils import Matrix
+
+from .gd2db_utilities import rotate_around_point
+
+
+# returns the depth of an object in the parenting hierarchy
+def _parent_depth(obj):
+    depth = 0
+    while obj.parent:
+        depth += 1
+        obj = obj.parent
+    return depth
+
+
+# the object types whose data object.transform_apply transforms
+DATA_TYPES = {'MESH', 'ARMATURE', 'CURVE', 'SURFACE', 'FONT', 'LATTICE', 'META', 'GPENCIL'}
+
+
+# returns the error object.transform_apply reports for objects sharing their data, or None
+# the rotation of shared data can't be applied to one of its objects without rotating the others
+def multi_user_error(objects):
+    for obj in objects:
+        if obj.type in DATA_TYPES and obj.data.users > 1:
+            data_type = type(obj.data).__name__
+            return f"Cannot apply to a multi user: Object \"{obj.name}\", {data_type} \"{obj.data.name}\", aborting"
+    return None
+
+
+# returns true if the rotation of every object can be applied without the operator
+# Armature.transform doesn't exist in every Blender version the addon supports, and other object types are left to the
+# operator
+def _applies_directly(objects):
+    types = {'MESH', 'EMPTY'}
+    if hasattr(bpy.types.Armature, "transform"):
+        types.add('ARMATURE')
+    return all(x.type in types for x in objects)
+
+
+# applies the rotation of the selected objects with a single object.transform_apply call
+# Blender won't apply transforms to empties displaying images with multiple users, so their images are removed while
+# the operator runs
+def _apply_rotations_operator(objects):
+    images = [(x, x.data) for x in objects if x.type == 'EMPTY' and x.data is not None]
+    for obj, _image in images:
+        obj.data = None
+    try:
+        bpy.ops.object.transform_apply(location=False, scale=False, properties=False)
+    finally:
+        for obj, image in images:
+            obj.data = image
+
+
+# returns the matrix object.transform_apply transforms the data of an object by to apply its rotation
+# the rotation, including the delta rotation, corrected for the scale, which stays on the object, the local rotation and
+# scale of the object are R * S, the data is transformed by S^-1 * R * S
+def _applied_rotation_matrix(obj):
+    scale = Matrix.Diagonal([x * y for x, y in zip(obj.scale, obj.delta_scale)]).inverted_safe()
+    return (scale @ obj.matrix_basis.to_3x3()).to_4x4()
+
+
+def _clear_rotation(obj):
+    obj.rotation_euler = (0, 0, 0)
+    obj.delta_rotation_euler = (0, 0, 0)
+    obj.rotation_quaternion = (1, 0, 0, 0)
+    obj.delta_rotation_quaternion = (1, 0, 0, 0)
+    obj.rotation_axis_angle = (0, 0, 1, 0)
+
+
+# applies the rotation of the selected objects to their data, the same as object.transform_apply with only rotation, but
+# without an operator call, and the undo step and depsgraph evaluation of every object that comes with it
+# parents are applied before their children, and the children of every object are kept in place, the same way
+# transform_apply does, so children being converted as well end up without a rotation
+# selections with data that can't be transformed directly fall back to a single transform_apply call
+def apply_rotations(context, objects):
+    if not _applies_directly(objects):
+        _apply_rotations_operator(objects)
+        return
+
+    levels = {}
+    for obj in objects:
+        levels.setdefault(_parent_depth(obj), []).append(obj)
+
+    for depth in sorted(levels):
+        children = [(x, x.matrix_world.copy()) for obj in levels[depth] for x in obj.children]
+        for obj in levels[depth]:
+            if obj.type == 'MESH':
+                obj.data.transform(_applied_rotation_matrix(obj), shape_keys=True)
+            elif obj.type == 'ARMATURE':
+                obj.data.transform(_applied_rotation_matrix(obj))
+            _clear_rotation(obj)
+
+        # the world matrices of the objects are needed to keep their children in place
+        if children:
+            context.view_layer.update()
+        for child, matrix_world in children:
+            if child.parent_type == 'OBJECT':
+                child.matrix_basis = matrix_world
+                child.matrix_parent_inverse = child.parent.matrix_world.inverted_safe()
+            else:
+                child.matrix_world = matrix_world
+
+
+# moves the edit bones of the armatures to the x/y plane in a single multi-object edit mode session
+# every selected armature enters edit mode together with the active object, so other selected armatures are deselected
+# for the session
+def flatten_edit_bones(context, armatures):
+    view_layer = context.view_layer
+    converted = {x.as_pointer() for x in armatures}
+    other_armatures = [
+        x for x in context.selected_objects if x.type == 'ARMATURE' and x.as_pointer() not in converted
+    ]
+    for obj in other_armatures:
+        obj.select_set(False)
+    view_layer.objects.active = armatures[0]
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    try:
+        for obj in armatures:
+            for bone in obj.data.edit_bones:
+
+                # get the x/y coordinates of the head and tail of the edit bone and check if they're the same
+                # if they are the bone is rotated 90 degrees to prevent removing the bone when the z coordinates
+                # are zeroed
+                bone_head_x_y = bone.head.x, bone.head.y
+                bone_tail_x_y = bone.tail.x, bone.tail.y
+                if bone_head_x_y == bone_tail_x_y:
+                    bone_point = bone.head.x, bone.head.z
+                    new_tail_x_z = rotate_around_point((bone.tail.x, bone.tail.z), radians(90), bone_point)
+                    bone.tail.x, bone.tail.z = new_tail_x_z
+
+                # 0 the head, tail, and roll
+                bone.head.z = 0
+                bone.tail.z = 0
+                bone.roll = 0
+    finally:
+        # reset the mode to object mode
+        bpy.ops.object.mode_set(mode='OBJECT')
+        for obj in other_armatures:
+            obj.select_set(True)
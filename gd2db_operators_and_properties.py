@@ -1,4 +1,6 @@
 import bpy
+import os
+import numpy as np
 from time import perf_counter
 
 from bpy_types import (
@@ -11,6 +13,7 @@ from bpy.props import (
     StringProperty,
     BoolProperty,
     EnumProperty,
+    FloatProperty
 )
 
 from bpy_extras.io_utils import (
@@ -18,38 +21,67 @@ from bpy_extras.io_utils import (
     ExportHelper
 )
 
-from math import (
-    prod,
-    radians
-)
+from math import prod
 
 from .gd2db_utilities import (
-    rotate_around_point,
-    ProgressReporter
+    ProgressReporter,
+    rotate_points,
+    transform_points,
+    normalize_points
 )
 
-from .gd2db_2d_constraints import remove_all_constraints
-from .gd2db_scene_parsing import write_godot_scene
 from .gd2db_utilities import export_objects, custom_message_box
+from .gd2db_handlers import install_handlers, install_handlers_if_needed
+from .gd2db_panel_state import invalidate_panel_state
+from .gd2db_enum_items import reference_empty_items, invalidate_enum_items
+from .gd2db_image_metadata import image_dimensions
+from .gd2db_registry import (
+    any_objects_2d,
+    register_object_2d,
+    unregister_object_2d
+)
+from .gd2db_live_link_protocol import DEFAULT_PORT
+
+# the export, profiling, lint, watch mode, and live link modules are imported by the operators and properties that use
+# them, so registering the addon only imports what's needed to draw the panels
 
 
 # returns list of enumerator property items containing the name of empties within the scene that display images and
 # return true for the gd2db_object_2d object property.
+# the items are cached until images or objects change
 def available_references(_self, context):
-    reference_object_list = [
-        x for x in context.scene.objects
-        if x.empty_display_type == 'IMAGE'
-        and x.gd2db_object_2d
-        and x.data is not None
-        and any(x.data.size)
-    ]
-    if not reference_object_list:
-        return [("None", "Add Reference Image", "")]
+    return reference_empty_items(context.scene)
+
+
+# clears pending watch mode changes when watch mode is disabled
+def watch_mode_update(self, _context):
+    from .gd2db_watch_mode import stop_watch_mode
+
+    if self.watch_mode:
+        install_handlers()
+    else:
+        stop_watch_mode()
+
+
+# frees the evaluated meshes when the user stops exporting them
+def use_modifiers_update(self, _context):
+    if not self.use_modifiers:
+        from .gd2db_evaluated_mesh import clear_evaluated_meshes
+        clear_evaluated_meshes()
+
+
+# starts or stops the live link server when the live_link property changes
+def live_link_update(self, _context):
+    from .gd2db_live_link import start_live_link, stop_live_link
+
+    if self.live_link:
+        install_handlers()
+        error = start_live_link(self.live_link_port)
+        if error:
+            self.live_link = False
+            custom_message_box(message=f"Live link could not be started: {error}", title="Live Link", icon='ERROR')
     else:
-        reference_property_list = []
-        for ref in reference_object_list:
-            reference_property_list.append((ref.name, ref.name, f"{ref}"))
-        return reference_property_list
+        stop_live_link()
 
 
 class Godot2dBridgeProperties(PropertyGroup):
@@ -74,7 +106,126 @@ class Godot2dBridgeProperties(PropertyGroup):
 
     selected: BoolProperty(
         name="Selected",
-        description="Export selected objects only"
+        description="Export selected objects only",
+        update=invalidate_panel_state
+    )
+
+    use_export_cache: BoolProperty(
+        name="Cache",
+        default=True,
+        description="Reuse the nodes of objects that haven't changed since the last export to the same scene"
+    )
+
+    write_trace: BoolProperty(
+        name="Trace",
+        description="Write a Chrome trace of every export to a GD2DB_traces folder next to the exported scene. "
+                    "Open it with chrome://tracing or ui.perfetto.dev to see the time spent in each step"
+    )
+
+    collection_scenes: BoolProperty(
+        name="Scene per Collection",
+        description="Export every top-level collection to its own scene, named after the collection, "
+                    "in the folder of the chosen file. Objects outside of collections are exported to a scene "
+                    "named after the Blender scene"
+    )
+
+    lint_geometry: BoolProperty(
+        name="Lint Geometry",
+        default=False,
+        description="Check the exported meshes for duplicate and loose vertices, zero area polygons, broken outlines, "
+                    "and unweighted vertices before exporting"
+    )
+
+    lint_blocks_export: BoolProperty(
+        name="Block Export",
+        default=False,
+        description="Cancel the export if the geometry check finds any problems"
+    )
+
+    use_modifiers: BoolProperty(
+        name="Apply Modifiers",
+        default=False,
+        update=use_modifiers_update,
+        description="Export meshes with their modifiers applied, armature modifiers are left to Godot"
+    )
+
+    chunked_export: BoolProperty(
+        name="Chunked Export",
+        default=False,
+        description="Write the text of meshes estimated to be too large for the memory budget in chunks. The arrays "
+                    "of the mesh are still read whole, only the text formatted from them is bounded"
+    )
+
+    memory_budget: IntProperty(
+        name="Budget (MB)",
+        min=16,
+        default=256,
+        description="Estimated memory the parsing of a single mesh may use before it's written in chunks, and the "
+                    "size of the text of each chunk"
+    )
+
+    watch_mode: BoolProperty(
+        name="Watch",
+        update=watch_mode_update,
+        description="Automatically re-export changed 2d objects into the chosen Godot scene"
+    )
+
+    watch_interval: FloatProperty(
+        name="Delay",
+        min=0.0,
+        default=1.0,
+        description="Seconds without changes before changed objects are re-exported. "
+                    "With a delay of 0 changed objects are only re-exported when the file is saved"
+    )
+
+    live_link: BoolProperty(
+        name="Live Link",
+        update=live_link_update,
+        description="Stream changes of 2d objects to the Godot 2d Bridge editor plugin of a running Godot editor"
+    )
+
+    # noinspection PyTypeChecker
+    progress_output: EnumProperty(
+        items=[
+            ("CONSOLE", "Console", "Print progress bars to the system console"),
+            ("WINDOW_MANAGER", "Cursor", "Show the total progress at the cursor"),
+            ("STATUS_BAR", "Status Bar", "Show the current step and its progress in the status bar"),
+            ("JSON_LOG", "Log", "Append the start and end of every step to a json log file"),
+        ],
+        name="Progress",
+        options={'ENUM_FLAG'},
+        default={'CONSOLE', 'WINDOW_MANAGER'},
+        description="Where the progress of exports and other long operations is reported, "
+                    "none disables progress reporting"
+    )
+
+    progress_log: StringProperty(
+        name="Log",
+        subtype='FILE_PATH',
+        default="//gd2db_progress.jsonl",
+        description="File the progress log is appended to"
+    )
+
+    export_history: StringProperty(
+        name="",
+        options={'HIDDEN'},
+        description="Statistics of the last exports, stored as json"
+    )
+
+    export_history_length: IntProperty(
+        name="Exports",
+        min=1,
+        max=50,
+        default=5,
+        description="Number of exports kept in the export statistics"
+    )
+
+    live_link_port: IntProperty(
+        name="Port",
+        min=1024,
+        max=65535,
+        default=DEFAULT_PORT,
+        description="Local port the Godot editor plugin connects to"
     )
 
     # noinspection PyTypeChecker
@@ -84,6 +235,16 @@ class Godot2dBridgeProperties(PropertyGroup):
         description="Chose an image empty to apply"
     )
 
+    sculpt_constraint: EnumProperty(
+        name="Sculpt",
+        items=[
+            ('SAMPLE', "Every Sample", "Flatten the mesh on every sample of a sculpt stroke"),
+            ('STROKE', "Stroke End", "Flatten the mesh once a sculpt stroke ends, sculpting dense meshes stays smooth")
+        ],
+        default='SAMPLE',
+        description="When the vertices of \"2d\" meshes are moved back to the xy plane while sculpting"
+    )
+
     mode_updater: StringProperty(
         name="",
         default="init",
@@ -104,7 +265,8 @@ class Godot2dBridgeProperties(PropertyGroup):
         ],
         name="",
         description="Chose the version of Godot to export the scene for",
-        default="7"
+        default="7",
+        update=invalidate_panel_state
     )
 
 
@@ -113,6 +275,42 @@ def normalize_2d_coordinates(co, min_co, max_co):
     return (co[0] - min_co[0]) / (max_co[0] - min_co[0]), (co[1] - min_co[1]) / (max_co[1] - min_co[1])
 
 
+# returns the uvs of every loop of a mesh, the x/y world coordinates of the loop's vertex, rotated by angle around point
+# and normalized to the min and max coordinates, as a flat array for foreach_set
+# the coordinates are transformed once per vertex and gathered for the loops afterwards
+def aligned_uvs(mesh, matrix_world, angle, point, min_co, max_co):
+    coordinates = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coordinates)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+
+    coordinates = transform_points(coordinates.reshape(-1, 3), matrix_world)
+    uvs = normalize_points(rotate_points(coordinates, angle, point), min_co, max_co)
+    return uvs[loop_vertices].astype(np.float32).ravel()
+
+
+# the nodes of the material built by the apply material operator
+APPLIED_MATERIAL_NODES = (
+    'ShaderNodeOutputMaterial',
+    'ShaderNodeMixShader',
+    'ShaderNodeBsdfTransparent',
+    'ShaderNodeInvert',
+    'ShaderNodeTexImage'
+)
+
+
+# returns true if the node tree of a material is the one built by the apply material operator for the image
+def material_is_current(material, image):
+    nodes = material.node_tree.nodes
+    textures = [x for x in nodes if x.bl_idname == 'ShaderNodeTexImage']
+    return (
+        sorted(x.bl_idname for x in nodes) == sorted(APPLIED_MATERIAL_NODES)
+        and len(material.node_tree.links) == 6
+        and textures[0].image == image
+        and textures[0].extension == 'CLIP'
+    )
+
+
 # allows the user to select a godot scene that new objects will be imported into
 # noinspection PyPep8Naming
 class GODOT_2D_BRIDGE_OT_scene_selection(Operator, ImportHelper):
@@ -167,7 +365,8 @@ class GODOT_2D_BRIDGE_OT_apply_material(Operator):
         # used to align the active uv of a mesh object to the relative position of the image empty
         def align_uv(object_to_align):
             # calculate the ratio of the image resolutions to the highest resolution axis
-            image_ratios = tuple(x / max(empty.data.size) for x in empty.data.size)
+            image_size = image_dimensions(empty.data)
+            image_ratios = tuple(x / max(image_size) for x in image_size)
 
             # calculate the min and max positions of uv points within the uv space
             min_position = (x * empty.empty_display_size for x in empty.empty_image_offset)
@@ -183,19 +382,14 @@ class GODOT_2D_BRIDGE_OT_apply_material(Operator):
             else:
                 active_uv = object_to_align.data.uv_layers.new(name="UVMap")
 
-            # iterate through object loops to get the vertex index for the associated uv point
+            # the uv of every loop is the normalized x/y coordinate of its vertex, relative to the rotation of the
+            # empty, computed for all vertices at once and written with a single bulk write
             reporting_instance.start_sub_job()
-            for loop in object_to_align.data.loops:
-                reporting_instance.update()
-                reporting_instance.adjust_update_rate()
-
-                # get the x/y coordinate of the vertex relative to the rotation of the empty
-                vertex_co = (object_to_align.matrix_world @ object_to_align.data.vertices[loop.vertex_index].co)[0:2]
-                vertex_co = rotate_around_point(vertex_co, -empty.rotation_euler.z, point=(empty.location[0:2]))
-
-                # normalize the vertex coordinate to the min and max positions of the uv and assign them to the uv
-                uv_point = active_uv.data[loop.index].uv
-                uv_point.x, uv_point.y = normalize_2d_coordinates(vertex_co, min_position, max_position)
+            active_uv.data.foreach_set("uv", aligned_uvs(
+                object_to_align.data, object_to_align.matrix_world, -empty.rotation_euler.z, empty.location[0:2],
+                min_position, max_position
+            ))
+            reporting_instance.advance(len(object_to_align.data.loops))
             reporting_instance.end_sub_job()
             return
 
@@ -205,19 +399,9 @@ class GODOT_2D_BRIDGE_OT_apply_material(Operator):
             # materials or materials created by other plugins or scripts
             name = f"GD2DB: Material \"{empty.data.name}\""
 
-            # used to check if the material exists
-            def material_exists():
-                exists = False
-                for mat in bpy.data.materials:
-                    if mat.name == name:
-                        exists = True
-                        break
-                return exists
-
             # if the material exists perform the operation on that material, otherwise, create a new material
-            if material_exists():
-                material = bpy.data.materials[name]
-            else:
+            material = bpy.data.materials.get(name)
+            if material is None:
                 material = bpy.data.materials.new(name=name)
 
             # ensure use_nodes is set to true, change the blend_to alpha clip, set the threshold to 0.5, and get the
@@ -228,6 +412,10 @@ class GODOT_2D_BRIDGE_OT_apply_material(Operator):
             nodes = material.node_tree.nodes
             links = material.node_tree.links
 
+            # the node tree built by a previous application of the same image is kept as it is
+            if material_is_current(material, empty.data):
+                return material
+
             # clear all existing nodes
             nodes.clear()
 
@@ -261,9 +449,13 @@ class GODOT_2D_BRIDGE_OT_apply_material(Operator):
             # create the material and get the image
             new_material = create_material()
             image = empty.data
+            image_size = image_dimensions(image)
 
+            # objects sharing a mesh share its uvs, the uvs of each mesh are only aligned once, to the last of its
+            # objects, which is the alignment that was kept when every object was aligned in turn
+            objects_to_align = list({x.data.as_pointer(): x for x in objects_to_apply}.values())
             reporting_instance = ProgressReporter(
-                "UV UPDATING", [x.name for x in objects_to_apply], [len(x.data.loops) for x in objects_to_apply]
+                "UV UPDATING", [x.name for x in objects_to_align], [len(x.data.loops) for x in objects_to_align]
             )
 
             # iterate through objects_to_apply, apply the new_material to active_material for each object,
@@ -271,8 +463,9 @@ class GODOT_2D_BRIDGE_OT_apply_material(Operator):
             for obj in objects_to_apply:
                 obj.active_material = new_material
                 obj.gd2db_texture_image = image.name
-                obj.gd2db_image_width = image.size[0]
-                obj.gd2db_image_height = image.size[1]
+                obj.gd2db_image_width = image_size[0]
+                obj.gd2db_image_height = image_size[1]
+            for obj in objects_to_align:
                 align_uv(obj)
         return {'FINISHED'}
 
@@ -287,35 +480,48 @@ class GODOT_2D_BRIDGE_OT_2d_object_toggle(Operator):
 
     # noinspection PyMethodMayBeStatic
     def execute(self, context):
+        from .gd2db_2d_constraints import flatten_mesh
+        from .gd2db_object_conversion import (
+            multi_user_error,
+            apply_rotations,
+            flatten_edit_bones
+        )
+
         # filter mesh, armature, and image empty object types from the selected objects list
-        objects_to_apply = (
+        objects_to_apply = [
             x for x in context.selected_objects
             if x.type == 'MESH'
             or x.type == 'ARMATURE'
             or x.empty_display_type == 'IMAGE'
-        )
+        ]
+        objects_to_convert = [x for x in objects_to_apply if not x.gd2db_object_2d]
+
+        # the rotation is applied to every selected object, the same as transform_apply, as long as any object is
+        # converted
+        # the rotation of shared data can't be applied, nothing is converted, the same as when transform_apply refuses
+        objects_to_rotate = context.selected_editable_objects if objects_to_convert else []
+        error = multi_user_error(objects_to_rotate)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
 
         # operator needs to change the active object to change the position of edit bones, so the currently active
         # object is saved to a variable for reapplication at the end of the operator
         active_object = context.view_layer.objects.active
 
+        # apply rotation of every selected object at once, empties have no data to apply it to, their rotation is
+        # cleared
+        if objects_to_rotate:
+            apply_rotations(context, objects_to_rotate)
+
         # iterate through objects_to_apply and check the gd2db_object_2d property to determine which actions to take
         for obj in objects_to_apply:
             if not obj.gd2db_object_2d:
 
-                # apply rotation, Blender won't apply transforms to empties displaying images with multiple users,
-                # so the image is removed from the empty and reapplied to get around this
-                if obj.type == 'EMPTY':
-                    current_image = obj.data
-                    obj.data = None
-                    bpy.ops.object.transform_apply(location=False, scale=False, properties=False)
-                    obj.data = current_image
-                else:
-                    bpy.ops.object.transform_apply(location=False, scale=False, properties=False)
-
                 # set the gd2db_object_2d property to true to indicate to the rest of the addon this object is a "2d"
                 # object, set the rotation mode to xyz euler, 0 the z location, and set the z scale to 1
                 obj['gd2db_object_2d'] = True
+                register_object_2d(obj)
                 obj.rotation_mode = 'XYZ'
                 obj.location.z = 0
                 obj.scale.z = 1
@@ -327,16 +533,15 @@ class GODOT_2D_BRIDGE_OT_2d_object_toggle(Operator):
                 obj.lock_location[2] = True
 
                 # check if the object is a mesh or an armature, if it's a mesh then create texture image properties, and
-                # 0 the z coordinates of vertices
+                # 0 the z coordinates of vertices with a single bulk write
                 if obj.type == 'MESH':
                     obj.gd2db_texture_image = "None"
                     obj.gd2db_image_width = 500
                     obj.gd2db_image_height = 500
-                    for vert in obj.data.vertices:
-                        vert.co.z = 0
+                    flatten_mesh(obj.data)
 
-                # if the object is an armature then iterate through its pose and edit bones and set there position and
-                # rotation to the x/y plane
+                # if the object is an armature then iterate through its pose bones and set there position and rotation
+                # to the x/y plane, the edit bones of all armatures are moved together afterwards
                 elif obj.type == 'ARMATURE':
                     for bone in obj.pose.bones:
                         # change the pose bone's rotation mode to xyz euler, 0 the bones z location and x/y rotation,
@@ -352,44 +557,31 @@ class GODOT_2D_BRIDGE_OT_2d_object_toggle(Operator):
                         bone.lock_scale[2] = True
                         bone.lock_rotation[0] = True
                         bone.lock_rotation[1] = True
-
-                    # change the active object to the armature and put it in edit mode
-                    context.view_layer.objects.active = obj
-                    bpy.ops.object.mode_set(mode='EDIT')
-
-                    edit_bones = obj.data.edit_bones
-                    for bone in edit_bones:
-
-                        # get the x/y coordinates of the head and tail of the edit bone and check if they're the same
-                        # if they are the bone is rotated 90 degrees to prevent removing the bone when the z coordinates
-                        # are zeroed
-                        bone_head_x_y = bone.head.x, bone.head.y
-                        bone_tail_x_y = bone.tail.x, bone.tail.y
-                        if bone_head_x_y == bone_tail_x_y:
-                            bone_point = bone.head.x, bone.head.z
-                            new_tail_x_z = rotate_around_point((bone.tail.x, bone.tail.z), radians(90), bone_point)
-                            bone.tail.x, bone.tail.z = new_tail_x_z
-
-                        # 0 the head, tail, and roll
-                        bone.head.z = 0
-                        bone.tail.z = 0
-                        bone.roll = 0
-
-                    # reset the mode to object mode
-                    bpy.ops.object.mode_set(mode='OBJECT')
             else:
                 # remove the plugin related properties, the plugin will no longer recognize this object as a "2d" object
                 # and all locked properties can now be changed by the user
                 del obj["gd2db_object_2d"]
+                unregister_object_2d(obj)
                 if obj.type == 'MESH':
                     del obj["gd2db_texture_image"]
                     del obj["gd2db_image_width"]
                     del obj["gd2db_image_height"]
 
+        # move the edit bones of every converted armature to the x/y plane in one edit mode session
+        armatures_to_convert = [x for x in objects_to_convert if x.type == 'ARMATURE']
+        if armatures_to_convert:
+            flatten_edit_bones(context, armatures_to_convert)
+
         # reset the active object and remove all constraint handlers and timers
+        # the handlers are installed when the first "2d" object is created
         context.view_layer.objects.active = active_object
-        if not any((x.gd2db_object_2d for x in bpy.data.objects)):
+        invalidate_panel_state()
+        invalidate_enum_items()
+        if not any_objects_2d():
+            from .gd2db_2d_constraints import remove_all_constraints
             remove_all_constraints()
+        else:
+            install_handlers_if_needed()
         return {'FINISHED'}
 
 
@@ -404,10 +596,69 @@ class GODOT_2D_BRIDGE_OT_export(Operator, ExportHelper):
     filename_ext = ".tscn"
     filter_glob: StringProperty(default="*.tscn", options={'HIDDEN'})
 
-    def execute(self, _context):
+    dry_run: BoolProperty(
+        name="Dry Run",
+        default=False,
+        options={'SKIP_SAVE'},
+        description="Estimate the size and duration of the export without writing anything"
+    )
+
+    # a dry run doesn't need a file to export to
+    def invoke(self, context, event):
+        if self.dry_run:
+            return self.execute(context)
+        return super().invoke(context, event)
+
+    def execute(self, context):
+        # estimate the export and report it instead of exporting
+        if self.dry_run:
+            from .gd2db_export_estimate import estimate_current_export, estimate_message
+            estimate, warnings = estimate_current_export()
+            custom_message_box(
+                message=estimate_message(estimate, warnings),
+                title="Export Estimate",
+                icon='ERROR' if warnings else 'INFO'
+            )
+            return {'FINISHED'}
+
+        from .gd2db_scene_parsing import write_godot_scene, write_godot_collection_scenes
+        from .gd2db_geometry_lint import lint_export_objects, lint_message
+
+        # check the geometry of the exported meshes
+        # noinspection PyUnresolvedReferences
+        if context.scene.godot_2d_bridge_tools.lint_geometry:
+            lint_report = lint_export_objects()
+            if lint_report:
+                # noinspection PyUnresolvedReferences
+                if context.scene.godot_2d_bridge_tools.lint_blocks_export:
+                    custom_message_box(message=lint_message(lint_report), title="Export Canceled", icon='ERROR')
+                    return {'CANCELLED'}
+                print(f"\nGeometry problems:\n{lint_message(lint_report)}")
+                self.report({'WARNING'}, f"Geometry problems found in {len(lint_report)} object(s), see the console")
+
         # get the start time of the export process
         export_start_time = perf_counter()
 
+        # export every top-level collection to its own scene if the user chose to
+        # noinspection PyUnresolvedReferences
+        if context.scene.godot_2d_bridge_tools.collection_scenes:
+            # noinspection PyUnresolvedReferences
+            result = write_godot_collection_scenes(os.path.dirname(self.filepath))
+            if result is not None:
+                written_scenes, split_meshes = result
+                custom_message_box(
+                    message=f"{len(written_scenes)} scene(s) successfully exported in "
+                            f"{perf_counter() - export_start_time:05.2f}s.",
+                    title="Success!",
+                    icon='INFO'
+                )
+                if split_meshes:
+                    self.report(
+                        {'WARNING'},
+                        f"{len(split_meshes)} mesh(es) exported to another scene than their armature, see the console"
+                    )
+            return {'FINISHED'}
+
         # use the gd2db_scene_parsing module to write a new *.tscn file
         # noinspection PyUnresolvedReferences
         export_success = write_godot_scene(self.filepath)
@@ -430,3 +681,59 @@ class GODOT_2D_BRIDGE_OT_export(Operator, ExportHelper):
                 icon='INFO'
             )
         return {'FINISHED'}
+
+
+# checks the geometry of the meshes that will be exported and reports the problems found
+# noinspection PyPep8Naming
+class GODOT_2D_BRIDGE_OT_lint(Operator):
+    bl_label = ""
+    bl_idname = "gd2db.lint"
+    bl_description = "Check the geometry of the meshes that will be exported"
+
+    # noinspection PyMethodMayBeStatic
+    def execute(self, _context):
+        from .gd2db_geometry_lint import lint_export_objects, lint_message
+
+        lint_report = lint_export_objects()
+        if lint_report:
+            custom_message_box(message=lint_message(lint_report), title="Geometry Problems", icon='ERROR')
+        else:
+            custom_message_box(message="No problems found.", title="Geometry Check", icon='INFO')
+        return {'FINISHED'}
+
+
+# clears the export statistics of the scene
+# noinspection PyPep8Naming
+class GODOT_2D_BRIDGE_OT_clear_history(Operator):
+    bl_label = ""
+    bl_idname = "gd2db.clear_history"
+    bl_options = {'REGISTER', "UNDO"}
+    bl_description = "Clear the export statistics"
+
+    # noinspection PyMethodMayBeStatic
+    def execute(self, context):
+        context.scene.godot_2d_bridge_tools.export_history = ""
+        return {'FINISHED'}
+
+
+# runs the export with cProfile and tracemalloc, saves the profile and a peak memory snapshot next to the exported
+# scene, and shows the hottest functions and largest allocations in a popup
+# noinspection PyPep8Naming
+class GODOT_2D_BRIDGE_OT_profile_export(Operator, ExportHelper):
+    bl_label = "Profile Export"
+    bl_idname = "gd2db.profile"
+    bl_description = "Export objects to a *.tscn file while recording a profile to find out why an export is slow"
+
+    # set the filename extension and filter for ExportHelper
+    filename_ext = ".tscn"
+    filter_glob: StringProperty(default="*.tscn", options={'HIDDEN'})
+
+    def execute(self, _context):
+        from .gd2db_scene_parsing import write_godot_scene
+        from .gd2db_profiling import profile_call
+
+        # noinspection PyUnresolvedReferences
+        export_success, summary = profile_call(self.filepath, write_godot_scene, self.filepath)
+        if export_success:
+            custom_message_box(message="\n".join(summary), title="Export Profile", icon='TIME')
+        return {'FINISHED'}
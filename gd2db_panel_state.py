@@ -0,0 +1,65 @@
+import bpy
+
+from bpy.app.handlers import persistent
+
+from .gd2db_utilities import export_objects
+
+
+# the enabled state of the rows of the sidebar panels that depend on the objects of the scene, computed once and kept
+# until the selection, the objects of the scene, or the properties deciding what is exported change
+# None until the panels are first drawn, or after it was invalidated
+panel_state = None
+panel_state_scene = 0
+
+
+def _compute_panel_state(context):
+    selected_objects = context.selected_objects
+    return {
+        "convertible": any(
+            x.type == "MESH"
+            or x.type == "ARMATURE"
+            or x.empty_display_type == 'IMAGE'
+            for x in selected_objects
+        ),
+        "selected_2d": any(x.gd2db_object_2d for x in selected_objects),
+        "selected_mesh": any(x.type == 'MESH' for x in selected_objects),
+        "exportable": next(export_objects(), None) is not None
+    }
+
+
+# returns the cached panel state, computing it if it was invalidated or the panels are drawn for another scene
+def current_panel_state(context):
+    global panel_state, panel_state_scene
+    scene = context.scene.as_pointer()
+    if panel_state is None or panel_state_scene != scene:
+        panel_state = _compute_panel_state(context)
+        panel_state_scene = scene
+    return panel_state
+
+
+def invalidate_panel_state(*_args):
+    global panel_state
+    panel_state = None
+
+
+# returns true if a depsgraph update can't change the panel state
+# moving or editing objects doesn't change what is selected or exported, selecting, hiding, adding, and removing objects
+# updates the scene, collections, or the objects without a transform or geometry change
+def keeps_panel_state(update):
+    if isinstance(update.id, (bpy.types.Scene, bpy.types.Collection)):
+        return False
+    if isinstance(update.id, bpy.types.Object):
+        return update.is_updated_transform or update.is_updated_geometry
+    return True
+
+
+# installed when the addon is registered, the panels are drawn whether or not the file contains "2d" objects
+@persistent
+def gd2db_panel_state_update(_scene, depsgraph):
+    if panel_state is not None and not all(keeps_panel_state(x) for x in depsgraph.updates):
+        invalidate_panel_state()
+
+
+@persistent
+def gd2db_panel_state_reset(_scene, *_args):
+    invalidate_panel_state()
@@ -0,0 +1,97 @@
+import os
+import cProfile
+import pstats
+import tracemalloc
+from time import strftime
+
+from .gd2db_utilities import addon_data_directory
+from . import gd2db_trace
+
+PROFILE_DIRECTORY = "GD2DB_profiles"
+
+# the factor the memory in use has to grow by before a new peak memory snapshot is taken
+SNAPSHOT_GROWTH = 1.1
+
+
+# keeps a tracemalloc snapshot of the moment the most memory was in use, and records the memory in use in the trace
+# snapshots are taken at the end of export phases, which is where the intermediate data of a phase is largest
+# taking a snapshot walks every traced allocation, so the spans of single objects are skipped, and a new snapshot is
+# only taken once the memory in use grew by SNAPSHOT_GROWTH since the last one
+class PeakMemorySnapshot:
+    def __init__(self):
+        self.snapshot = None
+        self.snapshot_size = 0
+
+    def __call__(self, event=None):
+        if event is not None and event["name"] == "Object":
+            return
+        current_size, _peak_size = tracemalloc.get_traced_memory()
+        gd2db_trace.trace_counter("Memory", megabytes=current_size / 1048576)
+        if self.snapshot is None or current_size > self.snapshot_size * SNAPSHOT_GROWTH:
+            self.snapshot_size = current_size
+            self.snapshot = tracemalloc.take_snapshot()
+
+
+# runs function with cProfile and tracemalloc and saves the profile, and the memory snapshot, to a GD2DB_profiles
+# folder next to scene_path
+# returns the result of function and a list of lines summarizing the hottest functions and largest allocations
+def profile_call(scene_path, function, *args, **kwargs):
+    peak_memory_snapshot = PeakMemorySnapshot()
+    profile = cProfile.Profile()
+
+    # a trace is recorded along with the profile, its span ends are used to take the memory snapshots
+    trace = gd2db_trace.start_trace(f"profile {function.__name__}")
+    trace.span_end_hooks.append(peak_memory_snapshot)
+
+    tracemalloc.start()
+    try:
+        profile.enable()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            profile.disable()
+            peak_memory_snapshot()
+            _current_size, peak_size = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        trace_path = gd2db_trace.finish_trace(scene_path)
+
+    # save the profile and the snapshot
+    scene_name = os.path.splitext(os.path.basename(scene_path))[0] or "export"
+    directory = addon_data_directory(scene_path, PROFILE_DIRECTORY)
+    file_stem = os.path.join(directory, f"{scene_name}_{strftime('%Y%m%d-%H%M%S')}")
+    profile.dump_stats(f"{file_stem}.prof")
+    if peak_memory_snapshot.snapshot is not None:
+        peak_memory_snapshot.snapshot.dump(f"{file_stem}.tracemalloc")
+
+    summary = [f"Peak memory: {peak_size / 1048576:.1f} MB", "", "Hottest functions (own time):"]
+    summary += hot_functions(profile)
+    if peak_memory_snapshot.snapshot is not None:
+        summary += ["", "Largest allocations at peak memory:"]
+        summary += top_allocators(peak_memory_snapshot.snapshot)
+    summary += ["", f"Saved to \"{file_stem}.prof\""]
+    if trace_path:
+        summary.append(f"Trace saved to \"{trace_path}\"")
+    return result, summary
+
+
+# returns lines describing the functions that spent the most time in their own code
+def hot_functions(profile, count=8):
+    stats = pstats.Stats(profile).stats
+    hottest = sorted(stats.items(), key=lambda x: x[1][2], reverse=True)[:count]
+    return [
+        f"{own_time:7.3f}s {total_time:7.3f}s {calls:>9} "
+        f"{os.path.basename(file_name)}:{line_number} {function_name}"
+        for (file_name, line_number, function_name), (_primitive_calls, calls, own_time, total_time, _callers)
+        in hottest
+    ]
+
+
+# returns lines describing the source lines holding the most memory in the snapshot
+def top_allocators(snapshot, count=5):
+    statistics = snapshot.statistics("lineno")[:count]
+    return [
+        f"{x.size / 1048576:7.1f} MB {x.count:>9} blocks "
+        f"{os.path.basename(x.traceback[0].filename)}:{x.traceback[0].lineno}"
+        for x in statistics
+    ]
@@ -0,0 +1,65 @@
+import bpy
+
+from bpy.app.handlers import persistent
+
+
+# registry of the "2d" objects of the open blend file, keyed by the objects' pointers
+# kept up to date by the conversion operator, and rebuilt after loading a file, undo and redo, and after any depsgraph
+# update of a scene or collection, which is how Blender reports objects being added, deleted, linked, or unlinked
+# single objects are checked with their gd2db_object_2d property instead
+# None until it's first built
+registry = None
+
+
+# returns the registry, building it first if it was invalidated
+def _current_registry():
+    global registry
+    if registry is None:
+        registry = {x.as_pointer(): x for x in bpy.data.objects if x.get("gd2db_object_2d")}
+    return registry
+
+
+def any_objects_2d():
+    return bool(_current_registry())
+
+
+def objects_2d():
+    return list(_current_registry().values())
+
+
+def meshes_2d():
+    return [x for x in _current_registry().values() if x.type == 'MESH']
+
+
+# used by the conversion operator when it changes the gd2db_object_2d property of an object
+# a registry that hasn't been built yet is built with the object's property
+def register_object_2d(obj):
+    if registry is not None:
+        registry[obj.as_pointer()] = obj
+
+
+def unregister_object_2d(obj):
+    if registry is not None:
+        registry.pop(obj.as_pointer(), None)
+
+
+# references to Blender data can't be trusted after loading a file, undo, or redo, so the registry is rebuilt the next
+# time it's used
+def invalidate_registry():
+    global registry
+    registry = None
+
+
+@persistent
+def gd2db_registry_reset(_scene, *_args):
+    invalidate_registry()
+
+
+# installed before the handlers that iterate over the "2d" objects, so they never see an object that was deleted by the
+# same update
+@persistent
+def gd2db_registry_update(_scene, depsgraph):
+    if registry is not None and any(
+            isinstance(x.id, (bpy.types.Scene, bpy.types.Collection)) for x in depsgraph.updates
+    ):
+        invalidate_registry()
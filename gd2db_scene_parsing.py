@@ -1,25 +1,61 @@
 import bpy
 import re
 import os
-import bmesh
+import numpy as np
 from mathutils import Vector
 from pathlib import Path
-from .gd2db_utilities import ProgressReporter
+from time import perf_counter
+from functools import wraps
+from .gd2db_utilities import ProgressReporter, progress_message
 
 from math import (
     degrees,
-    radians,
     sin,
-    cos,
-    atan2
+    cos
 )
 
 from .gd2db_utilities import (
-    rotate_around_point,
+    rotate_points,
+    slope_angles,
+    wrap_angles,
+    godot_points,
     export_objects,
-    custom_message_box
+    custom_message_box,
+    append_export_history
     )
 
+from . import gd2db_trace
+from .gd2db_trace import (
+    trace_span,
+    start_trace,
+    stop_trace,
+    save_trace,
+    summarize_trace
+)
+
+from .gd2db_chunked_mesh import (
+    StreamedNode,
+    exceeds_memory_budget,
+    chunk_size,
+    read_array,
+    godot_vertex_order,
+    bone_weight_arrays,
+    chunked_text
+)
+
+from .gd2db_evaluated_mesh import (
+    export_mesh,
+    weight_digest,
+    cached_evaluation_key
+)
+
+from .gd2db_export_cache import (
+    ExportCache,
+    new_hasher,
+    hash_values,
+    hash_collection
+)
+
 
 # Used to parse the elements of a scene
 class GodotSceneParser:
@@ -55,7 +91,6 @@ class GodotSceneParser:
     def _update_reporting_instance(self):
         if self.reporting_instance is not None:
             self.reporting_instance.update()
-            self.reporting_instance.adjust_update_rate()
 
     def _end_reporting_instance(self):
         if self.reporting_instance is not None:
@@ -113,9 +148,11 @@ class GodotSceneParser:
         self.elements["ext_resource"][resource_id] = resource
 
     # sets up self.elements based on if the user supplied path to an existing Godot scene
-    def initialize_scene_elements(self):
+    # original_path can be used to start from a scene other than the one in the godot_scene property
+    def initialize_scene_elements(self, original_path=None):
         # get the user supplied path and get the file extension of the file in that path
-        original_path = bpy.context.scene.godot_2d_bridge_tools.godot_scene
+        if original_path is None:
+            original_path = bpy.context.scene.godot_2d_bridge_tools.godot_scene
         file_extension = original_path.split(".")[-1]
 
         # check if the user supplied a valid path to an existing Godot scene and get the appropriate scene elements
@@ -205,6 +242,9 @@ class ObjectToExport:
     pixels = 0
     existing_ids = []
 
+    # bytes of memory the parsing of a single mesh may use before it's streamed in chunks, 0 if chunking is disabled
+    memory_budget = 0
+
     godot_version = 0
     gd_scene_format = 0
 
@@ -217,6 +257,14 @@ class ObjectToExport:
     float_array_key = "PoolRealArray"
     bone_length_key = "default_length"
 
+    # results shared by objects that use the same datablocks, reset at the start of every export
+    memo = {}
+
+    # hierarchy index, built once per export instead of walking the collection tree for every object
+    exportable_pointers = set()
+    collection_order = {}
+    collection_parents = {}
+
     # used to get variables that do not change between instantiations
     # prevents unnecessary function calls and property lookups
     @classmethod
@@ -225,7 +273,13 @@ class ObjectToExport:
         cls.gd_scene_format = parsing_instance.gd_scene_format
         cls.exportable_objects = list(export_objects())
         cls.pixels = bpy.context.scene.godot_2d_bridge_tools.pixels_per_unit
-        cls.existing_ids = list(parsing_instance.elements["ext_resource"].keys())
+        if bpy.context.scene.godot_2d_bridge_tools.chunked_export:
+            cls.memory_budget = bpy.context.scene.godot_2d_bridge_tools.memory_budget * 1048576
+        else:
+            cls.memory_budget = 0
+        cls.memo = {}
+        cls.use_parsing_instance(parsing_instance)
+        cls._index_hierarchy()
 
         if cls.gd_scene_format == 1:
             cls.vector_array_key = "Vector2Array"
@@ -239,6 +293,53 @@ class ObjectToExport:
             cls.float_array_key = "PackedFloat32Array"
             cls.bone_length_key = "length"
 
+    # used to change the scene the objects are exported to, when exporting to more than one scene
+    @classmethod
+    def use_parsing_instance(cls, parsing_instance):
+        cls.existing_ids = list(parsing_instance.elements["ext_resource"].keys())
+
+    @classmethod
+    def _index_hierarchy(cls):
+        cls.exportable_pointers = {x.as_pointer() for x in cls.exportable_objects}
+
+        # recursively yields all the collections in a scene in the order they appear in the view layer panel of the
+        # outliner
+        def ordered_collections(collection=bpy.context.scene.collection):
+            for child in collection.children:
+                yield child
+                yield from ordered_collections(collection=child)
+
+        # collections linked to more than one parent keep the position of their first appearance
+        cls.collection_order = {}
+        for collection in ordered_collections():
+            cls.collection_order.setdefault(collection.as_pointer(), len(cls.collection_order))
+
+        # maps every collection to the first collection, in bpy.data.collections, that it is a child of
+        cls.collection_parents = {}
+        for collection in bpy.data.collections:
+            for child in collection.children:
+                cls.collection_parents.setdefault(child.as_pointer(), collection)
+
+    # returns the first collection in the outliner that is also linked to obj
+    # collections are being used as stand-ins for Node2D nodes that will be added to the scene
+    # Godot cannot have objects as children of more than one node, so all other collections are ignored
+    @classmethod
+    def first_linked_collection(cls, obj):
+        linked_collections = [x for x in obj.users_collection if x.as_pointer() in cls.collection_order]
+        if linked_collections:
+            return min(linked_collections, key=lambda x: cls.collection_order[x.as_pointer()])
+        return None
+
+    # returns the top exported parent of obj, or obj itself if none of its parents are exported
+    @classmethod
+    def root_object(cls, obj):
+        root = obj
+        while obj.parent:
+            obj = obj.parent
+            if obj.as_pointer() in cls.exportable_pointers:
+                root = obj
+        return root
+
     def __init__(self, obj):
         self.obj = obj
         self.parents = self._hierarchy()
@@ -255,6 +356,13 @@ class ObjectToExport:
         else:
             self.parent_string = "."
 
+    # returns the result stored under key, calling function to calculate and store the result if it isn't stored yet
+    # keys are built from the datablocks' pointers, so every object sharing a datablock reuses the same result
+    def _memoized(self, key, function):
+        if key not in self.memo:
+            self.memo[key] = function()
+        return self.memo[key]
+
     # returns an ordered list of objects and collections that self.obj is a child of
     # only objects and collections that are being exported are included in the list
     # the hierarch_of argument can be used to get the hierarchy of an object other than self.obj
@@ -262,19 +370,12 @@ class ObjectToExport:
         if hierarchy_of is None:
             hierarchy_of = self.obj
 
-        # recursively yields all the collections in a scene in the order they appear in the view layer panel of the
-        # outliner
-        def ordered_collections(collection=bpy.context.scene.collection):
-            for child in collection.children:
-                yield child
-                yield from ordered_collections(collection=child)
-
         # recursively yields all the parented objects of an object
         # skips objects that are not being exported
         def parent_hierarchy(obj=hierarchy_of):
             if isinstance(obj, bpy.types.Object):
                 if obj.parent:
-                    if obj.parent in self.exportable_objects:
+                    if obj.parent.as_pointer() in self.exportable_pointers:
                         yield obj.parent
                         yield from parent_hierarchy(obj=obj.parent)
                     else:
@@ -290,14 +391,6 @@ class ObjectToExport:
         else:
             init_obj = hierarchy_of
 
-        # returns the first collection yielded from ordered_collections that is also linked to init_obj
-        # collections are being used as stand-ins for Node2D nodes that will be added to the scene
-        # Godot cannot have objects as children of more than one node, so all other collections in the list are ignored
-        def first_linked_collection():
-            for collection in ordered_collections():
-                if collection in init_obj.users_collection:
-                    return collection
-
         # if the user has activated the use_collections option, collection_hierarchy will recursively yield all the
         # collections that the init_obj belongs to
         def collection_hierarchy(obj=init_obj):
@@ -306,24 +399,30 @@ class ObjectToExport:
                 # check if obj is of the type Object
                 # then check the return value of first_liked_collection, and begin recursion up the collection tree
                 if isinstance(obj, bpy.types.Object):
-                    collection = first_linked_collection()
+                    collection = self.first_linked_collection(init_obj)
                     if collection:
                         yield collection
                         yield from collection_hierarchy(obj=collection)
                     else:
                         return
                 elif isinstance(obj, bpy.types.Collection):
-                    for collection in bpy.data.collections:
-                        if obj in list(collection.children):
-                            yield collection
-                            yield from collection_hierarchy(obj=collection)
-                            break
+                    collection = self.collection_parents.get(obj.as_pointer())
+                    if collection:
+                        yield collection
+                        yield from collection_hierarchy(obj=collection)
 
         return tuple(reversed(hierarchy_list + list(collection_hierarchy())))
 
+    # returns the path of the node, relative to the root node of the scene
+    def node_path(self):
+        if self.parent_string == ".":
+            return self.obj.name
+        return f"{self.parent_string}/{self.obj.name}"
+
     # because the user can choose not to export some or all of an objects parents it's necessary to recalculate an
     # object's transforms based on the parents being exported
-    def _relative_object_transforms(self):
+    # returns the location, rotation in radians, and scale in Godot's 2d space
+    def relative_transform_values(self):
         world_matrix = self.obj.matrix_world
         transforms = {
             "loc_offset": Vector((0, 0, 0)),
@@ -354,18 +453,37 @@ class ObjectToExport:
         rotation = transforms["global_rot"] - transforms["rot_offset"]
         scale = Vector((transforms["global_scale"][x] / transforms["scale_offset"][x] for x in range(3)))
 
+        return (location.x * self.pixels, -location.y * self.pixels), -rotation.z, (scale.x, scale.y)
+
+    # returns the location, rotation, and scale strings of the node
+    def _relative_object_transforms(self):
+        location, rotation, scale = self.relative_transform_values()
+
         # parse the transform strings
-        location = f"{location.x * self.pixels}, {-location.y * self.pixels}"
-        scale = f"{scale.x}, {scale.y}"
+        location = f"{location[0]}, {location[1]}"
+        scale = f"{scale[0]}, {scale[1]}"
 
         # before Godot 3.1 rotation values of the *.tscn file where in degrees
         if self.gd_scene_format == 1:
-            rotation = f"{degrees(-rotation.z)}"
+            rotation = f"{degrees(rotation)}"
         else:
-            rotation = f"{-rotation.z}"
+            rotation = f"{rotation}"
 
         return location, rotation, scale
 
+    # returns a hasher primed with the export settings and the values shared by every type of node
+    def _cache_hasher(self):
+        return new_hasher(
+            self.obj.type,
+            self.obj.name,
+            self.parent_string,
+            self.pixels,
+            self.godot_version,
+            self.gd_scene_format,
+            bpy.context.scene.godot_2d_bridge_tools.use_collection,
+            self._relative_object_transforms()
+        )
+
 
 # used to parse the node string of a collection as a Node2D node
 class CollectionObjectParser(ObjectToExport):
@@ -381,7 +499,8 @@ class MeshObjectParser(ObjectToExport):
 
     def __init__(self, obj):
         super().__init__(obj)
-        self.mesh = obj.data
+        # the evaluated mesh is shared by every phase of the export
+        self.mesh = self._memoized(("export_mesh", obj.as_pointer()), lambda: export_mesh(obj, self._weights))
         self.reporting_instance = None
         self.resource_path = ""
         self.resource_id = 0
@@ -394,6 +513,11 @@ class MeshObjectParser(ObjectToExport):
                 self.linked_armature = modifier.object
                 break
 
+    # returns the digest of the vertex group weights, read once per export and shared by the evaluation key of the
+    # evaluated mesh and the cache key of the node
+    def _weights(self):
+        return self._memoized(("weights", self.obj.as_pointer()), lambda: weight_digest(self.obj))
+
     # used to get reporting instance after instantiation so the reporting instance can utilize data from the
     # instance of this class
     def get_reporting_instance(self, reporting_instance):
@@ -406,7 +530,10 @@ class MeshObjectParser(ObjectToExport):
     def _update_reporting_instance(self):
         if self.reporting_instance is not None:
             self.reporting_instance.update()
-            self.reporting_instance.adjust_update_rate()
+
+    def _advance_reporting_instance(self, count):
+        if self.reporting_instance is not None:
+            self.reporting_instance.advance(count)
 
     def _end_reporting_instance(self):
         if self.reporting_instance is not None:
@@ -414,6 +541,7 @@ class MeshObjectParser(ObjectToExport):
 
     # will save the image that is currently named in the gd2db_texture_image property of the mesh object, if any, and
     # calculate the appropriate resource id for the external resource
+    # returns false if the image was already saved during this export
     def save_texture(self, scene_path, parsing_instance):
 
         # get the image object, the full name of the image file, and calculate the filepath to save the image to
@@ -445,68 +573,55 @@ class MeshObjectParser(ObjectToExport):
         self.existing_ids.append(self.resource_id)
 
         # change the image objects filepath and run the save function
-        image.filepath_raw = image_filepath
-        image.save()
+        # images used by more than one mesh, or by meshes in more than one scene, are only saved once per export
+        saved_key = ("saved_texture", image.as_pointer(), image_filepath)
+        if saved_key not in self.memo:
+            image.filepath_raw = image_filepath
+            image.save()
+            self.memo[saved_key] = True
+            return True
+        return False
 
     # returns the external resource string based on the values in self.resource_path and self.resource_id
     def external_resource(self):
         return f"[ext_resource path=\"{self.resource_path}\" type=\"Texture\" id={self.resource_id}]\n"
 
     # returns a map of the indexes of vertices in blender to the index of those vertices expected in Godot
+    # the boundary walk only depends on the mesh, so it's only calculated once for every mesh datablock
     def _vertex_map_and_internal_vertex_count(self):
-        vertex_map = []
-
-        # initialise the base mesh
-        # need to use a base mesh because that is the only way to check if a vertex is on the edge of the mesh
-        base_mesh = bmesh.new()
-        base_mesh.from_mesh(self.mesh)
-
-        # find the first edge vertex in the base mesh and use it to initialise the vertex_map list
+        key = ("vertex_map", self.mesh.as_pointer())
+        if key in self.memo:
+            self._start_reporting_instance()
+            self._end_reporting_instance()
+            return self.memo[key]
+        with trace_span("Boundary Walk", vertices=len(self.mesh.vertices), edges=len(self.mesh.edges)):
+            self.memo[key] = self._build_vertex_map_and_internal_vertex_count()
+        return self.memo[key]
+
+    # the vertices along the boundary of the mesh followed by the rest, the same walk the chunked export uses, so a
+    # mesh is exported the same way whether or not it's streamed
+    def _build_vertex_map_and_internal_vertex_count(self):
         self._start_reporting_instance()
-        for vertex in base_mesh.verts:
-            if vertex.is_boundary:
-                self._update_reporting_instance()
-                vertex_map.append(vertex.index)
-                break
-
-        # once the first vertex is appended to vertex map this loop can start, appending the next vertex along the edge
-        # as it goes, until it runs out of vertices along the edge of the mesh
-        for vertex_ind in vertex_map:
-            base_mesh.verts.ensure_lookup_table()
-            vertex = base_mesh.verts[vertex_ind]
-            next_vert = [
-                other_vert for edge in vertex.link_edges
-                if (other_vert := edge.other_vert(vertex).index) not in vertex_map
-                and edge.is_boundary
-            ]
-            if next_vert:
-                self._update_reporting_instance()
-                vertex_map.append(next_vert[0])
-
-        # free the base_mesh
-        base_mesh.free()
-
-        # initialise the internal_vertex_count and get a list of vertex indices to compair vertex_index against
-        internal_vertex_count = 0
-        vertex_indices = list(range(0, len(self.mesh.vertices)))
-
-        # iterate over the difference between vertex_map and vertex_indices and append them to the vertex_map
-        # prevents needing to iterate over indices that have already been sorted, and the order of the remaining
-        # vertices does not matter as long as they fallow the edge vertices
-        for vertex_index in set(vertex_indices).difference(vertex_map):
-            self._update_reporting_instance()
-            vertex_map.append(vertex_index)
-            internal_vertex_count += 1
-
+        order, internal_vertex_count = godot_vertex_order(self.mesh)
+        self._advance_reporting_instance(len(order))
         self._end_reporting_instance()
-
-        return {x: y for y, x in enumerate(vertex_map)}, internal_vertex_count
+        return {x: y for y, x in enumerate(order.tolist())}, internal_vertex_count
 
     # returns a string that Godot will recognize a list of polygons
     def _polygons(self, vertex_index_map):
+        key = ("polygons", self.mesh.as_pointer())
+        if key in self.memo:
+            self._start_reporting_instance()
+            self._end_reporting_instance()
+            return self.memo[key]
+        with trace_span("Polygons", polygons=len(self.mesh.polygons), loops=len(self.mesh.loops)):
+            self.memo[key] = self._build_polygons(vertex_index_map)
+        return self.memo[key]
+
+    def _build_polygons(self, vertex_index_map):
         self._start_reporting_instance()
         polygons = []
-        for polygon in self.obj.data.polygons:
+        for polygon in self.mesh.polygons:
             self._update_reporting_instance()
             # rebuild the list of vertex indices within the polygon using the vertex_index_map
             polygon_vertices = [str(vertex_index_map[vertex]) for vertex in polygon.vertices]
@@ -514,68 +629,105 @@ class MeshObjectParser(ObjectToExport):
         self._end_reporting_instance()
         return ", ".join(polygons)
 
+    # Godot's 2d uv's are directly linked to the meshes vertices, so I only need one loop per vertex
+    # this builds a map of the vertex index to the first loop associated with that vertex
+    def _loop_index_map(self):
+        key = ("loop_index_map", self.mesh.as_pointer())
+        self._start_reporting_instance()
+        if key not in self.memo:
+            with trace_span("Loop Map", loops=len(self.mesh.loops)):
+                loop_index_map = {}
+                for loop in self.mesh.loops:
+                    self._update_reporting_instance()
+                    if loop_index_map.get(loop.vertex_index) is None:
+                        loop_index_map[loop.vertex_index] = loop.index
+            self.memo[key] = loop_index_map
+        self._end_reporting_instance()
+        return self.memo[key]
+
     # returns three strings that Godot will recognize as vertex coordinates, bone weights, and uv coordinates
     # combined into one function to reduce vertex iterations
+    # the results are shared by objects with the same mesh, linked armature, vertex groups, and texture resolution
     def _vertex_relative_data(self, vertex_index_map):
+        key = (
+            "vertex_data",
+            self.mesh.as_pointer(),
+            self.linked_armature.as_pointer() if self.linked_armature is not None else 0,
+            tuple(x.name for x in self.obj.vertex_groups),
+            self.obj.gd2db_image_width,
+            self.obj.gd2db_image_height
+        )
+        if key in self.memo:
+            if self.mesh.uv_layers:
+                self._start_reporting_instance()
+                self._end_reporting_instance()
+            self._start_reporting_instance()
+            self._end_reporting_instance()
+            return self.memo[key]
+        with trace_span(
+                "Vertex Data",
+                vertices=len(self.mesh.vertices),
+                bones=len(self.linked_armature.pose.bones) if self.linked_armature is not None else 0
+        ):
+            self.memo[key] = self._build_vertex_relative_data(vertex_index_map)
+        return self.memo[key]
+
+    def _build_vertex_relative_data(self, vertex_index_map):
         if self.mesh.uv_layers:
             active_uv = [x for x in self.mesh.uv_layers if x.active_render][0]
         else:
             active_uv = None
         texture_res = (self.obj.gd2db_image_width, self.obj.gd2db_image_height)
 
-        # Godot's 2d uv's are directly linked to the meshes vertices, so I only need one loop per vertex
-        # this builds a map of the vertex index to the first loop associated with that vertex
-        loop_index_map = {}
-        if active_uv:
-            self._start_reporting_instance()
-            for loop in self.mesh.loops:
-                self._update_reporting_instance()
-                if loop_index_map.get(loop.vertex_index) is None:
-                    loop_index_map[loop.vertex_index] = loop.index
-            self._end_reporting_instance()
+        loop_index_map = self._loop_index_map() if active_uv else {}
 
         def bone_hierarchy(bone):
             return "/".join([x.name for x in reversed(bone.parent_recursive)] + [bone.name])
 
-        # initiate a dictionary of bone weights, a list of uv coordinates and vertex coordinates
-        # the correct values will be assigned to the correct index using the vertex_index_map
+        # the godot index of every vertex, and the blender index of every vertex in Godot's vertex order
+        vertex_count = len(self.mesh.vertices)
+        godot_index = np.fromiter(map(vertex_index_map.__getitem__, range(vertex_count)), np.int64, vertex_count)
+        order = np.empty(vertex_count, dtype=np.int64)
+        order[godot_index] = np.arange(vertex_count)
+
+        # initiate a dictionary of bone weights, the correct values will be assigned to the correct index using the
+        # vertex_index_map
         if self.linked_armature is not None:
             bone_weights = {
                 bone.name: ["0"] * len(self.mesh.vertices) for bone in self.linked_armature.pose.bones
             }
         else:
             bone_weights = {}
+
+        # calculate the uv coordinates from the uv of the loop associated with each vertex in the loop_index_map, and
+        # the vertex coordinates, for all vertices at once in Godot's vertex order
         if active_uv is not None:
-            uv_coordinates = [""] * len(self.mesh.vertices)
+            first_loops = np.fromiter(map(loop_index_map.__getitem__, order.tolist()), np.int64, vertex_count)
+            uvs = godot_points(read_array(active_uv.data, "uv", size=2)[first_loops], texture_res)
+            uvs[:, 1] += texture_res[1]
+            uv_coordinates = [f"{x}, {y}" for x, y in uvs.tolist()]
         else:
             uv_coordinates = []
-        vertex_coordinates = [""] * len(self.mesh.vertices)
+        coordinates = godot_points(read_array(self.mesh.vertices, "co", size=3)[order, :2], self.pixels)
+        vertex_coordinates = [f"{x}, {y}" for x, y in coordinates.tolist()]
 
-        # iterate through the vertices gathering all the data for each vertex as it goes
+        # vertex group weights can't be read in bulk, so only the weights are gathered vertex by vertex
         self._start_reporting_instance()
-        for vertex in self.mesh.vertices:
-            self._update_reporting_instance()
+        if bone_weights:
+            for vertex in self.mesh.vertices:
+                self._update_reporting_instance()
 
-            # get the correct index of the vertex for Godot
-            index = vertex_index_map[vertex.index]
+                # get the correct index of the vertex for Godot
+                index = vertex_index_map[vertex.index]
 
-            # iterate through the vertex groups and assign the weight of the vertex for that group to the correct
-            # position in bone_weights
-            if bone_weights:
+                # iterate through the vertex groups and assign the weight of the vertex for that group to the correct
+                # position in bone_weights
                 for group_element in vertex.groups:
                     group_name = self.obj.vertex_groups[group_element.group].name
                     if group_name in bone_weights:
                         bone_weights[group_name][index] = str(group_element.weight)
-
-            # calculate the uv coordinate base on the associated loop index in the loop_index_map and assign it to the
-            # correct position in the uv_coordinates list
-            if uv_coordinates:
-                uv_co_x = active_uv.data[loop_index_map[vertex.index]].uv.x * texture_res[0]
-                uv_co_y = -active_uv.data[loop_index_map[vertex.index]].uv.y * texture_res[1] + texture_res[1]
-                uv_coordinates[index] = f"{uv_co_x}, {uv_co_y}"
-
-            # calculate the vertex coordinate and assign it to the correct position in the vertex_coordinates list
-            vertex_coordinates[index] = f"{vertex.co.x * self.pixels}, {-vertex.co.y * self.pixels}"
+        else:
+            self._advance_reporting_instance(vertex_count)
         self._end_reporting_instance()
 
         # finish parsing bone_weights
@@ -592,8 +744,13 @@ class MeshObjectParser(ObjectToExport):
     def _skeleton_hierarchy(self):
         # use a list of the linked armatures parents and the meshes parents
         # to get a list of parents that are common to both of them
+        # the hierarchy of the armature is the same for every mesh linked to it
+        armature_hierarchy = self._memoized(
+            ("hierarchy", self.linked_armature.as_pointer()),
+            lambda: self._hierarchy(hierarchy_of=self.linked_armature)
+        )
         armature_parents = (
-                [x.name for x in self._hierarchy(hierarchy_of=self.linked_armature)] + [self.linked_armature.name]
+                [x.name for x in armature_hierarchy] + [self.linked_armature.name]
         )
         mesh_parents = (
             [x.name for x in self.parents] + [self.obj.name]
@@ -606,6 +763,44 @@ class MeshObjectParser(ObjectToExport):
         # the number of "../" tells Godot how many levels up the node tree to go before finding the first common parent
         return "/".join([".."] * relative_parents + armature_parents[len(common_parents):])
 
+    # returns a key that changes whenever anything the Polygon2D node string is parsed from changes
+    # must be called after save_texture, because the node string references the texture's resource id
+    def cache_key(self):
+        hasher = self._cache_hasher()
+        hash_values(
+            hasher,
+            self.resource_id,
+            self.resource_path,
+            self.obj.gd2db_image_width,
+            self.obj.gd2db_image_height
+        )
+
+        # the geometry of the mesh
+        hash_collection(hasher, self.mesh.vertices, "co", size=3)
+        hash_collection(hasher, self.mesh.loops, "vertex_index", dtype=np.int32)
+        hash_collection(hasher, self.mesh.polygons, "loop_start", dtype=np.int32)
+        hash_collection(hasher, self.mesh.polygons, "loop_total", dtype=np.int32)
+        hash_collection(hasher, self.mesh.edges, "vertices", size=2, dtype=np.int32)
+
+        # the active uv layer
+        if self.mesh.uv_layers:
+            active_uv = [x for x in self.mesh.uv_layers if x.active_render][0]
+            hash_collection(hasher, active_uv.data, "uv", size=2)
+
+        # the linked armature, its bone hierarchy, and the vertex weights are only part of the node when the armature is
+        # being exported
+        if self.linked_armature is not None:
+            hash_values(
+                hasher,
+                self.linked_armature.name,
+                self._skeleton_hierarchy(),
+                [(x.name, x.parent.name if x.parent else "") for x in self.linked_armature.pose.bones],
+                [x.name for x in self.obj.vertex_groups],
+                self._weights(),
+                cached_evaluation_key(self.obj) if self.mesh is not self.obj.data else ""
+            )
+        return hasher.hexdigest()
+
     # returns the Polygon2D node string
     def polygon2d_node(self):
         vertex_index_map, internal_vertex_count = self._vertex_map_and_internal_vertex_count()
@@ -614,8 +809,8 @@ class MeshObjectParser(ObjectToExport):
 
         # remove references to internal vertices for Godot 3.0 and earlier
         if self.godot_version < 3:
-            vertex_coordinates = vertex_coordinates[:-internal_vertex_count]
-            uv_coordinates = uv_coordinates[:-internal_vertex_count]
+            vertex_coordinates = vertex_coordinates[:len(vertex_coordinates) - internal_vertex_count]
+            uv_coordinates = uv_coordinates[:len(uv_coordinates) - internal_vertex_count]
             polygons_line = ""
             internal_vertex_line = ""
         else:
@@ -650,11 +845,138 @@ class MeshObjectParser(ObjectToExport):
             f"{internal_vertex_line}"
         )
 
+    # returns true if the mesh is estimated to be too large to be parsed within the memory budget
+    def streams_in_chunks(self):
+        return exceeds_memory_budget(self.mesh, self.memory_budget)
+
+    # returns the Polygon2D node as a StreamedNode, with the same text as polygon2d_node
+    # nothing is read from the mesh until the node is written, so the arrays of only one streamed mesh are in memory at
+    # a time, however many meshes are streamed to the scene
+    def polygon2d_streamed_node(self):
+        return StreamedNode(
+            f"[node name=\"{self.obj.name}\" type=\"Polygon2D\" parent=\"{self.parent_string}\"]\n",
+            [self._streamed_node_text]
+        )
+
+    # yields the text of the Polygon2D node after its header
+    # each array of the mesh is read in bulk right before its property is written, one chunk of text at a time, and
+    # released once the property is written
+    def _streamed_node_text(self):
+        mesh = self.mesh
+        with trace_span("Boundary Walk", vertices=len(mesh.vertices), edges=len(mesh.edges)):
+            order, internal_vertex_count = godot_vertex_order(mesh)
+
+        # internal vertices are left out for Godot 3.0 and earlier
+        vertex_count = len(order) - internal_vertex_count if self.godot_version < 3 else len(order)
+        pixels = self.pixels
+        texture_width, texture_height = self.obj.gd2db_image_width, self.obj.gd2db_image_height
+        vector_size = chunk_size(self.memory_budget, 2)
+        weight_size = chunk_size(self.memory_budget, 1)
+
+        location, rotation, scale = self._relative_object_transforms()
+        if self.resource_id:
+            yield f"{self.texture_key} = ExtResource( {self.resource_id} )\n"
+        yield (
+            f"{self.position_key} = Vector2( {location} )\n"
+            f"{self.rotation_key} = {rotation}\n"
+            f"{self.scale_key} = Vector2( {scale} )\n"
+        )
+        if self.linked_armature is not None:
+            yield f"skeleton = NodePath(\"{self._skeleton_hierarchy()}\")\n"
+
+        with trace_span("Vertex Data", vertices=len(mesh.vertices)):
+            coordinates = read_array(mesh.vertices, "co", size=3)[order, :2]
+
+        def vertex_chunk(start, end):
+            chunk = godot_points(coordinates[start:end], pixels)
+            return ", ".join(f"{x}, {y}" for x, y in chunk.tolist())
+
+        yield f"polygon = {self.vector_array_key}( "
+        yield from chunked_text(vertex_count, vector_size, vertex_chunk)
+        del coordinates
+
+        yield f" )\nuv = {self.vector_array_key}( "
+        # Godot's uvs are linked to the vertices, the first loop of every vertex is used
+        if mesh.uv_layers:
+            with trace_span("Vertex Data", loops=len(mesh.loops)):
+                active_uv = [x for x in mesh.uv_layers if x.active_render][0]
+                loop_vertices = read_array(mesh.loops, "vertex_index", dtype=np.int32)
+                looped_vertices, first_loops = np.unique(loop_vertices, return_index=True)
+                del loop_vertices
+                uv_coordinates = np.zeros((len(mesh.vertices), 2), dtype=np.float32)
+                uv_coordinates[looped_vertices] = read_array(active_uv.data, "uv", size=2)[first_loops]
+                uv_coordinates = uv_coordinates[order]
+                del looped_vertices, first_loops
+
+            def uv_chunk(start, end):
+                chunk = godot_points(uv_coordinates[start:end], (texture_width, texture_height))
+                chunk[:, 1] += texture_height
+                return ", ".join(f"{x}, {y}" for x, y in chunk.tolist())
+
+            yield from chunked_text(vertex_count, vector_size, uv_chunk)
+            del uv_coordinates
+        yield " )\n"
+
+        godot_index = np.empty(len(order), dtype=np.int32)
+        godot_index[order] = np.arange(len(order), dtype=np.int32)
+        del order
+
+        if self.godot_version >= 3:
+            with trace_span("Polygons", polygons=len(mesh.polygons), loops=len(mesh.loops)):
+                polygon_loops = godot_index[read_array(mesh.loops, "vertex_index", dtype=np.int32)]
+                loop_starts = read_array(mesh.polygons, "loop_start", dtype=np.int32)
+                loop_totals = read_array(mesh.polygons, "loop_total", dtype=np.int32)
+
+            def polygon_chunk(start, end):
+                loops = polygon_loops[loop_starts[start]:loop_starts[end - 1] + loop_totals[end - 1]].tolist()
+                offset = loop_starts[start]
+                return ", ".join(
+                    f"{self.int_array_key}( {', '.join(str(x) for x in loops[y - offset:y - offset + z])} )"
+                    for y, z in zip(loop_starts[start:end].tolist(), loop_totals[start:end].tolist())
+                )
+
+            yield "polygons = [ "
+            yield from chunked_text(len(loop_starts), vector_size, polygon_chunk)
+            yield " ]\n"
+            del polygon_loops, loop_starts, loop_totals
+
+        if self.linked_armature is not None:
+            with trace_span("Vertex Data", vertices=len(mesh.vertices)):
+                pose_bones = self.linked_armature.pose.bones
+                weight_bones, weight_vertices, weights = bone_weight_arrays(
+                    self.obj, mesh, [x.name for x in pose_bones], godot_index
+                )
+                bone_paths = [
+                    "/".join([x.name for x in reversed(bone.parent_recursive)] + [bone.name]) for bone in pose_bones
+                ]
+                bone_bounds = np.searchsorted(weight_bones, np.arange(len(bone_paths) + 1))
+
+            yield "bones = [ "
+            for bone, path in enumerate(bone_paths):
+                bone_vertices = weight_vertices[bone_bounds[bone]:bone_bounds[bone + 1]]
+                bone_weights = weights[bone_bounds[bone]:bone_bounds[bone + 1]]
+
+                def weight_chunk(start, end):
+                    texts = ["0"] * (end - start)
+                    first, last = np.searchsorted(bone_vertices, (start, end))
+                    for vertex, weight in zip(bone_vertices[first:last].tolist(), bone_weights[first:last].tolist()):
+                        texts[vertex - start] = str(weight)
+                    return ", ".join(texts)
+
+                yield f"{', ' if bone else ''}\"{path}\", {self.float_array_key}( "
+                yield from chunked_text(len(godot_index), weight_size, weight_chunk)
+                yield " )"
+            yield " ]\n"
+
+        if self.godot_version >= 3:
+            yield f"internal_vertex_count = {internal_vertex_count}\n"
+
 
 # used to parse the node string of an armature as a Skeleton2D node and its bones as Bone2D nodes
 class ArmatureObjectParser(ObjectToExport):
     def __init__(self, obj):
         super().__init__(obj)
+        self.bone2d_transforms = None
 
     # returns the node string for the Skeleton2D node
     def skeleton2d_node(self):
@@ -666,97 +988,89 @@ class ArmatureObjectParser(ObjectToExport):
             f"{self.scale_key} = Vector2( {scale} )\n"
         )
 
-    # returns the node string for the Bone2D node of a bone in this armature
-    def bone2d_node(self, pose_bone):
-
-        # returns the location of the bone in the rest position, calculated for use in Godot's 2d space
-        def rest_location():
-            edit_bone = pose_bone.bone
-            position = Vector((edit_bone.head_local.x, edit_bone.head_local.y))
-            if edit_bone.parent:
-                slope = (
-                    edit_bone.parent.head_local.x - edit_bone.parent.tail_local.x,
-                    edit_bone.parent.head_local.y - edit_bone.parent.tail_local.y
-                )
-
-                parent_angle = atan2(slope[0], slope[1]) + radians(90)
-                parent_position = Vector((edit_bone.parent.head_local.x, edit_bone.parent.head_local.y))
-            else:
-                parent_angle = 0.0
-                parent_position = Vector((0.0, 0.0))
-            position -= parent_position
-            position = rotate_around_point(position, parent_angle)
-            return position[0] * self.pixels, -position[1] * self.pixels
-
-        # returns the location of the bone in the pose position, calculated for use in Godot's 2d space
-        def pose_location():
-            position = Vector((pose_bone.head.x, pose_bone.head.y))
-            if pose_bone.parent:
-                slope = (
-                    pose_bone.parent.head.x - pose_bone.parent.tail.x,
-                    pose_bone.parent.head.y - pose_bone.parent.tail.y
-                )
-                parent_angle = atan2(slope[0], slope[1]) + radians(90)
-                parent_position = Vector((pose_bone.parent.head.x, pose_bone.parent.head.y))
-            else:
-                parent_angle = 0.0
-                parent_position = Vector((0.0, 0.0))
-            position -= parent_position
-            position = rotate_around_point(position, parent_angle)
-            return position[0] * self.pixels, -position[1] * self.pixels
-
-        # returns the rotation of the bone in the rest position, calculated for use in Godot's 2d space
-        def rest_angle():
-            edit_bone = pose_bone.bone
-            slope = (
-                edit_bone.head_local.x - edit_bone.tail_local.x,
-                edit_bone.head_local.y - edit_bone.tail_local.y
-            )
-
-            angle = atan2(slope[0], slope[1]) + radians(90)
-            if edit_bone.parent:
-                slope = (
-                    edit_bone.parent.head_local.x - edit_bone.parent.tail_local.x,
-                    edit_bone.parent.head_local.y - edit_bone.parent.tail_local.y
-                )
+    # returns a key that changes whenever anything the Skeleton2D and Bone2D node strings are parsed from changes
+    def cache_key(self):
+        hasher = self._cache_hasher()
+        armature = self.obj.data
+        hash_values(
+            hasher,
+            armature.pose_position,
+            [(x.name, x.parent.name if x.parent else "") for x in self.obj.pose.bones]
+        )
+        hash_collection(hasher, armature.bones, "head_local", size=3)
+        hash_collection(hasher, armature.bones, "tail_local", size=3)
+        hash_collection(hasher, self.obj.pose.bones, "head", size=3)
+        hash_collection(hasher, self.obj.pose.bones, "tail", size=3)
+        hash_collection(hasher, self.obj.pose.bones, "scale", size=3)
+        return hasher.hexdigest()
+
+    # returns the path of the Bone2D node's parent, and the location and rotation of the bone at rest and in its current
+    # position, calculated for use in Godot's 2d space
+    def bone2d_transform(self, pose_bone):
+        if self.bone2d_transforms is None:
+            self.bone2d_transforms = self._bone2d_transforms()
+        return self.bone2d_transforms[pose_bone.name]
+
+    # calculates the Bone2D transforms of every bone in the armature at once, keyed by the name of the bone
+    # the heads and tails of the bones are read in bulk, and the locations and rotations relative to the parent bones
+    # are calculated with the 2d transform kernels
+    def _bone2d_transforms(self):
+        pose_bones = self.obj.pose.bones
+        bones = self.obj.data.bones
+        bone_indices = {x.name: y for y, x in enumerate(pose_bones)}
+        parent_indices = np.array(
+            [bone_indices[x.parent.name] if x.parent else -1 for x in pose_bones], dtype=np.int64
+        )
+        has_parent = parent_indices >= 0
+
+        # returns the location and rotation of every bone relative to its parent, calculated for use in Godot's 2d space
+        # the coordinates are single precision, like the vectors the bones are read into
+        def relative_transforms(heads, tails):
+            angles = slope_angles(heads.astype(np.float64) - tails.astype(np.float64))
+            parent_angles = np.where(has_parent, angles[parent_indices], 0.0)
+            parent_positions = np.where(has_parent[:, np.newaxis], heads[parent_indices], np.float32(0))
+            positions = godot_points(rotate_points(heads - parent_positions, parent_angles), self.pixels)
+            return [tuple(x) for x in positions.tolist()], wrap_angles(angles - parent_angles).tolist()
+
+        # the bones of the armature data in the order of the pose bones
+        bone_indices = {x.name: y for y, x in enumerate(bones)}
+        rest_order = [bone_indices[x.name] for x in pose_bones]
+        locations_at_rest, angles_at_rest = relative_transforms(
+            read_array(bones, "head_local", size=3)[rest_order, :2],
+            read_array(bones, "tail_local", size=3)[rest_order, :2]
+        )
 
-                parent_angle = atan2(slope[0], slope[1]) + radians(90)
-            else:
-                parent_angle = 0
-            angle -= parent_angle
-            return atan2(sin(angle), cos(angle))
-
-        # returns the rotation of the bone in the pose position, calculated for use in Godot's 2d space
-        def pose_angle():
-            slope = (
-                pose_bone.head.x - pose_bone.tail.x,
-                pose_bone.head.y - pose_bone.tail.y
+        # use the armatures pose position to determine whether to export the bone position in the rest mode or the pose
+        # mode, ensures the user gets the results they expect as seen in Blender
+        if self.obj.data.pose_position == 'POSE':
+            current_positions, current_angles = relative_transforms(
+                read_array(pose_bones, "head", size=3)[:, :2],
+                read_array(pose_bones, "tail", size=3)[:, :2]
             )
+        else:
+            current_positions, current_angles = locations_at_rest, angles_at_rest
 
-            angle = atan2(slope[0], slope[1]) + radians(90)
-            if pose_bone.parent:
-                slope = (
-                    pose_bone.parent.head.x - pose_bone.parent.tail.x,
-                    pose_bone.parent.head.y - pose_bone.parent.tail.y
-                )
-
-                parent_angle = atan2(slope[0], slope[1]) + radians(90)
-            else:
-                parent_angle = 0
-            angle -= parent_angle
-            return atan2(sin(angle), cos(angle))
-
-        # calculate the path of the Bone2D node
+        # calculate the path of the Bone2D nodes
         if self.parent_string != ".":
-            parents = [self.parent_string]
+            armature_path = [self.parent_string, self.obj.name]
         else:
-            parents = []
-        parents += [self.obj.name] + [x.name for x in reversed(pose_bone.parent_recursive)]
-        parents = "/".join(parents)
+            armature_path = [self.obj.name]
+
+        transforms = {}
+        for index, pose_bone in enumerate(pose_bones):
+            parents = "/".join(armature_path + [x.name for x in reversed(pose_bone.parent_recursive)])
+            transforms[pose_bone.name] = (
+                parents,
+                locations_at_rest[index],
+                angles_at_rest[index],
+                current_positions[index],
+                current_angles[index]
+            )
+        return transforms
 
-        # get the rest values, so I don't have to rerun those functions
-        location_at_rest = rest_location()
-        angle_at_rest = rest_angle()
+    # returns the node string for the Bone2D node of a bone in this armature
+    def bone2d_node(self, pose_bone):
+        parents, location_at_rest, angle_at_rest, current_position, current_angle = self.bone2d_transform(pose_bone)
 
         # parse a string that Godot will recognize as the bone's rest position
         rest_pose = ", ".join(
@@ -767,15 +1081,6 @@ class ArmatureObjectParser(ObjectToExport):
             ]
         )
 
-        # use the armatures pose position to determine whether to export the bone position in the rest mode or the pose
-        # mode, ensures the user gets the results they expect as seen in Blender
-        if self.obj.data.pose_position == 'POSE':
-            current_position = pose_location()
-            current_angle = pose_angle()
-        else:
-            current_position = location_at_rest
-            current_angle = angle_at_rest
-
         # parse lines that are present only in Godot 4.0 and later
         if self.gd_scene_format == 3:
             auto_calculate_line = "auto_calculate_length_and_angle = false\n"
@@ -796,15 +1101,195 @@ class ArmatureObjectParser(ObjectToExport):
         )
 
 
-# uses data gathered by the previous classes to write a new *.tscn file
-def write_godot_scene(new_file_path):
+# parses the Node2D nodes of the collections an object is a child of
+def _parse_collection_nodes(parsing_instance, object_parser, reporting_instance):
+    with trace_span("Collection Nodes", collections=len(object_parser.collections)):
+        reporting_instance.start_sub_job()
+        for collection in object_parser.collections:
+            reporting_instance.update()
 
-    # instantiate GodotSceneParser and get the initial elements of the scene to be built
-    parsing_instance = GodotSceneParser()
-    parsing_instance.initialize_scene_elements()
+            collection_parser_instance = CollectionObjectParser(collection)
+            parsing_instance.append_nodes(collection_parser_instance.node2d())
+
+        reporting_instance.end_sub_job()
+
+
+# adds the nodes restored from the export cache to the parsing_instance
+def _splice_cached_nodes(parsing_instance, cached_nodes, reporting_instance):
+    with trace_span("Cached Nodes", nodes=len(cached_nodes)):
+        reporting_instance.start_sub_job()
+        for node in cached_nodes:
+            reporting_instance.update()
+            parsing_instance.append_nodes(node)
+        reporting_instance.end_sub_job()
+
+
+# parses the Polygon2D node of a mesh object, and the nodes of its collections and texture
+# returns the nodes of the object and whether they came from the export cache
+def _parse_mesh_nodes(parsing_instance, obj, new_file_path, export_cache):
+    job_name = f"Parsing \"{obj.name}\" Node"
+
+    with trace_span("Hierarchy"):
+        object_parser = MeshObjectParser(obj)
+
+    # save the texture and parse the external resource if an image exists for this mesh
+    # this is done first because the texture's resource id is part of the cache key
+    if obj.gd2db_texture_image != "None":
+        with trace_span("Texture Save", image=obj.gd2db_texture_image) as counters:
+            counters["saved"] = object_parser.save_texture(new_file_path, parsing_instance)
+            parsing_instance.append_external_resources(object_parser.external_resource())
+
+    # meshes too large to be parsed within the memory budget are streamed to the scene file in chunks
+    streamed = object_parser.streams_in_chunks()
+
+    # check the cache for the node string of this object, streamed nodes are never cached
+    cache_key = None
+    cached_nodes = None
+    if export_cache is not None and not streamed:
+        with trace_span("Cache Key", vertices=len(object_parser.mesh.vertices)) as counters:
+            cache_key = object_parser.cache_key()
+            cached_nodes = export_cache.get(obj.name, cache_key)
+            counters["hit"] = cached_nodes is not None
+
+    # build the list of job titles and calculate there totals
+    if cached_nodes is not None:
+        sub_jobs = [
+            "Parsing Node2D Nodes",
+            "Splicing Cached Nodes"
+        ]
+        sub_job_totals = [
+            len(object_parser.collections),
+            len(cached_nodes)
+        ]
+    elif streamed:
+        sub_jobs = [
+            "Parsing Node2D Nodes"
+        ]
+        sub_job_totals = [
+            len(object_parser.collections)
+        ]
+    else:
+        sub_jobs = [
+            "Parsing Node2D Nodes",
+            "Building Vertex Index Map",
+            "Building Loop Index Map",
+            "Gathering Vertex Data",
+            "Building Polygons"
+        ]
+        sub_job_totals = [
+            len(object_parser.collections),
+            len(object_parser.mesh.vertices),
+            len(object_parser.mesh.loops),
+            len(object_parser.mesh.vertices),
+            len(object_parser.mesh.polygons)
+        ]
 
-    # give a warning message and return if the user is attempting to add elements in a different formate from the
-    # original scene
+        # remove the loop index map job if there are no uv layers
+        if not object_parser.mesh.uv_layers:
+            del sub_jobs[2]
+            del sub_job_totals[2]
+
+    # instantiate the ProgressReporter and apply that instance to the object_parser
+    reporting_instance = ProgressReporter(job_name, sub_jobs, sub_job_totals)
+    object_parser.get_reporting_instance(reporting_instance)
+
+    # iterate through the collections this object is a child of and parse the "Node2D" node
+    _parse_collection_nodes(parsing_instance, object_parser, reporting_instance)
+
+    # splice the cached Polygon2D node or parse a new one and store it in the cache
+    if cached_nodes is not None:
+        _splice_cached_nodes(parsing_instance, cached_nodes, reporting_instance)
+        return cached_nodes, True
+
+    # streamed nodes aren't cached, the cache would hold all of their text
+    if streamed:
+        polygon2d_node = object_parser.polygon2d_streamed_node()
+        parsing_instance.append_nodes(polygon2d_node)
+        return [polygon2d_node], False
+
+    polygon2d_node = object_parser.polygon2d_node()
+    parsing_instance.append_nodes(polygon2d_node)
+    if export_cache is not None:
+        export_cache.store(obj.name, cache_key, [polygon2d_node])
+    return [polygon2d_node], False
+
+
+# parses the Skeleton2D node of an armature object, the Bone2D nodes of its bones, and the nodes of its collections
+# returns the nodes of the object and whether they came from the export cache
+def _parse_armature_nodes(parsing_instance, obj, export_cache):
+    job_name = f"Parsing \"{obj.name}\" Node"
+
+    with trace_span("Hierarchy"):
+        object_parser = ArmatureObjectParser(obj)
+
+    # check the cache for the node strings of this object
+    cache_key = None
+    cached_nodes = None
+    if export_cache is not None:
+        with trace_span("Cache Key", bones=len(obj.pose.bones)) as counters:
+            cache_key = object_parser.cache_key()
+            cached_nodes = export_cache.get(obj.name, cache_key)
+            counters["hit"] = cached_nodes is not None
+
+    # build the list of job titles, calculate there totals, and instantiate the ProgressReporter
+    sub_jobs = [
+        "Parsing Node2D Nodes",
+        "Splicing Cached Nodes" if cached_nodes is not None else "Parsing Bone2D Nodes"
+    ]
+    sub_job_totals = [
+        len(object_parser.collections),
+        len(cached_nodes) if cached_nodes is not None else len(obj.pose.bones)
+    ]
+    reporting_instance = ProgressReporter(job_name, sub_jobs, sub_job_totals)
+
+    # iterate through the collections this object is a child of and parse the "Node2D" node
+    _parse_collection_nodes(parsing_instance, object_parser, reporting_instance)
+
+    # splice the cached Skeleton2D and Bone2D nodes
+    if cached_nodes is not None:
+        _splice_cached_nodes(parsing_instance, cached_nodes, reporting_instance)
+        return cached_nodes, True
+
+    with trace_span("Bone Nodes", bones=len(obj.pose.bones)):
+        # parse the Skeleton2D node and append it to the parsing_instance
+        armature_nodes = [object_parser.skeleton2d_node()]
+        parsing_instance.append_nodes(armature_nodes[0])
+
+        # iterate through the bones in this armature and parse the "Bone2D" node
+        reporting_instance.start_sub_job()
+        for bone in obj.pose.bones:
+            reporting_instance.update()
+            armature_nodes.append(object_parser.bone2d_node(bone))
+            parsing_instance.append_nodes(armature_nodes[-1])
+        reporting_instance.end_sub_job()
+
+    if export_cache is not None:
+        export_cache.store(obj.name, cache_key, armature_nodes)
+    return armature_nodes, False
+
+
+# parses the nodes of the supplied objects and adds them to the parsing_instance
+# nodes of unchanged objects are spliced in from the export_cache, if one is supplied
+def parse_object_nodes(parsing_instance, objects, new_file_path, export_cache=None):
+    # iterate through the objects being exported and parse their nodes
+    for obj in objects:
+        # check if the object is a mesh or an armature to determine what type of parser to use
+        with trace_span("Object", object=obj.name, type=obj.type) as counters:
+            if obj.type == 'MESH':
+                nodes, cached = _parse_mesh_nodes(parsing_instance, obj, new_file_path, export_cache)
+                mesh = ObjectToExport.memo.get(("export_mesh", obj.as_pointer()), obj.data)
+                counters.update(vertices=len(mesh.vertices), polygons=len(mesh.polygons))
+            elif obj.type == 'ARMATURE':
+                nodes, cached = _parse_armature_nodes(parsing_instance, obj, export_cache)
+                counters.update(bones=len(obj.pose.bones))
+            else:
+                continue
+            counters.update(bytes=sum(len(x) for x in nodes), cached=cached)
+
+
+# returns false, after showing a warning message, if the user is attempting to add elements in a different format from
+# the original scene
+def scene_format_matches(parsing_instance):
     if parsing_instance.gd_scene_format != parsing_instance.get_gd_scene_format():
         custom_message_box(
             message="You are attempting to export objects to a scene "
@@ -813,96 +1298,105 @@ def write_godot_scene(new_file_path):
             icon="CANCEL",
         )
         return False
+    return True
 
-    # called after instantiation of GodotSceneParser to use data from the elements variable
-    ObjectToExport.setup(parsing_instance)
-
-    # iterate through the objects being exported and parse their nodes
-    for obj in ObjectToExport.exportable_objects:
-        print("\n")
-        job_name = f"Parsing \"{obj.name}\" Node"
-
-        # check if the object is a mesh or an armature to determine what type of parser to use
-        if obj.type == 'MESH':
-            object_parser = MeshObjectParser(obj)
-
-            # build the list of job titles and calculate there totals
-            sub_jobs = [
-                "Parsing Node2D Nodes",
-                "Building Vertex Index Map",
-                "Building Loop Index Map",
-                "Gathering Vertex Data",
-                "Building Polygons"
-            ]
-            sub_job_totals = [
-                len(object_parser.collections),
-                len(obj.data.vertices),
-                len(obj.data.loops),
-                len(obj.data.vertices),
-                len(obj.data.polygons)
-            ]
 
-            # remove the loop index map job if there are no uv layers
-            if not obj.data.uv_layers:
-                del sub_jobs[2]
-                del sub_job_totals[2]
+# sorts the elements of the parsing_instance and writes them to a new *.tscn file
+# the reporting_instance is optional, the scenes of a collection export are finalized without reporting progress
+def finalize_godot_scene(parsing_instance, new_file_path, reporting_instance=None):
+    parsing_instance.get_reporting_instance(reporting_instance)
 
-            # instantiate the ProgressReporter and apply that instance to the object_parser
-            reporting_instance = ProgressReporter(job_name, sub_jobs, sub_job_totals)
-            object_parser.get_reporting_instance(reporting_instance)
+    # sort and finalize the nodes and external resources of the scene
+    with trace_span("Sort Resources", resources=len(parsing_instance.elements["ext_resource"])):
+        parsing_instance.sort_finalize_external_resources()
+    with trace_span("Sort Nodes", nodes=len(parsing_instance.elements["node"])):
+        parsing_instance.sort_finalize_nodes()
 
-            # iterate through the collections this object is a child of and parse the "Node2D" node
+    # create the *.tscn file and write the elements from the parsing_instance to the file
+    with trace_span("Write", scene=os.path.basename(new_file_path)) as counters:
+        if reporting_instance is not None:
             reporting_instance.start_sub_job()
-            for collection in object_parser.collections:
-                reporting_instance.update()
-                reporting_instance.adjust_update_rate()
+        elements = [parsing_instance.parse_file_descriptor()] + sum(parsing_instance.elements.values(), [])
+        with open(new_file_path, "w") as new_godot_scene:
+            for element in elements:
+                if reporting_instance is not None:
+                    reporting_instance.update()
+                if isinstance(element, StreamedNode):
+                    element.write(new_godot_scene)
+                    new_godot_scene.write("\n")
+                else:
+                    new_godot_scene.write(f"{element}\n")
+            counters["bytes"] = new_godot_scene.tell()
+        if reporting_instance is not None:
+            reporting_instance.end_sub_job()
 
-                collection_parser_instance = CollectionObjectParser(collection)
-                parsing_instance.append_nodes(collection_parser_instance.node2d())
 
-            reporting_instance.end_sub_job()
+# every export is traced, the trace is summarized for the export statistics, and only written to a file if the user
+# enabled tracing, next to the scene returned by scene_path_of, even if the export fails
+def traced_export(scene_path_of):
+    def decorator(export_function):
+        @wraps(export_function)
+        def wrapper(*args, **kwargs):
+            scene_path = scene_path_of(*args, **kwargs)
+
+            # exports run by the profiler already record a trace, it's summarized the same way, but saved by the
+            # profiler
+            trace = gd2db_trace.active_trace
+            owns_trace = trace is None
+            if owns_trace:
+                trace = start_trace(export_function.__name__)
+            start_time = perf_counter()
+            export_success = False
+            try:
+                with trace_span(export_function.__name__, category="run"):
+                    export_success = export_function(*args, **kwargs)
+                return export_success
+            finally:
+                if owns_trace:
+                    stop_trace()
+                if export_success:
+                    append_export_history(summarize_trace(trace, scene_path, perf_counter() - start_time))
+                if owns_trace and bpy.context.scene.godot_2d_bridge_tools.write_trace:
+                    trace_path = save_trace(trace, scene_path)
+                    if trace_path:
+                        progress_message(f"Export trace written to \"{trace_path}\"")
+        return wrapper
+    return decorator
 
-            # save the texture and parse the external resource if an image exists for this mesh
-            if obj.gd2db_texture_image != "None":
-                object_parser.save_texture(new_file_path, parsing_instance)
-                parsing_instance.append_external_resources(object_parser.external_resource())
 
-            # parse the Polygon2D node
-            parsing_instance.append_nodes(object_parser.polygon2d_node())
+# uses data gathered by the previous classes to write a new *.tscn file
+# objects can be used to only parse the nodes of some of the exportable objects, e.g. when re-exporting changed objects
+# into a scene that already contains the nodes of the rest
+@traced_export(lambda new_file_path, objects=None: new_file_path)
+def write_godot_scene(new_file_path, objects=None):
 
-        if obj.type == 'ARMATURE':
-            object_parser = ArmatureObjectParser(obj)
+    # instantiate GodotSceneParser and get the initial elements of the scene to be built
+    parsing_instance = GodotSceneParser()
+    with trace_span("Scene Parse"):
+        parsing_instance.initialize_scene_elements()
+    if not scene_format_matches(parsing_instance):
+        return False
 
-            # build the list of job titles, calculate there totals, and instantiate the ProgressReporter
-            sub_jobs = [
-                "Parsing Node2D Nodes",
-                "Parsing Bone2D Nodes"
-            ]
-            sub_job_totals = [
-                len(object_parser.collections),
-                len(obj.pose.bones)
-            ]
-            reporting_instance = ProgressReporter(job_name, sub_jobs, sub_job_totals)
+    # called after instantiation of GodotSceneParser to use data from the elements variable
+    with trace_span("Hierarchy Index"):
+        ObjectToExport.setup(parsing_instance)
 
-            # iterate through the collections this object is a child of and parse the "Node2D" node
-            reporting_instance.start_sub_job()
-            for collection in object_parser.collections:
-                reporting_instance.update()
-                reporting_instance.adjust_update_rate()
-                collection_parser_instance = CollectionObjectParser(collection)
-                parsing_instance.append_nodes(collection_parser_instance.node2d())
-            reporting_instance.end_sub_job()
+    # load the node strings of previous exports to the same scene, if the user has the export cache enabled
+    if bpy.context.scene.godot_2d_bridge_tools.use_export_cache:
+        export_cache = ExportCache(new_file_path)
+    else:
+        export_cache = None
 
-            # parse the Skeleton2D node and append it to the parsing_instance
-            parsing_instance.append_nodes(object_parser.skeleton2d_node())
+    # the hierarchy of every object is still based on all exportable objects, so the nodes of a partial export get the
+    # same parents as in a full export
+    if objects is None:
+        objects = ObjectToExport.exportable_objects
 
-            # iterate through the bones in this armature and parse the "Bone2D" node
-            reporting_instance.start_sub_job()
-            for bone in obj.pose.bones:
-                reporting_instance.update()
-                reporting_instance.adjust_update_rate()
-                parsing_instance.append_nodes(object_parser.bone2d_node(bone))
-            reporting_instance.end_sub_job()
+    parse_object_nodes(parsing_instance, objects, new_file_path, export_cache)
+
+    # write the updated cache next to the new scene
+    if export_cache is not None:
+        export_cache.save(existing_names={x.name for x in bpy.data.objects})
 
     # parse the name of the new file, build the list of job titles, and calculate there totals
     new_file = new_file_path.split(os.sep)[-1]
@@ -917,20 +1411,85 @@ def write_godot_scene(new_file_path):
         sum([len(x) for x in parsing_instance.elements.values()])
     ]
 
-    print("\n")
     reporting_instance = ProgressReporter(f"Finalizing Scene", sub_jobs, sub_job_totals)
-    parsing_instance.get_reporting_instance(reporting_instance)
+    finalize_godot_scene(parsing_instance, new_file_path, reporting_instance)
+    return True
 
-    # sort and finalize the nodes and external resources of the scene
-    parsing_instance.sort_finalize_external_resources()
-    parsing_instance.sort_finalize_nodes()
 
-    # create the *.tscn file and write the elements from the parsing_instance to the file
-    reporting_instance.start_sub_job()
-    elements = [parsing_instance.parse_file_descriptor()] + sum(parsing_instance.elements.values(), [])
-    with open(new_file_path, "w") as new_godot_scene:
-        for element in elements:
-            reporting_instance.update()
-            new_godot_scene.write(f"{element}\n")
-    reporting_instance.end_sub_job()
-    return True
+# returns the meshes and their linked armatures that are exported to different scenes
+# the skeleton of the Polygon2D node is a path to the armature's node, which doesn't exist in the scene of the mesh
+def _split_armature_meshes(partitions):
+    scene_of = {x.as_pointer(): key for key, objects in partitions.items() for x in objects}
+    split_meshes = []
+    for obj in ObjectToExport.exportable_objects:
+        if obj.type != 'MESH' or obj.as_pointer() not in scene_of:
+            continue
+        # the same armature MeshObjectParser links the mesh to
+        for modifier in obj.modifiers:
+            if (
+                    modifier.type == 'ARMATURE'
+                    and modifier.object
+                    and modifier.object.as_pointer() in ObjectToExport.exportable_pointers
+            ):
+                if scene_of.get(modifier.object.as_pointer()) != scene_of[obj.as_pointer()]:
+                    split_meshes.append((obj, modifier.object))
+                break
+    return split_meshes
+
+
+# exports the objects of every top-level collection of the scene to their own *.tscn file in the supplied directory
+# objects only linked to the scene's own collection are exported to a scene named after the Blender scene
+# the hierarchy index and the memoized mesh data are shared by all the scenes, which are parsed and written one after
+# another, streamed nodes read Blender data while they are written, so scenes can't be written by other processes
+# returns a list of the written paths and a list of the meshes whose armature was exported to another scene, or None if
+# the export was canceled
+@traced_export(lambda directory: os.path.join(directory, "collection_scenes"))
+def write_godot_collection_scenes(directory):
+    scene = bpy.context.scene
+    use_export_cache = scene.godot_2d_bridge_tools.use_export_cache
+
+    # a scene without any elements is enough to set up the values shared by every scene
+    with trace_span("Hierarchy Index"):
+        ObjectToExport.setup(GodotSceneParser())
+
+    # partition the exportable objects by the top-level collection of their top exported parent, so children are
+    # always exported to the same scene as their parents
+    top_level_collections = list(scene.collection.children) + [scene.collection]
+    partitions = {x.as_pointer(): [] for x in top_level_collections}
+    for obj in ObjectToExport.exportable_objects:
+        collection = ObjectToExport.first_linked_collection(ObjectToExport.root_object(obj))
+        while collection is not None and collection.as_pointer() not in partitions:
+            collection = ObjectToExport.collection_parents.get(collection.as_pointer())
+        if collection is None:
+            collection = scene.collection
+        partitions[collection.as_pointer()].append(obj)
+    split_meshes = _split_armature_meshes(partitions)
+    for mesh_obj, armature in split_meshes:
+        print(f"\n\"{mesh_obj.name}\" is exported to another scene than its armature \"{armature.name}\", its skeleton "
+              f"path won't be found")
+
+    # initialize the elements of every scene before parsing anything, so a format mismatch cancels the whole export
+    scenes = []
+    for collection in top_level_collections:
+        objects = partitions[collection.as_pointer()]
+        if objects:
+            scene_name = scene.name if collection == scene.collection else collection.name
+            scene_path = os.path.join(directory, f"{bpy.path.clean_name(scene_name)}.tscn")
+            parsing_instance = GodotSceneParser()
+            with trace_span("Scene Parse", scene=os.path.basename(scene_path)):
+                parsing_instance.initialize_scene_elements(original_path=scene_path)
+            if not scene_format_matches(parsing_instance):
+                return None
+            scenes.append((parsing_instance, scene_path, objects))
+
+    for parsing_instance, scene_path, objects in scenes:
+        ObjectToExport.use_parsing_instance(parsing_instance)
+        export_cache = ExportCache(scene_path) if use_export_cache else None
+        parse_object_nodes(parsing_instance, objects, scene_path, export_cache)
+        if export_cache is not None:
+            export_cache.save(existing_names={x.name for x in bpy.data.objects})
+
+    progress_message(f"Writing {len(scenes)} scene(s)")
+    for parsing_instance, scene_path, _objects in scenes:
+        finalize_godot_scene(parsing_instance, scene_path)
+    return [x[1] for x in scenes], split_meshes
@@ -0,0 +1,173 @@
+import os
+import json
+import threading
+from heapq import nlargest
+from time import (
+    perf_counter,
+    strftime
+)
+from contextlib import (
+    contextmanager,
+    nullcontext
+)
+
+from .gd2db_utilities import addon_data_directory
+
+TRACE_DIRECTORY = "GD2DB_traces"
+
+# the number of objects kept in the summary of an export, the slowest ones
+SUMMARY_OBJECTS = 10
+
+
+# records the start, duration, and counters of every phase of an export as Chrome trace events
+# the resulting file can be opened with chrome://tracing or https://ui.perfetto.dev
+class ExportTrace:
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+        self.start_time = perf_counter()
+
+        # functions called with the event at the end of every span, used by the profiler to sample memory use
+        self.span_end_hooks = []
+
+    def _timestamp(self, time):
+        return (time - self.start_time) * 1000000
+
+    # records a complete event for the code run inside the with statement
+    # counters are stored in the args of the event, and can still be changed through the yielded dictionary
+    @contextmanager
+    def span(self, name, category, counters):
+        args = dict(counters)
+        start_time = perf_counter()
+        try:
+            yield args
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self._timestamp(start_time),
+                "dur": (perf_counter() - start_time) * 1000000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args
+            }
+            self.events.append(event)
+            for hook in self.span_end_hooks:
+                hook(event)
+
+    # records the current value of one or more counters, shown as a graph by trace viewers
+    def counter(self, name, values):
+        event = {
+            "name": name,
+            "ph": "C",
+            "ts": self._timestamp(perf_counter()),
+            "pid": os.getpid(),
+            "args": dict(values)
+        }
+        self.events.append(event)
+
+    # writes the trace to the supplied path
+    def save(self, path):
+        events = sorted(self.events, key=lambda x: x["ts"])
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"export": self.name}}, trace_file)
+
+
+# the trace of the export that is currently running, if any
+active_trace = None
+
+
+# returns a context manager recording a span of the active trace, or a context manager doing nothing if no trace is
+# being recorded, so the instrumentation costs next to nothing when tracing is disabled
+def trace_span(name, category="export", **counters):
+    if active_trace is None:
+        return nullcontext(counters)
+    return active_trace.span(name, category, counters)
+
+
+# records the values of a counter in the active trace, if a trace is being recorded
+def trace_counter(name, **values):
+    if active_trace is not None:
+        active_trace.counter(name, values)
+
+
+def start_trace(name):
+    global active_trace
+    active_trace = ExportTrace(name)
+    return active_trace
+
+
+# stops recording and returns the recorded trace
+def stop_trace():
+    global active_trace
+    trace = active_trace
+    active_trace = None
+    return trace
+
+
+# stops recording and writes the trace next to the supplied scene path, returns the path of the trace file
+def finish_trace(scene_path):
+    return save_trace(stop_trace(), scene_path)
+
+
+# writes the trace to a GD2DB_traces folder next to the supplied scene path, returns the path of the trace file
+def save_trace(trace, scene_path):
+    if trace is None:
+        return ""
+
+    scene_name = os.path.splitext(os.path.basename(scene_path))[0] or "export"
+    try:
+        directory = addon_data_directory(scene_path, TRACE_DIRECTORY)
+        trace_path = os.path.join(directory, f"{scene_name}_{strftime('%Y%m%d-%H%M%S')}.trace.json")
+        trace.save(trace_path)
+    except OSError:
+        return ""
+    return trace_path
+
+
+# returns a summary of an export trace, used for the export statistics
+# the time of every phase, the counters and time of the slowest objects, the totals of the objects that weren't restored
+# from the export cache, and the number of saved and skipped textures
+# the summary is saved with the blend file, so only SUMMARY_OBJECTS objects are kept, however many were exported
+def summarize_trace(trace, scene_path, total_time):
+    phases = {}
+    objects = []
+    totals = {"mesh_time": 0.0, "vertices": 0, "armature_time": 0.0, "bones": 0}
+    textures_saved = 0
+    textures_skipped = 0
+    bytes_written = 0
+    for event in trace.events:
+        if event["ph"] != "X" or event["cat"] != "export":
+            continue
+        duration = event["dur"] / 1000000
+        if event["name"] == "Object":
+            objects.append({"time": duration, **event["args"]})
+            if not event["args"].get("cached"):
+                if event["args"].get("type") == 'MESH':
+                    totals["mesh_time"] += duration
+                    totals["vertices"] += event["args"].get("vertices", 0)
+                elif event["args"].get("type") == 'ARMATURE':
+                    totals["armature_time"] += duration
+                    totals["bones"] += event["args"].get("bones", 0)
+            continue
+        phases[event["name"]] = phases.get(event["name"], 0.0) + duration
+        if event["name"] == "Texture Save":
+            if event["args"].get("saved"):
+                textures_saved += 1
+            else:
+                textures_skipped += 1
+        elif event["name"] == "Write":
+            bytes_written += event["args"].get("bytes", 0)
+
+    return {
+        "date": strftime("%Y-%m-%d %H:%M:%S"),
+        "scene": os.path.basename(scene_path),
+        "time": total_time,
+        "bytes": bytes_written,
+        "textures_saved": textures_saved,
+        "textures_skipped": textures_skipped,
+        "phases": phases,
+        "totals": totals,
+        "objects": nlargest(SUMMARY_OBJECTS, objects, key=lambda x: x["time"])
+    }
@@ -1,5 +1,6 @@
 from bpy_types import Panel
-from .gd2db_utilities import export_objects
+from .gd2db_utilities import export_history, byte_size
+from .gd2db_panel_state import current_panel_state
 
 
 # noinspection PyPep8Naming
@@ -15,14 +16,13 @@ class GODOT_2D_BRIDGE_PT_setup_panel(Panel):
         row = box.row(align=True)
         row.label(text="Object Conversion")
         row = box.row(align=True)
-        if not any(
-                x.type == "MESH"
-                or x.type == "ARMATURE"
-                or x.empty_display_type == 'IMAGE'
-                for x in context.selected_objects
-        ) or context.mode != 'OBJECT':
+        # the selection is only scanned again after it changes
+        panel_state = current_panel_state(context)
+        if not panel_state["convertible"] or context.mode != 'OBJECT':
             row.enabled = False
         row.operator("gd2db.convert")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "sculpt_constraint")
 
         # noinspection PyUnresolvedReferences
         box = self.layout.box()
@@ -31,8 +31,8 @@ class GODOT_2D_BRIDGE_PT_setup_panel(Panel):
         row = box.row(align=True)
         row.prop(context.scene.godot_2d_bridge_tools, "reference_empty")
         row = box.row(align=True)
-        if not any(x.gd2db_object_2d for x in context.selected_objects)\
-                or not any(x.type == 'MESH' for x in context.selected_objects)\
+        if not panel_state["selected_2d"]\
+                or not panel_state["selected_mesh"]\
                 or context.scene.godot_2d_bridge_tools.reference_empty == "None"\
                 or context.mode != 'OBJECT':
             row.enabled = False
@@ -60,6 +60,43 @@ class GODOT_2D_BRIDGE_PT_export_panel(Panel):
         row = box.row(align=True)
         row.prop(context.scene.godot_2d_bridge_tools, "use_collection")
         row.prop(context.scene.godot_2d_bridge_tools, "selected")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "use_export_cache")
+        row.prop(context.scene.godot_2d_bridge_tools, "collection_scenes")
+        row.prop(context.scene.godot_2d_bridge_tools, "write_trace")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "use_modifiers")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "chunked_export")
+        sub_row = row.row(align=True)
+        sub_row.enabled = context.scene.godot_2d_bridge_tools.chunked_export
+        sub_row.prop(context.scene.godot_2d_bridge_tools, "memory_budget")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "lint_geometry")
+        sub_row = row.row(align=True)
+        sub_row.enabled = context.scene.godot_2d_bridge_tools.lint_geometry
+        sub_row.prop(context.scene.godot_2d_bridge_tools, "lint_blocks_export")
+        row.operator("gd2db.lint", icon='CHECKMARK')
+        row = box.row(align=True)
+        if not context.scene.godot_2d_bridge_tools.godot_scene:
+            row.enabled = False
+        row.prop(context.scene.godot_2d_bridge_tools, "watch_mode")
+        row.prop(context.scene.godot_2d_bridge_tools, "watch_interval")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "live_link")
+        sub_row = row.row(align=True)
+        sub_row.enabled = not context.scene.godot_2d_bridge_tools.live_link
+        sub_row.prop(context.scene.godot_2d_bridge_tools, "live_link_port")
+
+        # noinspection PyUnresolvedReferences
+        box = self.layout.box()
+        row = box.row(align=True)
+        row.label(text="Progress Output")
+        row = box.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "progress_output")
+        if 'JSON_LOG' in context.scene.godot_2d_bridge_tools.progress_output:
+            row = box.row(align=True)
+            row.prop(context.scene.godot_2d_bridge_tools, "progress_log")
 
         # noinspection PyUnresolvedReferences
         box = self.layout.box()
@@ -77,6 +114,65 @@ class GODOT_2D_BRIDGE_PT_export_panel(Panel):
 
         # noinspection PyUnresolvedReferences
         row = self.layout.row(align=True)
-        if not list(export_objects()) or context.mode != 'OBJECT':
+        if not current_panel_state(context)["exportable"] or context.mode != 'OBJECT':
             row.enabled = False
         row.operator("gd2db.export")
+        row.operator("gd2db.export", text="", icon='VIEWZOOM').dry_run = True
+        row.operator("gd2db.profile", text="", icon='TIME')
+
+
+# noinspection PyPep8Naming
+class GODOT_2D_BRIDGE_PT_statistics_panel(Panel):
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Godot 2d Bridge"
+    bl_label = "Export Statistics"
+    bl_parent_id = "GODOT_2D_BRIDGE_PT_export_panel"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        # noinspection PyUnresolvedReferences
+        row = self.layout.row(align=True)
+        row.prop(context.scene.godot_2d_bridge_tools, "export_history_length")
+        row.operator("gd2db.clear_history", icon='TRASH')
+
+        history = export_history(context.scene)
+        if not history:
+            # noinspection PyUnresolvedReferences
+            self.layout.label(text="No exports yet")
+            return
+
+        for statistics in history:
+            # noinspection PyUnresolvedReferences
+            box = self.layout.box()
+            row = box.row(align=True)
+            row.label(text=f"{statistics['scene']}", icon='FILE')
+            row.label(text=f"{statistics['time']:.2f}s  {byte_size(statistics['bytes'])}")
+            box.label(text=statistics["date"])
+
+            # the phases that took the longest
+            column = box.column(align=True)
+            phases = sorted(statistics["phases"].items(), key=lambda x: x[1], reverse=True)
+            for phase, phase_time in phases[:4]:
+                row = column.row(align=True)
+                row.label(text=phase)
+                row.label(text=f"{phase_time:.3f}s")
+
+            # the objects that dominated the export time
+            column = box.column(align=True)
+            for obj in statistics["objects"][:3]:
+                if obj["type"] == 'MESH':
+                    counts = f"{obj.get('vertices', 0)} verts, {obj.get('polygons', 0)} polys"
+                else:
+                    counts = f"{obj.get('bones', 0)} bones"
+                row = column.row(align=True)
+                row.label(text=obj["object"], icon='MESH_DATA' if obj["type"] == 'MESH' else 'ARMATURE_DATA')
+                row.label(text=f"{obj['time']:.3f}s  {byte_size(obj.get('bytes', 0))}")
+                row = column.row(align=True)
+                row.label(text=f"    {counts}{', cached' if obj.get('cached') else ''}")
+
+            if statistics["textures_saved"] or statistics["textures_skipped"]:
+                box.label(
+                    text=f"Textures: {statistics['textures_saved']} saved, {statistics['textures_skipped']} skipped",
+                    icon='IMAGE_DATA'
+                )
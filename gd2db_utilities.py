@@ -1,136 +1,342 @@
+import bpy
+import os
+import json
+import numpy as np
 from math import (
     cos,
     sin
 )
-import bpy
-from time import perf_counter
+from time import (
+    perf_counter,
+    time
+)
 from sys import stdout
 
+from .gd2db_registry import any_objects_2d
 
-# prints out a progress bar of a job and a series of sub-jobs to the console, and uses Blender's window manager to show
-# the jobs total progress at the cursor
-class ProgressReporter:
-    def __init__(self, job, sub_jobs, sub_job_totals):
-        self.job_total = sum(sub_job_totals)
-        self.sub_job_totals = sub_job_totals
-        self.job_progress = 0
-        self.sub_job_progress = 0
 
-        self.sub_jobs = sub_jobs
-        self.current_sub_job = None
+# prints out a progress bar of a job and its sub-jobs to the console
+class ConsoleProgressSink:
+    bar_len = 20
 
-        self.update_rate = 0.1
-        self.update_timer = perf_counter()
-        self.job_timer = None
+    def __init__(self):
+        self.name_len = 0
+        self.line_len = 0
 
-        self.name_len = len(max(self.sub_jobs, key=len))
-        self.bar_len = 20
+    def begin(self, reporter):
+        # every job is separated from the console output before it by blank lines
+        print("\n")
+        self.name_len = len(max(reporter.sub_jobs, key=len))
         self.line_len = self.name_len + self.bar_len + 37
 
         # used to adjust the length of the tittle line for visual alignment
-        if len(job) % 2 == self.line_len % 2:
+        if len(reporter.job) % 2 == self.line_len % 2:
             corrector = 0
         else:
             corrector = 1
 
-        # start the widow manager progress indicator
+        print(
+            f"{'-' * int(((self.line_len - len(reporter.job) - 2) / 2))} "
+            f"{reporter.job} "
+            f"{'-' * (int(((self.line_len - len(reporter.job) - 2) / 2)) + corrector)}"
+        )
+
+    def _prefix(self, reporter):
+        return (
+            f"{reporter.current_sub_job}"
+            f"{' ' * (5 + (self.name_len - len(reporter.current_sub_job)))}"
+            f"{reporter.sub_job_index + 1:02d}/{len(reporter.sub_jobs):02d} "
+        )
+
+    def start_sub_job(self, reporter):
+        # start the progress bar at 0%
+        stdout.write(f"{self._prefix(reporter)}[{' ' * self.bar_len}] 000%")
+        stdout.flush()
+
+    def update(self, reporter, progress, _total_progress):
+        # rewrite the console printout with the current progress of the sub-job
+        stdout.write(
+            f"\r{self._prefix(reporter)}"
+            f"[{'#' * int(progress * self.bar_len)}"
+            f"{' ' * (self.bar_len - (int(progress * self.bar_len)))}] "
+            f"{int(progress * 100):03d}%"
+        )
+        stdout.flush()
+
+    def end_sub_job(self, reporter, elapsed_time):
+        # print the progress bar a 100%
+        print(
+            f"\r{self._prefix(reporter)}"
+            f"[{'#' * self.bar_len}] 100%"
+            f"{' ' * 5}"
+            f"DONE in {elapsed_time:05.2f}s"
+        )
+
+    def end(self, _reporter):
+        # print the job separator line
+        print(f"{'-' * self.line_len}")
+
+    def message(self, text):
+        print(f"\n{text}")
+
+
+# uses Blender's window manager to show the job's total progress at the cursor
+class WindowManagerProgressSink:
+    def __init__(self):
         self.wm = bpy.context.window_manager
+
+    def begin(self, _reporter):
         self.wm.progress_begin(0, 100)
 
-        print(
-            f"{'-' * int(((self.line_len - len(job) - 2) / 2))} "
-            f"{job} "
-            f"{'-' * (int(((self.line_len - len(job) - 2) / 2)) + corrector)}"
+    def start_sub_job(self, _reporter):
+        pass
+
+    def update(self, _reporter, _progress, total_progress):
+        self.wm.progress_update(int(total_progress * 100))
+
+    def end_sub_job(self, _reporter, _elapsed_time):
+        pass
+
+    def end(self, _reporter):
+        self.wm.progress_end()
+
+    def message(self, _text):
+        pass
+
+
+# shows the current sub-job and its progress in the status bar
+class StatusBarProgressSink:
+    def __init__(self):
+        self.workspace = bpy.context.workspace
+
+    def begin(self, _reporter):
+        pass
+
+    def start_sub_job(self, reporter):
+        self.update(reporter, 0.0, 0.0)
+
+    def update(self, reporter, progress, _total_progress):
+        if self.workspace is not None:
+            self.workspace.status_text_set(f"{reporter.job}: {reporter.current_sub_job} {int(progress * 100):d}%")
+
+    def end_sub_job(self, _reporter, _elapsed_time):
+        pass
+
+    def end(self, _reporter):
+        if self.workspace is not None:
+            self.workspace.status_text_set(None)
+
+    def message(self, _text):
+        pass
+
+
+# appends one json object per line to a log file for every started and finished sub-job
+class JsonLogProgressSink:
+    def __init__(self, path):
+        self.path = path
+
+    def _append(self, record):
+        try:
+            with open(self.path, "a") as log_file:
+                log_file.write(f"{json.dumps(record)}\n")
+        except OSError:
+            pass
+
+    def _write(self, reporter, event, **values):
+        self._append(
+            {"time": time(), "event": event, "job": reporter.job, "sub_job": reporter.current_sub_job, **values}
         )
 
-    # used to initiate sub-jobs
+    def begin(self, reporter):
+        self._write(reporter, "begin", sub_jobs=reporter.sub_jobs, totals=reporter.sub_job_totals)
+
+    def start_sub_job(self, reporter):
+        self._write(reporter, "start", total=reporter.sub_job_totals[reporter.sub_job_index])
+
+    def update(self, _reporter, _progress, _total_progress):
+        pass
+
+    def end_sub_job(self, reporter, elapsed_time):
+        self._write(reporter, "end", elapsed=elapsed_time, items=reporter.sub_job_progress)
+
+    def end(self, reporter):
+        self._write(reporter, "finish")
+
+    def message(self, text):
+        self._append({"time": time(), "event": "message", "text": text})
+
+
+# sinks used by every ProgressReporter that isn't given its own, None uses the sinks chosen in the scene settings
+# scripts and headless runs can set this to an empty list to disable progress reporting
+sink_override = None
+
+
+# returns the progress sinks chosen by the user in the scene settings
+def progress_sinks():
+    if sink_override is not None:
+        return list(sink_override)
+
+    properties = bpy.context.scene.godot_2d_bridge_tools
+    sinks = []
+    if 'CONSOLE' in properties.progress_output:
+        sinks.append(ConsoleProgressSink())
+
+    # there is no window manager progress indicator or status bar to update in background mode
+    if not bpy.app.background:
+        if 'WINDOW_MANAGER' in properties.progress_output:
+            sinks.append(WindowManagerProgressSink())
+        if 'STATUS_BAR' in properties.progress_output:
+            sinks.append(StatusBarProgressSink())
+    if 'JSON_LOG' in properties.progress_output and properties.progress_log:
+        sinks.append(JsonLogProgressSink(bpy.path.abspath(properties.progress_log)))
+    return sinks
+
+
+# passes a line of progress output that isn't part of a job, e.g. the number of scenes being written, on to the sinks
+def progress_message(text):
+    for sink in progress_sinks():
+        sink.message(text)
+
+
+# tracks the progress of a job and a series of sub-jobs and passes it on to a list of sinks
+# update only increments a counter, the sinks are only called every stride items, and the stride is chosen so each
+# sub-job reports about a hundred times no matter how many items it has
+class ProgressReporter:
+    reports_per_sub_job = 100
+    min_report_interval = 0.05
+
+    def __init__(self, job, sub_jobs, sub_job_totals, sinks=None):
+        self.job = job
+        self.job_total = sum(sub_job_totals)
+        self.sub_job_totals = sub_job_totals
+        self.job_progress = 0
+        self.sub_job_progress = 0
+
+        self.sub_jobs = sub_jobs
+        self.sub_job_index = -1
+        self.current_sub_job = None
+
+        self.stride = 1
+        self.next_report = 1
+        self.report_timer = perf_counter()
+        self.job_timer = None
+
+        if sinks is None:
+            sinks = progress_sinks()
+        self.sinks = sinks
+
+        for sink in self.sinks:
+            sink.begin(self)
+
+    # used to initiate sub-jobs, will move on to the next job every time this function is called
     def start_sub_job(self):
-        # get the current_sub_job, will move on to the next job every time this function is called
-        if self.current_sub_job is None:
-            self.current_sub_job = self.sub_jobs[0]
-        else:
-            self.current_sub_job = self.sub_jobs[self.sub_jobs.index(self.current_sub_job) + 1]
+        # add the progress of the previous sub-job to the job progress
+        self.job_progress += self.sub_job_progress
+        self.sub_job_index += 1
+        self.current_sub_job = self.sub_jobs[self.sub_job_index]
 
-        # reset the sub_job_progress and the timer
+        # reset the sub_job_progress, the stride, and the timer
         self.sub_job_progress = 0
+        self.stride = max(1, self.sub_job_totals[self.sub_job_index] // self.reports_per_sub_job)
+        self.next_report = self.stride
         self.job_timer = perf_counter()
 
-        # start the progress bar at 0%
-        stdout.write(
-            f"{self.current_sub_job}"
-            f"{' ' * (5 + (self.name_len - len(self.current_sub_job)))}"
-            f"{self.sub_jobs.index(self.current_sub_job) + 1:02d}/{len(self.sub_jobs):02d} "
-            f"[{' ' * self.bar_len}] 000%"
-        )
-        stdout.flush()
+        for sink in self.sinks:
+            sink.start_sub_job(self)
 
-    # used to update the console print-out and the window manager
+    # counts an item of the current sub-job
     def update(self):
-        # update the progress variables
-        self.job_progress += 1
         self.sub_job_progress += 1
+        if self.sub_job_progress >= self.next_report:
+            self._report()
+
+    # counts several items of the current sub-job at once
+    def advance(self, count):
+        self.sub_job_progress += count
+        if self.sub_job_progress >= self.next_report:
+            self._report()
+
+    # passes the progress on to the sinks, called once every stride items
+    def _report(self):
+        self.next_report = self.sub_job_progress + self.stride
 
-        # check if the time elapsed since last update exceeds the update rate
-        if perf_counter() - self.update_timer > self.update_rate:
-
-            # reset the update_timer
-            self.update_timer = perf_counter()
-
-            # calculate the progress of the current sub-job and the total progress of the job
-            progress = self.sub_job_progress / self.sub_job_totals[self.sub_jobs.index(self.current_sub_job)]
-            total_progress = self.job_progress / self.job_total
-
-            # update the window manager and rewrite the console printout with the current progress of the sub-job
-            self.wm.progress_update(int(total_progress * 100))
-            stdout.write(
-                f"\r{self.current_sub_job}"
-                f"{' ' * (5 + (self.name_len - len(self.current_sub_job)))}"
-                f"{self.sub_jobs.index(self.current_sub_job) + 1:02d}/{len(self.sub_jobs):02d} "
-                f"[{'#' * int(progress * self.bar_len)}"
-                f"{' ' * (self.bar_len - (int(progress * self.bar_len)))}] "
-                f"{int(progress * 100):03d}%"
-            )
-            stdout.flush()
-
-    # used to finalise the console printout and, if on the last job, the window manager
+        # sinks like the status bar cause redraws, so they aren't updated more often than min_report_interval
+        if perf_counter() - self.report_timer < self.min_report_interval:
+            return
+        self.report_timer = perf_counter()
+
+        progress = min(self.sub_job_progress / (self.sub_job_totals[self.sub_job_index] or 1), 1.0)
+        total_progress = min((self.job_progress + self.sub_job_progress) / (self.job_total or 1), 1.0)
+        for sink in self.sinks:
+            sink.update(self, progress, total_progress)
+
+    # used to finalise the sub-job and, if on the last job, the job
     def end_sub_job(self):
-        # print the progress bar a 100%
-        print(
-            f"\r{self.current_sub_job}"
-            f"{' ' * (5 + (self.name_len - len(self.current_sub_job)))}"
-            f"{self.sub_jobs.index(self.current_sub_job) + 1:02d}/{len(self.sub_jobs):02d} "
-            f"[{'#' * self.bar_len}] 100%"
-            f"{' ' * 5}"
-            f"DONE in {perf_counter() - self.job_timer:05.2f}s"
-        )
+        elapsed_time = perf_counter() - self.job_timer
+        for sink in self.sinks:
+            sink.end_sub_job(self, elapsed_time)
 
         # check if the current sub-job is the last job
-        # if so, end the window manager progress and print the job separator line
-        if self.sub_jobs.index(self.current_sub_job) + 1 == len(self.sub_jobs):
-            self.wm.progress_end()
-            print(
-                f"{'-' * self.line_len}"
-            )
-
-    # uses the elapsed time of a job to estimate the amount of time a job will take
-    def _estimate_job_time(self):
-        # return none if no progress has been made
-        if self.job_progress == 0:
-            return None
+        if self.sub_job_index + 1 == len(self.sub_jobs):
+            self.job_progress += self.sub_job_progress
+            self.sub_job_progress = 0
+            for sink in self.sinks:
+                sink.end(self)
 
-        elapsed_time = perf_counter() - self.job_timer
-        estimated_total_time = (self.job_total / self.job_progress) * elapsed_time
-        return estimated_total_time
 
-    # returning the progress of a process adds a significant amount of time to longer processes
-    # the longer the process the more time is added by progress reporting
-    # to mitigate this, this function will change the update_rate of the instance based on how long the job is
-    # estimated to take, reducing the number of times progress is reported
-    def adjust_update_rate(self):
-        estimated_total_time = self._estimate_job_time()
-        if estimated_total_time is not None:
-            # Adjust the update rate based on the estimated total time
-            self.update_rate = max(estimated_total_time / 100, 0.1)
+# =========================================================================
+# 2d Transform Kernels:
+# =========================================================================
+# the kernels work on (N, 2) arrays of x/y coordinates, so vertices, loops, and bones are transformed all at once
+# instead of one python call each, single coordinates are still transformed with plain math by rotate_around_point
+# and normalize_2d_coordinates
+
+
+# calculates the positions of 2d coordinates after being rotated around a point
+# angle and point are either shared by every coordinate or given per coordinate, as an (N,) and an (N, 2) array
+def rotate_points(points, angle, point=(0, 0)):
+    points = np.asarray(points, dtype=np.float64)
+    angle = np.asarray(angle, dtype=np.float64)
+    point = np.asarray(point, dtype=np.float64)
+    x, y = points[:, 0] - point[..., 0], points[:, 1] - point[..., 1]
+    cos_theta, sin_theta = np.cos(angle), np.sin(angle)
+    rotated = np.empty((len(points), 2), dtype=np.float64)
+    rotated[:, 0] = x * cos_theta - y * sin_theta + point[..., 0]
+    rotated[:, 1] = y * cos_theta + x * sin_theta + point[..., 1]
+    return rotated
+
+
+# returns the x/y coordinates of points transformed by an affine matrix, a 2x3 or 3x3 matrix for 2d points, or a 4x4
+# matrix, e.g. the world matrix of an object, for 3d points
+def transform_points(points, matrix):
+    points = np.asarray(points, dtype=np.float64)
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return points @ matrix[:2, :points.shape[1]].T + matrix[:2, -1]
+
+
+# returns the coordinates normalized to the min and max coordinates
+def normalize_points(points, min_co, max_co):
+    min_co = np.asarray(min_co[:2], dtype=np.float64)
+    max_co = np.asarray(max_co[:2], dtype=np.float64)
+    return (np.asarray(points, dtype=np.float64) - min_co) / (max_co - min_co)
+
+
+# returns the angles of bones from the slopes between their heads and tails, head - tail, 0 pointing along the x axis
+def slope_angles(slopes):
+    slopes = np.asarray(slopes, dtype=np.float64)
+    return np.arctan2(slopes[:, 0], slopes[:, 1]) + np.pi / 2
+
+
+# wraps angles to the range -pi to pi
+def wrap_angles(angles):
+    return np.arctan2(np.sin(angles), np.cos(angles))
+
+
+# converts Blender x/y coordinates to Godot's 2d space, the y axis points down in Godot, scaled by the number of pixels
+# per Blender unit, or by a width and height, e.g. of a texture
+def godot_points(points, pixels):
+    scale = np.broadcast_to(np.asarray(pixels, dtype=np.float64), (2,))
+    return np.asarray(points, dtype=np.float64) * (scale[0], -scale[1])
 
 
 # calculates the position of a 2d coordinate after being rotated around a point
@@ -153,7 +359,13 @@ def is_exportable_object(obj):
 
 
 # returns a generator of objects to be exported by the plugin
+# the objects are yielded in the order of the scene, which decides the order of the nodes, and so the drawing order, in
+# Godot
 def export_objects():
+    # files without "2d" objects don't need to be searched
+    if not any_objects_2d():
+        return iter(())
+
     # check if the user wants to export all exportable objects in the scene or only currently selected objects
     if bpy.context.scene.godot_2d_bridge_tools.selected:
         exportable_objects = (
@@ -166,8 +378,55 @@ def export_objects():
     return exportable_objects
 
 
-# creates a popup based on it's arguments
+# returns the path of a folder, next to the supplied scene, used to store data generated by the addon
+# the folder is created if needed and marked with a .gdignore file so Godot doesn't try to import its contents
+def addon_data_directory(scene_path, name):
+    directory = os.path.join(os.path.dirname(scene_path), name)
+    os.makedirs(directory, exist_ok=True)
+    ignore_path = os.path.join(directory, ".gdignore")
+    if not os.path.exists(ignore_path):
+        open(ignore_path, "w").close()
+    return directory
+
+
+# returns a byte count as a short human readable string
+def byte_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+# the export history is stored in the scene as a json string so it's saved with the blend file
+# the parsed history is kept so panels don't have to parse the string on every redraw
+_parsed_history = ("", [])
+
+
+# returns the statistics of the last exports of the scene, newest first
+def export_history(scene):
+    global _parsed_history
+    history_string = scene.godot_2d_bridge_tools.export_history
+    if history_string != _parsed_history[0]:
+        try:
+            history = json.loads(history_string) if history_string else []
+        except ValueError:
+            history = []
+        _parsed_history = (history_string, history)
+    return _parsed_history[1]
+
+
+# adds the statistics of an export to the export history of the scene, dropping the oldest exports beyond the history
+# length chosen by the user
+def append_export_history(statistics):
+    properties = bpy.context.scene.godot_2d_bridge_tools
+    history = [statistics] + export_history(bpy.context.scene)
+    properties.export_history = json.dumps(history[:properties.export_history_length])
+
+
+# creates a popup based on it's arguments, every line of the message gets its own label
 def custom_message_box(message="", title="Message Box", icon='INFO'):
     def draw(self, _context):
-        self.layout.label(text=message)
+        for line in message.split("\n"):
+            self.layout.label(text=line)
     bpy.context.window_manager.popup_menu(draw, title=title, icon=icon)
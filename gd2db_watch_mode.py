@@ -0,0 +1,129 @@
+import bpy
+from time import perf_counter
+from pathlib import Path
+
+from bpy.app.handlers import persistent
+
+from bpy.app.timers import (
+    register as register_timer,
+    unregister as unregister_timer,
+    is_registered as timer_registered
+)
+
+from .gd2db_utilities import export_objects
+from .gd2db_registry import objects_2d, meshes_2d
+
+
+# names of the objects that changed since the last watch mode export, and the time of the last change
+# names are used instead of the objects themselves because undo invalidates references to Blender data
+dirty_object_names = set()
+last_change_time = 0.0
+
+
+# returns true if watch mode is enabled and there is a scene to export to
+def watch_mode_active(scene):
+    properties = scene.godot_2d_bridge_tools
+    return properties.watch_mode and bool(properties.godot_scene)
+
+
+# returns the names of the objects that need to be re-exported when the supplied datablock changes
+def objects_using_datablock(datablock):
+    if isinstance(datablock, bpy.types.Object):
+        return {datablock.name} if datablock.gd2db_object_2d else set()
+    elif isinstance(datablock, (bpy.types.Mesh, bpy.types.Armature)):
+        return {x.name for x in objects_2d() if x.data == datablock}
+    elif isinstance(datablock, bpy.types.Image):
+        # saving a texture during the export also sends an update, so only images with unsaved changes are considered
+        if not datablock.is_dirty:
+            return set()
+        return {x.name for x in meshes_2d() if x.gd2db_texture_image == datablock.name}
+    return set()
+
+
+# exports the objects that changed since the last watch mode export into the user supplied Godot scene
+# returns false if the export has to wait, e.g. because a mesh is in edit mode and its data isn't up to date
+def flush_watch_export():
+    global dirty_object_names
+
+    scene = bpy.context.scene
+    if not dirty_object_names or not watch_mode_active(scene):
+        return True
+
+    # mesh data is only written back to the object when leaving edit mode
+    if bpy.context.mode not in {'OBJECT', 'POSE'}:
+        return False
+
+    objects = [x for x in export_objects() if x.name in dirty_object_names]
+    dirty_object_names = set()
+    if not objects:
+        return True
+
+    scene_path = scene.godot_2d_bridge_tools.godot_scene
+    if not Path(scene_path).exists():
+        return True
+
+    # the export machinery is only imported when it's first used
+    from .gd2db_scene_parsing import write_godot_scene
+
+    print(f"\nGodot 2d Bridge watch mode: re-exporting {len(objects)} object(s) to \"{scene_path}\"")
+    write_godot_scene(scene_path, objects=objects)
+
+    # evaluating modifiers during the export toggles the armature modifiers, the changes reported for that aren't edits
+    dirty_object_names = set()
+    return True
+
+
+# idle timer, waits for the user to stop changing objects for watch_interval seconds so a burst of edits results in a
+# single export
+def gd2db_watch_timer():
+    scene = bpy.context.scene
+    if not watch_mode_active(scene):
+        return None
+
+    interval = scene.godot_2d_bridge_tools.watch_interval
+    remaining_time = interval - (perf_counter() - last_change_time)
+    if remaining_time > 0:
+        return remaining_time
+    if not flush_watch_export():
+        return interval
+    return None
+
+
+# collects the objects changed by every depsgraph update while watch mode is enabled
+@persistent
+def gd2db_watch_collector(scene, depsgraph=None):
+    global last_change_time
+
+    if not watch_mode_active(scene):
+        return
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    changed_object_names = set()
+    for update in depsgraph.updates:
+        changed_object_names |= objects_using_datablock(update.id.original)
+    if not changed_object_names:
+        return
+
+    dirty_object_names.update(changed_object_names)
+    last_change_time = perf_counter()
+
+    # the idle timer is optional, with an interval of 0 objects are only re-exported when the file is saved
+    # noinspection PyTypeChecker
+    if scene.godot_2d_bridge_tools.watch_interval > 0 and not timer_registered(gd2db_watch_timer):
+        register_timer(gd2db_watch_timer, first_interval=scene.godot_2d_bridge_tools.watch_interval)
+
+
+# re-exports all pending objects when the blend file is saved
+@persistent
+def gd2db_watch_save(_scene, *_args):
+    flush_watch_export()
+
+
+# forgets pending changes and stops the idle timer, used when watch mode is disabled
+def stop_watch_mode():
+    global dirty_object_names
+    dirty_object_names = set()
+    # noinspection PyTypeChecker
+    if timer_registered(gd2db_watch_timer):
+        unregister_timer(gd2db_watch_timer)